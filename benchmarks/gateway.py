@@ -0,0 +1,606 @@
+"""
+Banc d'essai des gestionnaires d'événements et des commandes, sans connexion à Discord.
+Le bot (commands.Bot avec les cogs de config.cogs) reçoit un flux d'événements
+synthétiques rejoué par une gateway simulée : les charges utiles JSON sont décodées
+puis passées aux parseurs de discord.py, exactement comme après une lecture sur le
+websocket. Les requêtes REST et les réponses aux interactions passent par une API
+simulée, avec une latence et des seaux de limite de débit configurables (une requête
+refusée attend la fin de la fenêtre, comme après un 429).
+
+Le flux mélange créations de messages (avec ou sans mentions), suppressions
+(ghost pings), suppressions en masse et interactions (/help, /serverinfo, /run).
+Le rapport donne le débit, le retard de la boucle d'événements et la latence des
+gestionnaires (de la réception de l'événement à la fin du gestionnaire) ; il est
+enregistré en JSON pour comparer les exécutions (--compare).
+
+Usage :
+    python benchmarks/gateway.py [--messages 2000] [--rate 0] [--latency-ms 50]
+                                 [--output benchmarks/results/gateway.json] [--compare ancien.json]
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # config.py lit config.json dans le répertoire courant
+
+import discord  # noqa: E402
+from discord.ext import commands  # noqa: E402
+from discord.webhook.async_ import AsyncWebhookAdapter, async_context  # noqa: E402
+
+import config  # noqa: E402
+from utils.cache_profiles import get_profile  # noqa: E402
+from utils.cog_loader import CogLoader  # noqa: E402
+from utils.instrumentation import InstrumentedCommandTree  # noqa: E402
+
+# Gestionnaires dont la latence est mesurée en priorité dans le rapport
+TRACKED = ('on_message_delete', '/help', '/run', '/serverinfo')
+APPLICATION_ID = 100000000000000001
+RUN_CODE = "print(sum(i * i for i in range(10000)))"
+
+
+def percentiles(samples: list[float]) -> dict:
+    """Résumé d'une série de durées (secondes) en millisecondes."""
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return {
+        'count': len(ordered),
+        'mean_ms': statistics.fmean(ordered) * 1000,
+        'p50_ms': ordered[round(last * 0.50)] * 1000,
+        'p95_ms': ordered[round(last * 0.95)] * 1000,
+        'p99_ms': ordered[round(last * 0.99)] * 1000,
+        'max_ms': ordered[-1] * 1000,
+    }
+
+
+class Snowflakes:
+    """Identifiants Discord croissants, datés de l'instant de leur création."""
+
+    def __init__(self):
+        self._last = 0
+
+    def next(self) -> int:
+        value = discord.utils.time_snowflake(discord.utils.utcnow())
+        self._last = max(value, self._last + 1)
+        return self._last
+
+
+# --- API REST simulée ---
+
+class RateLimitBucket:
+    """Seau de limite de débit à fenêtre fixe, comme ceux de l'API Discord (X-RateLimit-Limit / Reset-After)."""
+
+    __slots__ = ('limit', 'per', 'remaining', 'reset_at')
+
+    def __init__(self, limit: int, per: float):
+        self.limit = limit
+        self.per = per
+        self.remaining = limit
+        self.reset_at = 0.0
+
+    def acquire(self, now: float) -> float:
+        """Consomme une requête ; retourne l'attente imposée (secondes) si le seau est vide, 0 sinon."""
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.per
+        if self.remaining > 0:
+            self.remaining -= 1
+            return 0.0
+        return self.reset_at - now
+
+
+class FakeHTTP:
+    """
+    Remplace `HTTPClient.request` et l'adaptateur des webhooks (réponses aux interactions, followups).
+
+    Args:
+        bot_user: Charge utile de l'utilisateur du bot (auteur des messages envoyés).
+        latency: Latence de base d'une requête (secondes).
+        jitter: Variation aléatoire ajoutée à la latence (secondes, au plus).
+        bucket_limit: Requêtes autorisées par seau et par fenêtre (0 pour désactiver les limites).
+        bucket_per: Durée de la fenêtre d'un seau (secondes).
+    """
+
+    def __init__(self, bot_user: dict, snowflakes: Snowflakes, latency: float = 0.05, jitter: float = 0.02,
+                 bucket_limit: int = 5, bucket_per: float = 5.0, seed: int = 0):
+        self.bot_user = bot_user
+        self.snowflakes = snowflakes
+        self.latency = latency
+        self.jitter = jitter
+        self.bucket_limit = bucket_limit
+        self.bucket_per = bucket_per
+        self._random = random.Random(seed)
+        self._buckets: dict[tuple[str, str], RateLimitBucket] = {}
+
+        # Compteurs du rapport
+        self.requests: Counter[str] = Counter()
+        self.rate_limited: Counter[str] = Counter()
+        self.rate_limit_wait = 0.0
+        self.latencies: list[float] = []
+
+    async def handle(self, route, payload: dict | None) -> dict | None:
+        key = route.key
+        start = time.perf_counter()
+        # Les réponses aux interactions n'ont pas de limite de débit côté Discord
+        if self.bucket_limit and not key.endswith('/callback'):
+            bucket = self._buckets.setdefault((key, route.major_parameters), RateLimitBucket(self.bucket_limit, self.bucket_per))
+            loop = asyncio.get_running_loop()
+            while (wait := bucket.acquire(loop.time())) > 0:
+                self.rate_limited[key] += 1
+                self.rate_limit_wait += wait
+                await asyncio.sleep(wait)
+        await asyncio.sleep(self.latency + self._random.uniform(0, self.jitter))
+        self.requests[key] += 1
+        self.latencies.append(time.perf_counter() - start)
+        return self.respond(route, payload or {})
+
+    def respond(self, route, payload: dict) -> dict | None:
+        path = route.path
+        if path.endswith('/callback'):
+            return {'interaction': {'id': str(route.webhook_id), 'type': 2}}
+        if path.endswith('/audit-logs'):
+            return {'audit_log_entries': [], 'users': [], 'webhooks': [], 'integrations': [], 'threads': [],
+                    'application_commands': [], 'auto_moderation_rules': [], 'guild_scheduled_events': []}
+        if path.startswith('/users/') or path.endswith('/members/{member_id}'):
+            user_id = route.url.rsplit('/', 1)[-1]
+            user = self.bot_user if user_id == '@me' else {'id': user_id, 'username': 'utilisateur', 'discriminator': '0', 'avatar': None}
+            if path.startswith('/users/'):
+                return user
+            return {'user': user, 'roles': [], 'joined_at': '2024-01-01T00:00:00+00:00', 'deaf': False, 'mute': False, 'flags': 0}
+        if route.method in ('POST', 'PATCH') and ('/messages' in path or path.startswith('/webhooks/')):
+            return {
+                'id': str(self.snowflakes.next()),
+                'channel_id': str(route.channel_id or 0),
+                'author': self.bot_user,
+                'content': payload.get('content') or '',
+                'timestamp': discord.utils.utcnow().isoformat(),
+                'edited_timestamp': None,
+                'tts': False,
+                'mention_everyone': False,
+                'mentions': [],
+                'mention_roles': [],
+                'attachments': [],
+                'embeds': payload.get('embeds') or [],
+                'components': payload.get('components') or [],
+                'pinned': False,
+                'type': 0,
+                'flags': payload.get('flags', 0),
+            }
+        return None
+
+    async def request(self, route, *, files=None, form=None, **kwargs):
+        """Signature de `HTTPClient.request`."""
+        payload = kwargs.get('json')
+        if payload is None and form:
+            payload = json.loads(form[0]['value'])  # Envoi avec pièces jointes : payload_json en premier champ
+        return await self.handle(route, payload)
+
+    def stats(self) -> dict:
+        return {
+            'requests': dict(self.requests),
+            'total_requests': sum(self.requests.values()),
+            'rate_limited': dict(self.rate_limited),
+            'total_rate_limited': sum(self.rate_limited.values()),
+            'rate_limit_wait_s': self.rate_limit_wait,
+            'latency': percentiles(self.latencies),
+        }
+
+
+class FakeWebhookAdapter(AsyncWebhookAdapter):
+    """Adaptateur des webhooks (interactions, followups) branché sur l'API simulée."""
+
+    def __init__(self, http: FakeHTTP):
+        super().__init__()
+        self.fake_http = http
+
+    async def request(self, route, session, *, payload=None, multipart=None, files=None, **kwargs):
+        if payload is None and multipart:
+            payload = json.loads(multipart[0]['value'])
+        return await self.fake_http.handle(route, payload)
+
+
+# --- Gateway simulée ---
+
+def member_permissions() -> discord.Permissions:
+    """Permissions d'un membre ordinaire ; Permissions.text() inclut manage_messages, qui exempte de l'anti ghost ping."""
+    permissions = discord.Permissions.general() | discord.Permissions.text()
+    permissions.update(manage_messages=False, manage_threads=False, administrator=False, manage_guild=False,
+                       manage_roles=False, manage_channels=False, ban_members=False, kick_members=False)
+    return permissions
+
+
+class SyntheticGuild:
+    """Serveur synthétique : salons, rôles, membres et générateur de charges utiles d'événements."""
+
+    def __init__(self, snowflakes: Snowflakes, members: int = 200, channels: int = 10, moderators: int = 5, owners: int = 4):
+        self.snowflakes = snowflakes
+        self.id = snowflakes.next()
+        self.moderator_role = snowflakes.next()
+        self.bot_role = snowflakes.next()
+        self.bot_user = self._user('bench-bot', bot=True)
+        self.channel_ids = [snowflakes.next() for _ in range(channels)]
+        self.users = [self._user(f'membre{i}') for i in range(members)]
+        self.moderator_ids = {user['id'] for user in self.users[:moderators]}
+        # Plusieurs propriétaires : /run limite les exécutions simultanées par utilisateur
+        self.owner_ids = [int(user['id']) for user in self.users[moderators:moderators + owners]]
+        self.command_ids = {}
+
+    def _user(self, name: str, bot: bool = False) -> dict:
+        return {'id': str(self.snowflakes.next()), 'username': name, 'global_name': name, 'discriminator': '0', 'avatar': None, 'bot': bot}
+
+    def _member(self, user: dict) -> dict:
+        roles = []
+        if user['id'] in self.moderator_ids:
+            roles.append(str(self.moderator_role))
+        elif user is self.bot_user:
+            roles.append(str(self.bot_role))
+        return {'roles': roles, 'joined_at': '2024-01-01T00:00:00+00:00', 'deaf': False, 'mute': False, 'flags': 0}
+
+    def guild_payload(self) -> dict:
+        def role(role_id: int, name: str, permissions: discord.Permissions, position: int) -> dict:
+            return {'id': str(role_id), 'name': name, 'permissions': str(permissions.value), 'position': position,
+                    'color': 0, 'hoist': False, 'managed': False, 'mentionable': False, 'flags': 0}
+
+        return {
+            'id': str(self.id),
+            'name': 'Serveur de benchmark',
+            'owner_id': self.users[0]['id'],
+            'roles': [
+                role(self.id, '@everyone', member_permissions(), 0),
+                role(self.moderator_role, 'Modérateurs', discord.Permissions(manage_messages=True), 1),
+                role(self.bot_role, 'Bot', discord.Permissions.all(), 2),
+            ],
+            'channels': [
+                {'id': str(channel_id), 'type': 0, 'name': f'salon-{i}', 'position': i, 'permission_overwrites': [], 'nsfw': False}
+                for i, channel_id in enumerate(self.channel_ids)
+            ],
+            'members': [{**self._member(user), 'user': user} for user in [self.bot_user, *self.users]],
+            'member_count': len(self.users) + 1,
+            'emojis': [], 'stickers': [], 'features': [], 'threads': [], 'voice_states': [], 'presences': [],
+            'stage_instances': [], 'guild_scheduled_events': [], 'soundboard_sounds': [],
+            'verification_level': 0, 'default_message_notifications': 0, 'explicit_content_filter': 0,
+            'mfa_level': 0, 'premium_tier': 0, 'premium_subscription_count': 0, 'preferred_locale': 'fr',
+            'system_channel_flags': 0, 'nsfw_level': 0, 'large': False, 'unavailable': False,
+            'joined_at': '2024-01-01T00:00:00+00:00',
+        }
+
+    def message_create(self, author: dict, channel_id: int, mentions: list[dict]) -> dict:
+        message_id = self.snowflakes.next()
+        content = " ".join(f"<@{user['id']}>" for user in mentions) + " message de test"
+        return {
+            'id': str(message_id), 'channel_id': str(channel_id), 'guild_id': str(self.id),
+            'author': author, 'member': self._member(author), 'content': content.strip(),
+            'timestamp': discord.utils.snowflake_time(message_id).isoformat(), 'edited_timestamp': None,
+            'tts': False, 'mention_everyone': False,
+            'mentions': [{**user, 'member': self._member(user)} for user in mentions],
+            'mention_roles': [], 'attachments': [], 'embeds': [], 'components': [], 'pinned': False, 'type': 0, 'flags': 0,
+        }
+
+    def message_delete(self, message_id: int, channel_id: int) -> dict:
+        return {'id': str(message_id), 'channel_id': str(channel_id), 'guild_id': str(self.id)}
+
+    def message_delete_bulk(self, message_ids: list[int], channel_id: int) -> dict:
+        return {'ids': [str(message_id) for message_id in message_ids], 'channel_id': str(channel_id), 'guild_id': str(self.id)}
+
+    def interaction(self, name: str, user: dict, channel_id: int, options: list[dict] | None = None) -> dict:
+        interaction_id = self.snowflakes.next()
+        permissions = member_permissions()
+        return {
+            'id': str(interaction_id), 'application_id': str(APPLICATION_ID), 'type': 2, 'version': 1,
+            'token': f'token-{interaction_id}', 'guild_id': str(self.id), 'channel_id': str(channel_id),
+            'channel': {'id': str(channel_id), 'type': 0, 'guild_id': str(self.id), 'name': 'salon', 'position': 0, 'permission_overwrites': []},
+            'member': {**self._member(user), 'user': user, 'permissions': str(permissions.value)},
+            'data': {'id': str(self.command_ids.setdefault(name, self.snowflakes.next())), 'name': name, 'type': 1, 'options': options or []},
+            'locale': 'fr', 'guild_locale': 'fr', 'app_permissions': str(discord.Permissions.all().value),
+            'entitlements': [], 'authorizing_integration_owners': {'0': str(self.id)}, 'context': 0,
+        }
+
+
+def build_stream(guild: SyntheticGuild, messages: int, mention_ratio: float, delete_ratio: float, bulk_every: int,
+                 bulk_size: int, help_count: int, serverinfo_count: int, run_count: int, seed: int) -> list[str]:
+    """Flux d'événements de gateway (trames JSON {'op': 0, 't': ..., 'd': ...}) dans l'ordre de rejeu."""
+    rng = random.Random(seed)
+    authors = [user for user in guild.users if user['id'] not in guild.moderator_ids]
+    owners = [user for user in guild.users if int(user['id']) in guild.owner_ids]
+    events: list[tuple[str, dict]] = []
+    recent: dict[int, list[int]] = defaultdict(list)  # Messages non supprimés, par salon
+
+    for i in range(messages):
+        channel_id = rng.choice(guild.channel_ids)
+        author = rng.choice(guild.users)
+        mentions = rng.sample(authors, rng.randint(1, 3)) if rng.random() < mention_ratio else []
+        payload = guild.message_create(author, channel_id, mentions)
+        events.append(('MESSAGE_CREATE', payload))
+        recent[channel_id].append(int(payload['id']))
+
+        if rng.random() < delete_ratio:
+            # Suppression d'un message récent : ghost ping s'il contenait des mentions
+            channel_id = rng.choice([channel for channel, ids in recent.items() if ids])
+            ids = recent[channel_id]
+            message_id = ids.pop(rng.randrange(max(0, len(ids) - 20), len(ids)))
+            events.append(('MESSAGE_DELETE', guild.message_delete(message_id, channel_id)))
+        if bulk_every and (i + 1) % bulk_every == 0:
+            channel_id = max(recent, key=lambda channel: len(recent[channel]))
+            purged, recent[channel_id] = recent[channel_id][-bulk_size:], recent[channel_id][:-bulk_size]
+            if purged:
+                events.append(('MESSAGE_DELETE_BULK', guild.message_delete_bulk(purged, channel_id)))
+
+    interactions = (
+        [('help', rng.choice(guild.users), None) for _ in range(help_count)]
+        + [('serverinfo', rng.choice(guild.users), None) for _ in range(serverinfo_count)]
+        + [('run', rng.choice(owners), [{'name': 'code', 'type': 3, 'value': RUN_CODE}]) for _ in range(run_count)]
+    )
+    for name, user, options in interactions:
+        position = rng.randrange(len(events) + 1)
+        events.insert(position, ('INTERACTION_CREATE', guild.interaction(name, user, rng.choice(guild.channel_ids), options)))
+    return [json.dumps({'op': 0, 't': event, 's': seq, 'd': data}) for seq, (event, data) in enumerate(events, 1)]
+
+
+class FakeGateway:
+    """Décode et distribue les trames comme `DiscordWebSocket.received_message`, en mesurant chaque gestionnaire."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.state = bot._connection
+        self.received_at: dict[int, float] = {}  # Interactions : instant de réception de la trame
+        self.pending = 0
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.events: Counter[str] = Counter()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._instrument()
+
+    def _begin(self):
+        self.pending += 1
+        self._idle.clear()
+
+    def _end(self, name: str, started: float):
+        self.latencies[name].append(time.perf_counter() - started)
+        self.pending -= 1
+        if not self.pending:
+            self._idle.set()
+
+    def _instrument(self):
+        bot, tree = self.bot, self.bot.tree
+        schedule_event = bot._schedule_event
+        call = tree._call
+
+        def timed_schedule_event(coro, event_name, *args, **kwargs):
+            # Une tâche par écouteur : mesurée de la distribution de l'événement à la fin de l'écouteur
+            started = time.perf_counter()
+            self._begin()
+            task = schedule_event(coro, event_name, *args, **kwargs)
+            task.add_done_callback(lambda _: self._end(event_name, started))
+            return task
+
+        async def timed_call(interaction: discord.Interaction):
+            started = self.received_at.pop(interaction.id, time.perf_counter())
+            self._begin()
+            try:
+                await call(interaction)
+            finally:
+                name = interaction.data.get('name', '?') if interaction.data else '?'
+                self._end(f"/{name}", started)
+
+        bot._schedule_event = timed_schedule_event
+        tree._call = timed_call
+
+    def feed(self, frame: str):
+        message = discord.utils._from_json(frame)
+        event, data = message['t'], message['d']
+        self.events[event] += 1
+        if event == 'INTERACTION_CREATE':
+            self.received_at[int(data['id'])] = time.perf_counter()
+        self.state.parsers[event](data)
+
+    async def replay(self, frames: list[str], rate: float = 0.0):
+        """Rejoue les trames ; `rate` en événements par seconde (0 : au plus vite, une trame par tour de boucle)."""
+        start = time.perf_counter()
+        for i, frame in enumerate(frames):
+            if rate:
+                delay = start + i / rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            else:
+                await asyncio.sleep(0)
+            self.feed(frame)
+
+    async def wait_idle(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+class LoopLagMonitor:
+    """Retard de la boucle d'événements : dépassement d'un `asyncio.sleep(interval)`."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval))
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    def stats(self) -> dict:
+        return percentiles(self.samples)
+
+
+class ErrorCounter(logging.Handler):
+    """Compte les erreurs journalisées pendant le benchmark (exceptions dans les gestionnaires...)."""
+
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+        self.count = 0
+        self.last: str | None = None
+
+    def emit(self, record: logging.LogRecord):
+        self.count += 1
+        self.last = record.getMessage()[:300]
+
+
+# --- Exécution ---
+
+async def run(args) -> dict:
+    snowflakes = Snowflakes()
+    guild = SyntheticGuild(snowflakes, members=args.members, channels=args.channels)
+    fake_http = FakeHTTP(guild.bot_user, snowflakes, latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+                         bucket_limit=args.bucket_limit, bucket_per=args.bucket_per, seed=args.seed)
+    async_context.set(FakeWebhookAdapter(fake_http))  # Hérité par les tâches créées ensuite
+
+    bot = commands.Bot(command_prefix='!', **get_profile(config.cache_profile).bot_kwargs(),
+                       max_messages=config.max_messages, tree_cls=InstrumentedCommandTree, help_command=None)
+    bot.http.request = fake_http.request
+    bot.owner_ids = set(guild.owner_ids)
+    async with bot:
+        loader = CogLoader(bot, config.cogs, dependencies=config.cog_loading.get('dependencies', {}))
+        await loader.load_all()
+
+        # Session « connectée » : utilisateur du bot, serveur reçu (GUILD_CREATE) et bot prêt
+        state = bot._connection
+        state.user = discord.ClientUser(state=state, data=guild.bot_user)
+        state.application_id = APPLICATION_ID
+        state._add_guild_from_data(guild.guild_payload())
+        bot._ready.set()
+        bot.dispatch('ready')
+
+        gateway = FakeGateway(bot)
+        frames = build_stream(guild, args.messages, args.mention_ratio, args.delete_ratio, args.bulk_every, args.bulk_size,
+                              args.help, args.serverinfo, args.run, args.seed)
+        # Échauffement (chargement différé de /run, index de /help), non mesuré
+        for name, options in (('help', None), ('serverinfo', None), ('run', [{'name': 'code', 'type': 3, 'value': RUN_CODE}])):
+            gateway.feed(json.dumps({'op': 0, 't': 'INTERACTION_CREATE', 'd': guild.interaction(name, guild.users[5], guild.channel_ids[0], options)}))
+        await gateway.wait_idle(args.timeout)
+        gateway.latencies.clear()
+        gateway.events.clear()
+        fake_http.__init__(guild.bot_user, snowflakes, latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+                           bucket_limit=args.bucket_limit, bucket_per=args.bucket_per, seed=args.seed)
+
+        lag = LoopLagMonitor()
+        lag.start()
+        start = time.perf_counter()
+        await gateway.replay(frames, rate=args.rate)
+        replayed = time.perf_counter() - start
+        completed = await gateway.wait_idle(args.timeout)
+        elapsed = time.perf_counter() - start
+        lag.stop()
+
+        handlers = {name: percentiles(samples) for name, samples in sorted(gateway.latencies.items())}
+        result = {
+            'started_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'parameters': vars(args),
+            'events': dict(gateway.events),
+            'frames': len(frames),
+            'replay_s': replayed,
+            'elapsed_s': elapsed,
+            'completed': completed,
+            'throughput_eps': len(frames) / elapsed,
+            'ingest_eps': len(frames) / replayed,
+            'loop_lag': lag.stats(),
+            'tracked': {name: handlers.get(name, {'count': 0}) for name in TRACKED},
+            'handlers': handlers,
+            'http': fake_http.stats(),
+            'command_metrics_errors': {name: stats.errors for name, stats in bot.tree.metrics.commands.items() if stats.errors},
+        }
+        for extension in list(bot.extensions):
+            await bot.unload_extension(extension)
+    return result
+
+
+def print_report(result: dict, previous: dict | None = None):
+    print(f"{result['frames']} événements en {result['elapsed_s']:.2f} s : {result['throughput_eps']:.0f} évén./s "
+          f"(rejeu {result['ingest_eps']:.0f} évén./s){'' if result['completed'] else ' [gestionnaires non terminés]'}")
+    lag = result['loop_lag']
+    if lag['count']:
+        print(f"Retard de la boucle : p50 {lag['p50_ms']:.2f} ms, p99 {lag['p99_ms']:.2f} ms, max {lag['max_ms']:.2f} ms")
+    http = result['http']
+    print(f"API simulée : {http['total_requests']} requête(s), {http['total_rate_limited']} limitée(s) "
+          f"({http['rate_limit_wait_s']:.1f} s d'attente cumulée)")
+    print(f"{'gestionnaire':<28} | {'appels':>6} | {'p50':>8} | {'p95':>8} | {'p99':>8} | {'max':>8}" + (" | p99 préc." if previous else ""))
+    for name, stats in result['handlers'].items():
+        if not stats['count']:
+            continue
+        line = (f"{name:<28} | {stats['count']:6d} | {stats['p50_ms']:6.1f}ms | {stats['p95_ms']:6.1f}ms | "
+                f"{stats['p99_ms']:6.1f}ms | {stats['max_ms']:6.1f}ms")
+        before = (previous or {}).get('handlers', {}).get(name, {})
+        if before.get('count'):
+            line += f" | {before['p99_ms']:6.1f}ms ({stats['p99_ms'] - before['p99_ms']:+.1f})"
+        print(line)
+    for name in TRACKED:
+        if not result['tracked'][name]['count']:
+            print(f"⚠️ Aucune mesure pour {name} (cog non chargé ou événement absent du flux).")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des gestionnaires d'événements avec une gateway et une API simulées.")
+    parser.add_argument('--messages', type=int, default=2000, help="Nombre de messages créés.")
+    parser.add_argument('--mention-ratio', type=float, default=0.3, help="Proportion de messages avec mentions.")
+    parser.add_argument('--delete-ratio', type=float, default=0.2, help="Probabilité qu'une création soit suivie d'une suppression.")
+    parser.add_argument('--bulk-every', type=int, default=250, help="Une suppression en masse tous les N messages (0 : aucune).")
+    parser.add_argument('--bulk-size', type=int, default=20, help="Messages par suppression en masse.")
+    parser.add_argument('--help-count', dest='help', type=int, default=100, help="Interactions /help.")
+    parser.add_argument('--serverinfo', type=int, default=100, help="Interactions /serverinfo.")
+    parser.add_argument('--run', type=int, default=20, help="Interactions /run.")
+    parser.add_argument('--members', type=int, default=200)
+    parser.add_argument('--channels', type=int, default=10)
+    parser.add_argument('--rate', type=float, default=0.0, help="Événements par seconde (0 : au plus vite).")
+    parser.add_argument('--latency-ms', type=float, default=50.0, help="Latence de base de l'API simulée.")
+    parser.add_argument('--jitter-ms', type=float, default=20.0, help="Variation aléatoire de la latence.")
+    parser.add_argument('--bucket-limit', type=int, default=5, help="Requêtes par seau et par fenêtre (0 : pas de limite).")
+    parser.add_argument('--bucket-per', type=float, default=5.0, help="Durée de la fenêtre d'un seau (secondes).")
+    parser.add_argument('--timeout', type=float, default=120.0, help="Attente maximale de la fin des gestionnaires (secondes).")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=os.path.join(ROOT, 'benchmarks', 'results', 'gateway.json'))
+    parser.add_argument('--compare', help="Résultats JSON d'une exécution précédente à comparer.")
+    args = parser.parse_args()
+
+    # Les journaux INFO/WARNING des cogs (un par ghost ping...) fausseraient les mesures ; les erreurs sont comptées
+    logging.disable(logging.WARNING)
+    errors = ErrorCounter()
+    logging.getLogger().addHandler(errors)
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+
+    output = os.path.abspath(args.output)
+    # Les données écrites par les cogs (base des incidents, jobs...) vont dans un répertoire temporaire
+    os.chdir(tempfile.mkdtemp(prefix='gateway-bench-'))
+    result = asyncio.run(run(args))
+    result['errors'] = {'count': errors.count, 'last': errors.last}
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2)
+    print_report(result, previous)
+    if errors.count:
+        print(f"⚠️ {errors.count} erreur(s) journalisée(s), dernière : {errors.last}")
+    print(f"Résultats détaillés: {output}")
+
+
+if __name__ == '__main__':
+    main()
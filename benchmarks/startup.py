@@ -0,0 +1,145 @@
+"""
+Mesure du démarrage à froid du bot (chargement des cogs, sans connexion à Discord).
+Chaque essai est un nouveau processus Python : on mesure le temps d'import de
+discord.py et de chargement de tous les cogs de config.cogs, puis la mémoire
+résidente (RSS) du processus et de ses processus enfants (pool de /run).
+
+Deux modes sont comparés :
+- "lazy" : comportement normal, /run est chargé à sa première invocation ;
+- "eager" : l'environnement de /run est chargé juste après les cogs
+  (équivalent de l'ancien démarrage).
+
+Usage :
+    python benchmarks/startup.py [--runs 5] [--output benchmarks/results/startup.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def rss_kb(pid: int | str = 'self') -> int:
+    """Mémoire résidente d'un processus en Ko (Linux : /proc ; sinon maximum via resource)."""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    if pid != 'self':
+        return 0
+    import resource
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage // 1024 if sys.platform == 'darwin' else usage
+
+
+def child(mode: str):
+    """Un essai : démarrage des cogs dans ce processus, résultat en JSON sur la sortie standard."""
+    import asyncio
+    import logging
+
+    started = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)  # config.py lit config.json dans le répertoire courant
+    import discord
+    from discord.ext import commands
+    import config
+    from utils.cog_loader import CogLoader
+    imported = time.perf_counter()
+    logging.disable(logging.CRITICAL)
+    # Les données écrites au chargement (base des incidents...) vont dans un répertoire temporaire
+    os.chdir(tempfile.mkdtemp(prefix='startup-bench-'))
+
+    async def run() -> dict:
+        bot = commands.Bot(command_prefix='!', intents=discord.Intents.default())
+        loader = CogLoader(bot, config.cogs, dependencies=config.cog_loading.get('dependencies', {}))
+        await loader.load_all()
+        loaded = time.perf_counter()
+        if mode == 'eager':
+            cog = bot.get_cog('GeneralCommands')
+            if cog is not None:
+                await cog.run_runtime.get()
+        ready = time.perf_counter()
+        import multiprocessing
+        children = multiprocessing.active_children()
+        result = {
+            'mode': mode,
+            'import_ms': (imported - started) * 1000,
+            'cogs_ms': (loaded - imported) * 1000,
+            'startup_ms': (ready - started) * 1000,
+            'rss_kb': rss_kb(),
+            'children': len(children),
+            'children_rss_kb': sum(rss_kb(process.pid) for process in children),
+            'modules': len(sys.modules),
+            'cogs': {name: round(timing.total_ms, 2) for name, timing in loader.timings.items()},
+        }
+        for extension in list(bot.extensions):
+            await bot.unload_extension(extension)
+        return result
+
+    print(json.dumps(asyncio.run(run())))
+
+
+def run_trial(mode: str) -> dict:
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', mode],
+        capture_output=True, text=True, check=True
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['process_ms'] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def summarize(trials: list[dict]) -> dict:
+    keys = ('import_ms', 'cogs_ms', 'startup_ms', 'process_ms', 'rss_kb', 'children', 'children_rss_kb', 'modules')
+    return {key: statistics.median(trial[key] for trial in trials) for key in keys}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du démarrage à froid du bot.")
+    parser.add_argument('--runs', type=int, default=5, help="Nombre d'essais par mode.")
+    parser.add_argument('--output', default=os.path.join(ROOT, 'benchmarks', 'results', 'startup.json'))
+    parser.add_argument('--child', choices=('lazy', 'eager'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child)
+        return
+
+    # Essais alternés entre les modes, pour que le cache disque profite aux deux de la même façon
+    trials = {'lazy': [], 'eager': []}
+    for _ in range(args.runs):
+        for mode in trials:
+            trials[mode].append(run_trial(mode))
+    results = {mode: {'median': summarize(mode_trials), 'trials': mode_trials} for mode, mode_trials in trials.items()}
+
+    lazy, eager = results['lazy']['median'], results['eager']['median']
+    results['reduction'] = {
+        'startup_ms': eager['startup_ms'] - lazy['startup_ms'],
+        'rss_kb': eager['rss_kb'] - lazy['rss_kb'],
+        'total_rss_kb': (eager['rss_kb'] + eager['children_rss_kb']) - (lazy['rss_kb'] + lazy['children_rss_kb']),
+    }
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    print(f"{'mode':<6} | {'import':>8} | {'cogs':>8} | {'démarrage':>9} | {'RSS':>8} | {'enfants':>7} | {'RSS enfants':>11}")
+    for mode in ('lazy', 'eager'):
+        m = results[mode]['median']
+        print(f"{mode:<6} | {m['import_ms']:6.1f}ms | {m['cogs_ms']:6.1f}ms | {m['startup_ms']:7.1f}ms | {m['rss_kb'] / 1024:6.1f}Mo | "
+              f"{m['children']:7.0f} | {m['children_rss_kb'] / 1024:9.1f}Mo")
+    reduction = results['reduction']
+    print(f"Gain du chargement différé: {reduction['startup_ms']:.1f} ms, {reduction['rss_kb'] / 1024:.1f} Mo (processus principal), "
+          f"{reduction['total_rss_kb'] / 1024:.1f} Mo (avec les processus enfants)")
+    print(f"Résultats détaillés: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
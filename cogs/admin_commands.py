@@ -1,10 +1,121 @@
 """
 Commandes administratives du bot.
-Ce module contient les commandes réservées aux administrateurs.
+Ce module contient les commandes réservées aux administrateurs,
+dont la modération de masse (/massban, /masskick).
 """
+import asyncio
 import discord
 from discord.ext import commands
 from discord import app_commands
+import logging
+import re
+import time
+import config
+from utils.bulk_moderation import BULK_BAN_LIMIT, BulkJob, BulkModerationEngine, TargetFilters, parse_user_ids
+from utils.hot_reload import handoff_pending, take_handoff
+from utils.raid_detection import RaidEvent
+
+logger = logging.getLogger('discord.admin_commands')
+
+# Taille maximale du fichier d'IDs joint à /massban ou /masskick
+MAX_ID_FILE_BYTES = 1024 * 1024
+# Longueur maximale de l'expression régulière sur les noms
+MAX_NAME_REGEX_LENGTH = 100
+RAID_KIND_LABELS = {
+    'joins': "vague d'arrivées",
+    'mentions_message': "mentions de masse dans un message",
+    'mentions_minute': "spam de mentions",
+    'duplicates': "message copié dans plusieurs salons",
+}
+ACTION_LABELS = {'ban': ("Bannissement", "banni(s)"), 'kick': ("Expulsion", "expulsé(s)")}
+STATUS_LABELS = {
+    'pending': "⏳ En attente",
+    'running': "🔄 En cours",
+    'done': "✅ Terminé",
+    'cancelled': "⛔ Annulé",
+    'failed': "❌ Échec",
+}
+
+
+def render_job_embed(job: BulkJob) -> discord.Embed:
+    """Embed de progression d'un job de modération de masse."""
+    title, done_label = ACTION_LABELS[job.action]
+    total = len(job.target_ids)
+    ratio = job.position / total if total else 1.0
+    filled = round(ratio * 20)
+    color = discord.Color.orange() if not job.done else (discord.Color.green() if job.status == 'done' else discord.Color.red())
+    embed = discord.Embed(
+        title=f"🔨 {title} de masse",
+        description=f"`{'█' * filled}{'░' * (20 - filled)}` {job.position}/{total} ({ratio:.0%})",
+        color=color
+    )
+    embed.add_field(name="Statut", value=STATUS_LABELS.get(job.status, job.status), inline=True)
+    embed.add_field(name="Réussites", value=f"{job.succeeded} {done_label}", inline=True)
+    embed.add_field(name="Échecs", value=str(job.failed_count), inline=True)
+    if job.failed:
+        embed.add_field(name="Motifs d'échec", value="\n".join(f"{reason}: {count}" for reason, count in job.failed.items())[:1024], inline=False)
+    embed.add_field(name="Raison", value=(job.reason or "Aucune raison")[:1024], inline=False)
+    embed.set_footer(text=f"Job {job.job_id} | Demandé par {job.moderator_id} | Source: {job.source}")
+    return embed
+
+
+class BulkJobCancelButton(discord.ui.DynamicItem[discord.ui.Button], template=r'bulkmod:cancel:(?P<job_id>[0-9a-f]+)'):
+    """Bouton d'annulation d'un job de modération de masse (fonctionne aussi après un redémarrage)."""
+
+    def __init__(self, job_id: str):
+        super().__init__(discord.ui.Button(label="Annuler", style=discord.ButtonStyle.danger, custom_id=f"bulkmod:cancel:{job_id}"))
+        self.job_id = job_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match['job_id'])
+
+    async def callback(self, interaction: discord.Interaction):
+        cog = interaction.client.get_cog('AdminCommands')
+        job = cog.bulk_engine.jobs.get(self.job_id) if cog else None
+        if job is None or job.done:
+            await interaction.response.send_message("Ce job est déjà terminé.", ephemeral=True)
+            return
+        permissions = interaction.permissions
+        if not (permissions.ban_members if job.action == 'ban' else permissions.kick_members):
+            await interaction.response.send_message("❌ Vous n'avez pas la permission d'annuler ce job.", ephemeral=True)
+            return
+        cog.bulk_engine.cancel(self.job_id)
+        logger.info(f"Job {self.job_id} annulé par {interaction.user} (ID: {interaction.user.id})")
+        await interaction.response.send_message(f"⛔ Annulation du job `{self.job_id}` demandée.", ephemeral=True)
+
+
+def job_cancel_view(job: BulkJob) -> discord.ui.View | None:
+    if job.done:
+        return None
+    view = discord.ui.View(timeout=None)
+    view.add_item(BulkJobCancelButton(job.job_id))
+    view.stop()  # Les clics sont traités par BulkJobCancelButton, enregistré dans cog_load
+    return view
+
+
+class BulkConfirmView(discord.ui.View):
+    """Confirmation d'un job de modération de masse par son auteur."""
+
+    def __init__(self, author_id: int):
+        super().__init__(timeout=120)
+        self.author_id = author_id
+        self.confirmed: bool | None = None
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.author_id
+
+    @discord.ui.button(label="Confirmer", style=discord.ButtonStyle.danger)
+    async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.confirmed = True
+        await interaction.response.edit_message(content="⏳ Lancement du job...", embed=None, view=None)
+        self.stop()
+
+    @discord.ui.button(label="Annuler", style=discord.ButtonStyle.secondary)
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.confirmed = False
+        await interaction.response.edit_message(content="Opération annulée.", embed=None, view=None)
+        self.stop()
 
 class AdminCommands(commands.Cog):
     """Commandes réservées aux administrateurs du serveur."""
@@ -17,6 +128,122 @@ class AdminCommands(commands.Cog):
             bot: L'instance du bot Discord.
         """
         self.bot = bot
+        bulk_config = config.bulk_moderation
+        self.max_targets = bulk_config.get('max_targets', 1000)
+        self.bulk_engine = BulkModerationEngine(
+            bot,
+            on_progress=self._show_job_progress,
+            state_dir=bulk_config.get('state_dir', 'data/bulk_jobs'),
+            progress_interval=bulk_config.get('progress_interval', 3.0),
+            batch_size=bulk_config.get('batch_size', 200),
+        )
+        self._resumed = False
+
+    async def cog_load(self):
+        # Boutons d'annulation des jobs, y compris ceux des messages envoyés avant un redémarrage
+        self.bot.add_dynamic_items(BulkJobCancelButton)
+        state = take_handoff(self.bot, self.qualified_name)
+        if state is not None:
+            # Rechargement à chaud : les jobs en cours continuent, leur progression est affichée par cette instance
+            self.bulk_engine = state['bulk_engine']
+            self.bulk_engine.on_progress = self._show_job_progress
+            self._resumed = state['resumed']
+        if self.bot.is_ready():
+            self._resume_jobs()
+
+    def cog_export_state(self) -> dict:
+        """État repris par la nouvelle instance lors d'un rechargement à chaud (voir utils/hot_reload.py)."""
+        return {'bulk_engine': self.bulk_engine, 'resumed': self._resumed}
+
+    async def cog_unload(self):
+        self.bot.remove_dynamic_items(BulkJobCancelButton)
+        if not handoff_pending(self.bot, self.qualified_name):
+            await self.bulk_engine.close()
+        logger.info(f"Statistiques de la modération de masse: {self.bulk_engine.stats()}")
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        self._resume_jobs()
+
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild: discord.Guild):
+        # Jobs laissés en attente au démarrage parce que le serveur était indisponible
+        if self._resumed:
+            resumed = self.bulk_engine.resume(guild_id=guild.id)
+            if resumed:
+                logger.info(f"{resumed} job(s) de modération de masse repris sur {guild.name} (serveur de nouveau disponible).")
+
+    @commands.Cog.listener()
+    async def on_config_reload(self, old, new, changed: frozenset[str]):
+        # "raid_detection" (action, salons de log) est relu à chaque raid : rien à faire ici
+        if 'bulk_moderation' in changed:
+            self.max_targets = new.bulk_moderation.get('max_targets', 1000)
+            self.bulk_engine.progress_interval = new.bulk_moderation.get('progress_interval', 3.0)
+            self.bulk_engine.batch_size = max(1, min(new.bulk_moderation.get('batch_size', 200), BULK_BAN_LIMIT))
+
+    def _resume_jobs(self):
+        if self._resumed:
+            return
+        self._resumed = True
+        resumed = self.bulk_engine.resume()
+        if resumed:
+            logger.info(f"{resumed} job(s) de modération de masse repris après redémarrage.")
+
+    async def _show_job_progress(self, job: BulkJob):
+        """Met à jour le message de progression du job (un seul message, modifié au fil du job)."""
+        if job.channel_id is None or job.message_id is None:
+            return
+        channel = self.bot.get_channel(job.channel_id)
+        if channel is None:
+            return
+        try:
+            await channel.get_partial_message(job.message_id).edit(embed=render_job_embed(job), view=job_cancel_view(job))
+        except discord.NotFound:
+            job.message_id = None  # Message supprimé : le job continue sans affichage
+        except discord.HTTPException as e:
+            logger.warning(f"Impossible de mettre à jour la progression du job {job.job_id}: {type(e).__name__} - {e}")
+
+    @commands.Cog.listener()
+    async def on_raid_detected(self, event: RaidEvent):
+        """Réaction automatique à un raid (clé "action" de "raid_detection") via la modération de masse."""
+        action = config.raid_detection.get('action', 'none')
+        if action not in ACTION_LABELS or not event.user_ids:
+            return
+        guild = self.bot.get_guild(event.guild_id)
+        if guild is None:
+            return
+        permissions = guild.me.guild_permissions
+        if not (permissions.ban_members if action == 'ban' else permissions.kick_members):
+            logger.warning(f"Raid sur {guild.name}: permission manquante pour l'action automatique '{action}'.")
+            return
+
+        # Ne jamais viser un utilisateur déjà pris en charge par un job en cours, ni un membre protégé
+        already_targeted = {user_id for job in self.bulk_engine.active_jobs(guild.id) for user_id in job.target_ids}
+        targets = []
+        for user_id in event.user_ids:
+            if user_id in already_targeted or user_id in (self.bot.user.id, guild.owner_id):
+                continue
+            member = guild.get_member(user_id)
+            if member is not None and (member.guild_permissions.manage_messages or member.top_role >= guild.me.top_role):
+                continue
+            targets.append(user_id)
+        if not targets:
+            return
+
+        job = BulkJob(
+            guild.id, action, targets[:self.max_targets], self.bot.user.id,
+            reason=f"Raid détecté : {RAID_KIND_LABELS.get(event.kind, event.kind)} ({event.value}/{event.threshold})",
+            source='raid'
+        )
+        log_channel = guild.get_channel(config.raid_detection.get('log_channel_ids', {}).get(str(guild.id), 0))
+        if log_channel is not None:
+            try:
+                message = await log_channel.send(embed=render_job_embed(job), view=job_cancel_view(job))
+                job.channel_id, job.message_id = log_channel.id, message.id
+            except discord.HTTPException as e:
+                logger.warning(f"Impossible d'envoyer le message de progression du job {job.job_id}: {type(e).__name__} - {e}")
+        self.bulk_engine.submit(job)
+        logger.warning(f"Raid sur {guild.name}: {ACTION_LABELS[action][0].lower()} automatique de {len(job.target_ids)} utilisateur(s), job {job.job_id}")
 
     # La vérification des permissions se fait maintenant par commande avec des décorateurs
 
@@ -50,6 +277,220 @@ class AdminCommands(commands.Cog):
         await member.ban(reason=reason)
         await interaction.response.send_message(f"{member.mention} a été banni du serveur.")
 
+    # --- Modération de masse ---
+
+    @app_commands.command(name="massban", description="Bannit plusieurs utilisateurs (liste d'IDs, fichier ou filtres).")
+    @app_commands.describe(
+        ids="IDs des utilisateurs, séparés par des espaces ou des virgules.",
+        file="Fichier texte contenant des IDs d'utilisateurs.",
+        joined_within="Membres arrivés il y a moins de N minutes.",
+        account_age="Comptes créés il y a moins de N jours.",
+        name_regex="Expression régulière sur le nom d'utilisateur ou le nom affiché.",
+        reason="La raison du bannissement (optionnel).",
+        delete_message_days="Jours de messages à supprimer (0 à 7)."
+    )
+    @app_commands.checks.has_permissions(ban_members=True, administrator=True)
+    async def massban(self, interaction: discord.Interaction, ids: str = None, file: discord.Attachment = None,
+                      joined_within: app_commands.Range[int, 1, 10080] = None, account_age: app_commands.Range[int, 1, 3650] = None,
+                      name_regex: str = None, reason: str = None, delete_message_days: app_commands.Range[int, 0, 7] = 0):
+        """
+        Bannit en masse les utilisateurs ciblés, après confirmation.
+
+        Args:
+            interaction: L'interaction de la commande slash.
+            ids: IDs des utilisateurs à bannir.
+            file: Fichier d'IDs.
+            joined_within: Filtre sur la date d'arrivée (minutes).
+            account_age: Filtre sur l'âge du compte (jours).
+            name_regex: Filtre sur le nom.
+            reason: La raison du bannissement (optionnel).
+            delete_message_days: Jours de messages à supprimer.
+        """
+        await self._start_bulk_job(interaction, 'ban', ids, file, joined_within, account_age, name_regex, reason, delete_message_days)
+
+    @app_commands.command(name="masskick", description="Expulse plusieurs membres (liste d'IDs, fichier ou filtres).")
+    @app_commands.describe(
+        ids="IDs des membres, séparés par des espaces ou des virgules.",
+        file="Fichier texte contenant des IDs de membres.",
+        joined_within="Membres arrivés il y a moins de N minutes.",
+        account_age="Comptes créés il y a moins de N jours.",
+        name_regex="Expression régulière sur le nom d'utilisateur ou le nom affiché.",
+        reason="La raison de l'expulsion (optionnel)."
+    )
+    @app_commands.checks.has_permissions(kick_members=True, administrator=True)
+    async def masskick(self, interaction: discord.Interaction, ids: str = None, file: discord.Attachment = None,
+                       joined_within: app_commands.Range[int, 1, 10080] = None, account_age: app_commands.Range[int, 1, 3650] = None,
+                       name_regex: str = None, reason: str = None):
+        """
+        Expulse en masse les membres ciblés, après confirmation.
+
+        Args:
+            interaction: L'interaction de la commande slash.
+            ids: IDs des membres à expulser.
+            file: Fichier d'IDs.
+            joined_within: Filtre sur la date d'arrivée (minutes).
+            account_age: Filtre sur l'âge du compte (jours).
+            name_regex: Filtre sur le nom.
+            reason: La raison de l'expulsion (optionnel).
+        """
+        await self._start_bulk_job(interaction, 'kick', ids, file, joined_within, account_age, name_regex, reason, 0)
+
+    async def _start_bulk_job(self, interaction: discord.Interaction, action: str, ids: str | None, file: discord.Attachment | None,
+                              joined_within: int | None, account_age: int | None, name_regex: str | None, reason: str | None,
+                              delete_message_days: int):
+        guild = interaction.guild
+        if guild is None:
+            await interaction.response.send_message("Cette commande ne peut être utilisée que sur un serveur.", ephemeral=True)
+            return
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        # 1. IDs explicites (texte et/ou fichier)
+        target_ids = parse_user_ids(ids or "")
+        if file is not None:
+            if file.size > MAX_ID_FILE_BYTES:
+                await interaction.followup.send(f"❌ Le fichier dépasse {MAX_ID_FILE_BYTES // 1024} Ko.", ephemeral=True)
+                return
+            try:
+                content = (await file.read()).decode('utf-8', errors='ignore')
+            except discord.HTTPException as e:
+                await interaction.followup.send(f"❌ Impossible de lire le fichier: {e}", ephemeral=True)
+                return
+            target_ids = list(dict.fromkeys(target_ids + parse_user_ids(content)))
+
+        # 2. Filtres
+        name_pattern = None
+        if name_regex:
+            if len(name_regex) > MAX_NAME_REGEX_LENGTH:
+                await interaction.followup.send(f"❌ L'expression régulière dépasse {MAX_NAME_REGEX_LENGTH} caractères.", ephemeral=True)
+                return
+            try:
+                name_pattern = re.compile(name_regex, re.IGNORECASE)
+            except re.error as e:
+                await interaction.followup.send(f"❌ Expression régulière invalide: {e}", ephemeral=True)
+                return
+        filters = TargetFilters(
+            joined_within=joined_within * 60 if joined_within else None,
+            account_age=account_age * 86400 if account_age else None,
+            name_pattern=name_pattern
+        )
+        if not target_ids and filters.is_empty():
+            await interaction.followup.send("❌ Indiquez des IDs, un fichier ou au moins un filtre.", ephemeral=True)
+            return
+
+        # 3. Sans liste d'IDs, les filtres s'appliquent à tous les membres (cache des membres requis)
+        if filters.needs_members() or not target_ids:
+            if not self.bot.intents.members:
+                await interaction.followup.send(
+                    "❌ Les filtres sur les membres nécessitent l'intent des membres (profil de cache `moderation` ou `full`).",
+                    ephemeral=True
+                )
+                return
+            if not guild.chunked:
+                await guild.chunk()
+
+        # 4. Membres absents du cache : résolus avant la sélection, sinon la hiérarchie ne pourrait pas être vérifiée
+        #    (Discord ne la vérifie que par rapport au bot, pas par rapport à l'auteur de la commande)
+        resolved, unresolved = await self._resolve_members(guild, [user_id for user_id in target_ids if guild.get_member(user_id) is None])
+
+        now = time.time()
+        candidates = target_ids or [member.id for member in guild.members]
+        selected, protected = [], 0
+        for user_id in candidates:
+            member = guild.get_member(user_id) or resolved.get(user_id)
+            if not filters.is_empty() and not filters.matches(user_id, member, now):
+                continue
+            if user_id in unresolved or self._is_protected(interaction, user_id, member):
+                protected += 1
+                continue
+            selected.append(user_id)
+
+        if not selected:
+            await interaction.followup.send(f"Aucune cible retenue ({protected} protégée(s)).", ephemeral=True)
+            return
+        if len(selected) > self.max_targets:
+            await interaction.followup.send(
+                f"❌ {len(selected)} cibles dépassent la limite de {self.max_targets} par job. Affinez les filtres.",
+                ephemeral=True
+            )
+            return
+
+        # 5. Confirmation par l'auteur
+        title, _ = ACTION_LABELS[action]
+        preview = ", ".join(f"<@{user_id}>" for user_id in selected[:15])
+        if len(selected) > 15:
+            preview += f" et {len(selected) - 15} autre(s)"
+        embed = discord.Embed(
+            title=f"⚠️ {title} de masse : {len(selected)} cible(s)",
+            description=preview,
+            color=discord.Color.orange()
+        )
+        if protected:
+            embed.add_field(name="Protégés (ignorés)", value=f"{protected} (vous-même, le bot, le propriétaire, rôle supérieur ou égal, ou rang non vérifiable)", inline=False)
+        embed.add_field(name="Raison", value=(reason or "Aucune raison")[:1024], inline=False)
+        view = BulkConfirmView(interaction.user.id)
+        await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+        if await view.wait() or not view.confirmed:
+            return
+
+        # 6. Message de progression (message normal du salon, modifiable même après un redémarrage)
+        job = BulkJob(
+            guild.id, action, selected, interaction.user.id, reason=reason,
+            channel_id=interaction.channel_id, delete_message_seconds=delete_message_days * 86400
+        )
+        try:
+            message = await interaction.channel.send(embed=render_job_embed(job), view=job_cancel_view(job))
+            job.message_id = message.id
+        except discord.HTTPException as e:
+            logger.warning(f"Impossible d'envoyer le message de progression du job {job.job_id}: {type(e).__name__} - {e}")
+        self.bulk_engine.submit(job)
+        logger.info(f"{title} de masse lancé par {interaction.user} (ID: {interaction.user.id}) sur {guild.name}: {len(selected)} cible(s), job {job.job_id}")
+
+    async def _resolve_members(self, guild: discord.Guild, user_ids: list[int]) -> tuple[dict[int, discord.Member], set[int]]:
+        """
+        Récupère les membres absents du cache.
+
+        Returns:
+            (membres trouvés par ID, IDs dont l'appartenance au serveur n'a pas pu être établie).
+            Un ID absent des deux n'est pas membre du serveur.
+        """
+        resolved: dict[int, discord.Member] = {}
+        unresolved: set[int] = set()
+        if not user_ids:
+            return resolved, unresolved
+        if self.bot.intents.members:
+            # Requête par la gateway, 100 IDs au plus par requête
+            for start in range(0, len(user_ids), 100):
+                batch = user_ids[start:start + 100]
+                try:
+                    members = await guild.query_members(user_ids=batch, limit=len(batch), cache=True)
+                except (asyncio.TimeoutError, discord.ClientException) as e:
+                    logger.warning(f"Impossible de récupérer {len(batch)} membre(s) du serveur {guild.id}: {type(e).__name__} - {e}")
+                    unresolved.update(batch)
+                    continue
+                resolved.update((member.id, member) for member in members)
+            return resolved, unresolved
+        for user_id in user_ids:
+            try:
+                resolved[user_id] = await guild.fetch_member(user_id)
+            except discord.NotFound:
+                pass  # Pas membre du serveur : aucune hiérarchie à vérifier
+            except discord.HTTPException as e:
+                logger.warning(f"Impossible de récupérer le membre {user_id} du serveur {guild.id}: {type(e).__name__} - {e}")
+                unresolved.add(user_id)
+        return resolved, unresolved
+
+    def _is_protected(self, interaction: discord.Interaction, user_id: int, member: discord.Member | None) -> bool:
+        """Cibles jamais touchées : l'auteur, le bot, le propriétaire, et les membres de rang supérieur ou égal."""
+        guild = interaction.guild
+        if user_id in (interaction.user.id, self.bot.user.id, guild.owner_id):
+            return True
+        if member is None:
+            return False  # Pas membre du serveur (les membres absents du cache ont été résolus par _resolve_members)
+        if interaction.user.id != guild.owner_id and member.top_role >= interaction.user.top_role:
+            return True
+        return member.top_role >= guild.me.top_role
+
+
 # Fonction setup requise par discord.py pour charger le cog
 async def setup(bot):
     """
@@ -1,22 +1,101 @@
 """
-Fonctionnalités diverses du bot, incluant AntiGhostPing.
+Fonctionnalités diverses du bot, incluant AntiGhostPing et la détection de raids.
 """
 import discord
 from discord.ext import commands
+from discord import app_commands
 from discord import AuditLogAction, Colour, Embed, Message
+import asyncio
 import logging
 import datetime # Pour le timestamp dans le footer
+import config
+from utils.alert_scheduler import AlertScheduler
+from utils.audit_log_cache import AuditLogCache
+from utils.hot_reload import handoff_pending, take_handoff
+from utils.incident_store import Incident, IncidentStore
+from utils.mention_cache import MentionCache, MentionRecord
+from utils.raid_detection import RaidDetector
 
-# Configuration du logger pour ce cog
+# Configuration du logger pour ce cog (les handlers sont ceux du logger racine, voir utils/logging_setup.py)
 logger = logging.getLogger('discord.functionality_bot')
-# Configuration du handler si nécessaire
-if not logger.handlers:
-    handler = logging.StreamHandler()
-    handler.setFormatter(logging.Formatter('%(asctime)s:%(levelname)s:%(name)s: %(message)s'))
-    logger.addHandler(handler)
 logger.setLevel(logging.INFO)
 
 
+class _CachedMessageView:
+    """
+    Vue minimale d'un MentionRecord, avec les attributs utilisés par le pipeline de détection.
+    Permet de traiter un message qui n'est plus dans le cache de discord.py.
+    """
+
+    __slots__ = ('id', 'guild', 'channel', 'author', 'mentions', 'content', 'embeds', 'attachments', 'created_at')
+
+    def __init__(self, record: MentionRecord, guild: discord.Guild, channel, author, mentions: list):
+        self.id = record.message_id
+        self.guild = guild
+        self.channel = channel
+        self.author = author
+        self.mentions = mentions
+        self.content = record.content
+        self.embeds = []
+        self.attachments = []
+        self.created_at = record.created_at
+
+
+# Ancienneté maximale (secondes) de l'entrée du log d'audit d'une purge pour l'attribuer à un événement reçu
+BULK_AUDIT_WINDOW = 10
+
+# Nombre d'incidents par page de /ghostpings
+GHOSTPINGS_PAGE_SIZE = 10
+
+
+class GhostPingPageButton(discord.ui.DynamicItem[discord.ui.Button],
+                          template=r'ghostpings:(?P<user_id>[0-9]+):(?P<author_id>[0-9]+):(?P<target_id>[0-9]+):(?P<days>[0-9]+):(?P<page>[0-9]+)'):
+    """
+    Bouton de pagination de /ghostpings. Les filtres de la requête (auteur, cible, période ; 0 pour aucun)
+    et la page sont dans le custom_id : le bouton fonctionne après un redémarrage.
+    """
+
+    def __init__(self, user_id: int, author_id: int, target_id: int, days: int, page: int, label: str = "·", disabled: bool = False):
+        super().__init__(discord.ui.Button(
+            label=label,
+            style=discord.ButtonStyle.secondary,
+            custom_id=f"ghostpings:{user_id}:{author_id}:{target_id}:{days}:{page}",
+            disabled=disabled
+        ))
+        self.user_id = user_id
+        self.author_id = author_id
+        self.target_id = target_id
+        self.days = days
+        self.page = page
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(int(match['user_id']), int(match['author_id']), int(match['target_id']), int(match['days']), int(match['page']), item.label)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id == self.user_id:
+            return True
+        await interaction.response.send_message("Seul l'auteur de la commande peut changer de page.", ephemeral=True)
+        return False
+
+    async def callback(self, interaction: discord.Interaction):
+        cog = interaction.client.get_cog('AntiGhostPing')
+        if cog is None or cog.incident_store is None:
+            await interaction.response.send_message("L'historique des ghost pings n'est pas disponible.", ephemeral=True)
+            return
+        # Sans vue dans la réponse (une seule page après une purge), les anciens boutons sont retirés
+        await interaction.response.edit_message(**{'view': None, **await cog.ghostpings_page(interaction, self.author_id, self.target_id, self.days, self.page)})
+
+
+def ghostpings_pagination_view(user_id: int, author_id: int, target_id: int, days: int, page: int, pages: int) -> discord.ui.View:
+    view = discord.ui.View(timeout=None)
+    view.add_item(GhostPingPageButton(user_id, author_id, target_id, days, max(page - 1, 0), "◀", disabled=page == 0))
+    view.add_item(discord.ui.Button(label=f"{page + 1}/{pages}", custom_id=f"ghostpings:position:{user_id}", disabled=True))
+    view.add_item(GhostPingPageButton(user_id, author_id, target_id, days, min(page + 1, pages - 1), "▶", disabled=page >= pages - 1))
+    view.stop()  # Les clics sont traités par GhostPingPageButton, enregistré dans cog_load
+    return view
+
+
 class AntiGhostPingCog(commands.Cog, name="AntiGhostPing"):
     """
     Détecte et signale les ghost pings avec style.
@@ -25,64 +104,131 @@ class AntiGhostPingCog(commands.Cog, name="AntiGhostPing"):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.settings = config.anti_ghost_ping
+        # Cache partagé des logs d'audit : évite un appel REST par message supprimé
+        self.audit_log_cache = AuditLogCache(
+            ttl=config.anti_ghost_ping.get('audit_log_ttl', 15.0),
+            refresh_interval=config.anti_ghost_ping.get('audit_log_refresh_interval', 2.0),
+            max_entries=config.anti_ghost_ping.get('audit_log_max_entries', 50),
+        )
+        # File d'envoi par canal : limite le débit et fusionne les alertes répétées
+        self.alert_scheduler = AlertScheduler(
+            rate=config.anti_ghost_ping.get('alert_rate', 1.0),
+            burst=config.anti_ghost_ping.get('alert_burst', 3),
+            merge_window=config.anti_ghost_ping.get('alert_merge_window', 30.0),
+            max_queue=config.anti_ghost_ping.get('alert_max_queue', 20),
+        )
+        # Cache annexe (optionnel) des seuls messages avec mentions, indépendant de max_messages
+        mention_cache_config = config.anti_ghost_ping.get('mention_cache', {})
+        self.mention_cache = None
+        if mention_cache_config.get('enabled', False):
+            self.mention_cache = MentionCache(
+                max_bytes=mention_cache_config.get('max_bytes', 8 * 1024 * 1024),
+                max_bytes_per_guild=mention_cache_config.get('max_bytes_per_guild', 1024 * 1024),
+                ttl=mention_cache_config.get('ttl', 600.0),
+            )
+        # Historique persistant des incidents (SQLite), interrogeable avec /ghostpings
+        incident_store_config = config.anti_ghost_ping.get('incident_store', {})
+        self.incident_store = None
+        if incident_store_config.get('enabled', True):
+            self.incident_store = IncidentStore(
+                path=incident_store_config.get('path', 'data/incidents.sqlite3'),
+                flush_interval=incident_store_config.get('flush_interval', 1.0),
+                batch_size=incident_store_config.get('batch_size', 100),
+                retention_days=incident_store_config.get('retention_days', 365),
+            )
         logger.info("Cog AntiGhostPing [Stylé] initialisé.")
 
-    @commands.Cog.listener()
-    async def on_message_delete(self, message: Message):
-        # Log de base pour le débogage
-        # logger.info(f"Message supprimé (ID: {message.id}) par {message.author} dans {message.channel.name}. Contenu: '{message.content}'")
+    async def cog_load(self):
+        self.bot.add_dynamic_items(GhostPingPageButton)
+        state = take_handoff(self.bot, self.qualified_name)
+        if state is not None:
+            # Rechargement à chaud : le cache des logs d'audit et la file d'alertes suivent déjà la configuration
+            # (on_config_reload), le cache des mentions et la base des incidents sont repris si leurs paramètres
+            # n'ont pas changé depuis le chargement précédent
+            self.audit_log_cache = state['audit_log_cache']
+            self.alert_scheduler = state['alert_scheduler']
+            if state['settings'].get('mention_cache') == self.settings.get('mention_cache'):
+                self.mention_cache = state['mention_cache']
+            if state['settings'].get('incident_store') == self.settings.get('incident_store'):
+                self.incident_store = state['incident_store']
+                return
+            if state['incident_store']:
+                await state['incident_store'].close()
+        if self.incident_store:
+            try:
+                await self.incident_store.open()
+            except Exception as e:
+                logger.error(f"AntiGhostPing: Impossible d'ouvrir la base des incidents: {type(e).__name__} - {e}")
+                self.incident_store = None
 
-        # 1. Ignorer les messages hors des serveurs (DMs)
-        if not message.guild:
+    def cog_export_state(self) -> dict:
+        """État repris par la nouvelle instance lors d'un rechargement à chaud (voir utils/hot_reload.py)."""
+        return {
+            'settings': self.settings,
+            'audit_log_cache': self.audit_log_cache,
+            'alert_scheduler': self.alert_scheduler,
+            'mention_cache': self.mention_cache,
+            'incident_store': self.incident_store,
+        }
+
+    async def cog_unload(self):
+        self.bot.remove_dynamic_items(GhostPingPageButton)
+        logger.info(f"AntiGhostPing: Statistiques du cache des logs d'audit: {self.audit_log_cache.stats()}")
+        logger.info(f"AntiGhostPing: Statistiques de l'ordonnanceur d'alertes: {self.alert_scheduler.stats()}")
+        if self.mention_cache:
+            logger.info(f"AntiGhostPing: Statistiques du cache des mentions: {self.mention_cache.stats()}")
+        if handoff_pending(self.bot, self.qualified_name):
+            return  # Alertes en file et incidents en attente d'écriture continuent avec la nouvelle instance
+        self.alert_scheduler.close()
+        if self.incident_store:
+            await self.incident_store.close()
+            logger.info(f"AntiGhostPing: Statistiques de la base des incidents: {self.incident_store.stats()}")
+
+    @commands.Cog.listener()
+    async def on_config_reload(self, old, new, changed: frozenset[str]):
+        if 'anti_ghost_ping' not in changed:
             return
+        settings = new.anti_ghost_ping
+        self.audit_log_cache.ttl = settings.get('audit_log_ttl', 15.0)
+        self.audit_log_cache.refresh_interval = settings.get('audit_log_refresh_interval', 2.0)
+        self.audit_log_cache.max_entries = settings.get('audit_log_max_entries', 50)
+        self.alert_scheduler.set_rate(settings.get('alert_rate', 1.0), settings.get('alert_burst', 3))
+        self.alert_scheduler.merge_window = settings.get('alert_merge_window', 30.0)
+        self.alert_scheduler.max_queue = settings.get('alert_max_queue', 20)
+        # Le cache des mentions et la base des incidents gardent leurs paramètres jusqu'au rechargement du cog
+        logger.info("AntiGhostPing: Paramètres rechargés depuis la configuration.")
 
+    def _is_ghost_ping_candidate(self, message: Message) -> bool:
+        """Applique les filtres qui ne nécessitent aucun appel REST."""
         # 2. Ignorer si le message ne contenait aucune mention
         if not message.mentions:
-            return
+            return False
 
         # 3. Ignorer si l'auteur est un bot
         if message.author.bot:
-            return
+            return False
 
         # 4. Ignorer si l'auteur a la permission de gérer les messages
         if isinstance(message.author, discord.Member) and \
            message.author.guild_permissions.manage_messages:
             logger.debug(f"AntiGhostPing: Ignoré (auteur {message.author.name} a manage_messages)")
-            return
+            return False
 
         # 5. Logique pour les mentions uniques (auto-mention, mention de bot unique)
         if len(message.mentions) == 1:
             first_mention = message.mentions[0]
             if first_mention == message.author:  # Auto-mention unique
                 logger.debug(f"AntiGhostPing: Ignoré (auto-mention unique par {message.author.name})")
-                return
+                return False
             if first_mention.bot:  # Mention de bot unique (si la cible est un bot)
                 logger.debug(f"AntiGhostPing: Ignoré (mention unique d'un bot par {message.author.name})")
-                return
-        
-        # 6. Vérification par log d'audit : le message a-t-il été supprimé par quelqu'un d'autre ?
-        try:
-            if message.guild.me.guild_permissions.view_audit_log:
-                async for entry in message.guild.audit_logs(limit=1, action=AuditLogAction.message_delete):
-                    # Vérifier si l'utilisateur qui a supprimé est différent de l'auteur du message
-                    # et si la cible de la suppression est bien l'auteur du message (plus précis)
-                    if entry.user and entry.user.id != message.author.id and entry.target == message.author:
-                        # On pourrait ajouter un check sur l'ID du message si disponible dans l'entry,
-                        # mais c'est souvent non fiable pour les suppressions rapides.
-                        # entry.extra.channel == message.channel et entry.extra.count >= 1
-                        logger.debug(f"AntiGhostPing: Ignoré (log d'audit indique suppression par {entry.user.name} != auteur {message.author.name})")
-                        return
-            else:
-                logger.warning(f"AntiGhostPing [{message.guild.name}]: Permission 'View Audit Log' manquante.")
-        except discord.Forbidden:
-            logger.warning(f"AntiGhostPing [{message.guild.name}]: Accès interdit aux logs d'audit.")
-        except Exception as e:
-            logger.error(f"AntiGhostPing [{message.guild.name}]: Erreur lors de la vérification du log d'audit: {type(e).__name__} - {e}")
+                return False
 
-        # Si on arrive ici, c'est un ghost ping potentiel
-        logger.info(f"AntiGhostPing: Ghost ping potentiel détecté de {message.author.name} dans {message.channel.name}")
+        return True
 
-        # Préparation du contenu du message pour l'embed
+    def _content_display(self, message: Message, max_content_length: int = 1000) -> str:
+        """Prépare le contenu d'un message supprimé pour l'affichage dans un embed."""
         message_content_display = message.content
         if not message_content_display:
             if message.embeds:
@@ -91,12 +237,23 @@ class AntiGhostPingCog(commands.Cog, name="AntiGhostPing"):
                 message_content_display = f"[Contenait {len(message.attachments)} fichier(s) joint(s)]"
             else:
                 message_content_display = "[Contenu vide ou éphémère]"
-        
+
         # Limiter la longueur du contenu affiché pour éviter des embeds trop longs
-        max_content_length = 1000
         if len(message_content_display) > max_content_length:
             message_content_display = message_content_display[:max_content_length] + "..."
+        return message_content_display
 
+    def _build_alert_embed(self, messages: list[Message], count: int) -> Embed:
+        """
+        Construit l'embed d'alerte à partir des derniers messages fusionnés d'un même auteur.
+
+        Args:
+            messages: Les derniers messages supprimés (le plus récent en dernier).
+            count: Le nombre total de ghost pings fusionnés dans cette alerte.
+        """
+        message = messages[-1]
+        # Préparation du contenu du message pour l'embed
+        message_content_display = self._content_display(message)
 
         # Création de l'embed stylé
         embed_color = discord.Color.from_rgb(0, 255, 255) # Cyan électrique
@@ -128,12 +285,22 @@ class AntiGhostPingCog(commands.Cog, name="AntiGhostPing"):
             inline=False
         )
         
-        # Informations sur les mentions spécifiques (si plus d'une ou pas l'auteur)
-        mentioned_users = [m.mention for m in message.mentions if m != message.author and not m.bot]
+        # Informations sur les mentions spécifiques (si plus d'une ou pas l'auteur), sur tous les messages fusionnés
+        mentioned_users = list(dict.fromkeys(m.mention for msg in messages for m in msg.mentions if m != message.author and not m.bot))
         if mentioned_users:
+            mentioned_str = ", ".join(mentioned_users)
+            if len(mentioned_str) > 1024:
+                mentioned_str = mentioned_str[:1020] + "..."
             embed.add_field(
                 name="🎯 Cible(s) du Ping Fantôme:",
-                value=", ".join(mentioned_users),
+                value=mentioned_str,
+                inline=False
+            )
+
+        if count > 1:
+            embed.add_field(
+                name="🔁 Récidive:",
+                value=f"{count} ghost pings de cet auteur dans ce canal (dernier message affiché).",
                 inline=False
             )
 
@@ -141,23 +308,358 @@ class AntiGhostPingCog(commands.Cog, name="AntiGhostPing"):
             text=f"Système de détection v2.1 | ID Auteur: {message.author.id}",
             icon_url="https://cdn.discordapp.com/emojis/797907288890671104.png?v=1" # Un emoji de radar ou tech
         )
+        return embed
+
+    @commands.Cog.listener()
+    async def on_message_delete(self, message: Message):
+        # Log de base pour le débogage
+        # logger.info(f"Message supprimé (ID: {message.id}) par {message.author} dans {message.channel.name}. Contenu: '{message.content}'")
 
+        # 1. Ignorer les messages hors des serveurs (DMs)
+        if not message.guild:
+            return
 
+        # 2 à 5. Filtres sur les mentions et l'auteur (sans appel REST)
+        if not self._is_ghost_ping_candidate(message):
+            return
+
+        # 6. Vérification par log d'audit : le message a-t-il été supprimé par quelqu'un d'autre ?
+        # Les recherches passent par le cache pour ne pas faire un appel REST par message.
         try:
-            await message.channel.send(embed=embed)
-            logger.info(f"AntiGhostPing: Embed stylé envoyé pour {message.author.name} dans {message.channel.name}.")
+            if message.guild.me.guild_permissions.view_audit_log:
+                entry = await self.audit_log_cache.find_deleter(message.guild, message.author.id, message.channel.id)
+                if entry and entry.deleter_id != message.author.id:
+                    logger.debug(f"AntiGhostPing: Ignoré (log d'audit indique suppression par {entry.deleter_name} != auteur {message.author.name})")
+                    return
+            else:
+                logger.warning(f"AntiGhostPing [{message.guild.name}]: Permission 'View Audit Log' manquante.")
         except discord.Forbidden:
-            logger.warning(f"AntiGhostPing: Impossible d'envoyer l'embed stylé dans {message.channel.name} (permissions manquantes).")
+            logger.warning(f"AntiGhostPing [{message.guild.name}]: Accès interdit aux logs d'audit.")
         except Exception as e:
-            logger.error(f"AntiGhostPing: Erreur lors de l'envoi de l'embed stylé: {type(e).__name__} - {e}")
+            logger.error(f"AntiGhostPing [{message.guild.name}]: Erreur lors de la vérification du log d'audit: {type(e).__name__} - {e}")
+
+        # Si on arrive ici, c'est un ghost ping potentiel
+        logger.info(f"AntiGhostPing: Ghost ping potentiel détecté de {message.author.name} dans {message.channel.name}")
+        if self.incident_store:
+            self.incident_store.record(Incident.from_message(message))
+
+        # Envoi via l'ordonnanceur : les ghost pings répétés d'un même auteur dans ce canal
+        # sont fusionnés dans un seul embed modifié sur place, au rythme du seau à jetons.
+        if self.alert_scheduler.submit(message.channel, message.author.id, message, self._build_alert_embed):
+            logger.info(f"AntiGhostPing: Alerte planifiée pour {message.author.name} dans {message.channel.name}.")
+        else:
+            logger.warning(f"AntiGhostPing: Alerte abandonnée pour {message.author.name} dans {message.channel.name} (file pleine).")
+
+    @commands.Cog.listener()
+    async def on_message(self, message: Message):
+        # Alimenter le cache des mentions (filtres bon marché uniquement : le reste est vérifié à la suppression)
+        if self.mention_cache and message.mentions and message.guild and not message.author.bot:
+            # L'exemption des modérateurs est appliquée ici : l'auteur est un Member à la réception, alors que
+            # _resolve_record ne retrouve souvent qu'un User (fetch_user) sans cache des membres
+            if isinstance(message.author, discord.Member) and message.author.guild_permissions.manage_messages:
+                return
+            self.mention_cache.add(message)
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        # Un message modifié pour retirer ses mentions ne doit plus être signalé
+        if self.mention_cache and payload.guild_id and 'mentions' in payload.data and not payload.data['mentions']:
+            self.mention_cache.discard(payload.guild_id, payload.message_id)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        """Résout les suppressions de messages absents du cache de discord.py grâce au cache des mentions."""
+        if not self.mention_cache or payload.guild_id is None:
+            return
+        record = self.mention_cache.pop(payload.guild_id, payload.message_id)
+        if payload.cached_message is not None or record is None:
+            return  # Déjà traité par on_message_delete, ou message sans mention
+
+        message = await self._resolve_record(record)
+        if message is not None:
+            await self.on_message_delete(message)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        if self.mention_cache:
+            self.mention_cache.remove_guild(guild.id)
+
+    async def _resolve_record(self, record: MentionRecord) -> _CachedMessageView | None:
+        """Reconstruit une vue de message depuis le cache des mentions (membres en cache, sinon fetch concurrent)."""
+        views = await self._resolve_records(record.guild_id, [record])
+        return views[0] if views else None
+
+    async def _resolve_records(self, guild_id: int, records: list[MentionRecord]) -> list[_CachedMessageView]:
+        """
+        Reconstruit les vues de plusieurs enregistrements d'une guilde : les utilisateurs absents du cache
+        sont récupérés une seule fois chacun, en parallèle, pour tout le lot.
+        """
+        guild = self.bot.get_guild(guild_id)
+        if guild is None or not records:
+            return []
+
+        user_ids = {user_id for record in records for user_id in (record.author_id, *record.mention_ids)}
+        users = {user_id: guild.get_member(user_id) or self.bot.get_user(user_id) for user_id in user_ids}
+        missing = [user_id for user_id, user in users.items() if user is None]
+        if missing:
+            results = await asyncio.gather(*(self.bot.fetch_user(user_id) for user_id in missing), return_exceptions=True)
+            for user_id, result in zip(missing, results):
+                if not isinstance(result, BaseException):
+                    users[user_id] = result
+
+        views = []
+        for record in records:
+            channel = guild.get_channel_or_thread(record.channel_id)
+            author = users.get(record.author_id)
+            if channel is None:
+                continue
+            if author is None:
+                logger.debug(f"AntiGhostPing: Auteur {record.author_id} introuvable pour le message {record.message_id}")
+                continue
+            mentions = [users[user_id] for user_id in record.mention_ids if users.get(user_id) is not None]
+            views.append(_CachedMessageView(record, guild, channel, author, mentions))
+        return views
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        """
+        Traite une suppression en masse (purge) comme un seul lot :
+        un seul filtrage, une seule vérification du log d'audit et au plus une alerte récapitulative.
+        """
+        if payload.guild_id is None:
+            return
+
+        messages = list(payload.cached_messages)
+        if self.mention_cache:
+            # Compléter avec les messages sortis du cache de discord.py mais gardés par le cache des mentions
+            # (résolus en une fois pour tout le lot, pas un appel REST par message)
+            cached_ids = {m.id for m in messages}
+            records = []
+            for message_id in payload.message_ids:
+                record = self.mention_cache.pop(payload.guild_id, message_id)
+                if record is not None and message_id not in cached_ids:
+                    records.append(record)
+            messages.extend(await self._resolve_records(payload.guild_id, records))
+
+        # 1. Filtrage en une seule passe : seuls les messages en cache avec mentions sont gardés
+        candidates = [m for m in messages if m.mentions and self._is_ghost_ping_candidate(m)]
+        if not candidates:
+            return
+
+        guild = self.bot.get_guild(payload.guild_id)
+        channel = guild.get_channel_or_thread(payload.channel_id) if guild else None
+        if channel is None:
+            return
+
+        # 2. Une seule vérification du log d'audit pour tout le lot :
+        # une purge faite par un modérateur n'est pas un ghost ping.
+        try:
+            if guild.me.guild_permissions.view_audit_log:
+                # Plusieurs entrées : une purge simultanée dans un autre salon peut être la plus récente.
+                # Seule une entrée de ce salon et contemporaine de l'événement compte.
+                author_ids = {m.author.id for m in candidates}
+                since = discord.utils.utcnow() - datetime.timedelta(seconds=BULK_AUDIT_WINDOW)
+                async for entry in guild.audit_logs(limit=5, action=AuditLogAction.message_bulk_delete):
+                    if entry.created_at < since:
+                        break  # Du plus récent au plus ancien : les suivantes sont plus anciennes encore
+                    if entry.user and entry.user.id not in author_ids and getattr(entry.target, 'id', None) == payload.channel_id:
+                        logger.debug(f"AntiGhostPing: Lot de {len(payload.message_ids)} messages ignoré (purge par {entry.user.name} dans {channel.name})")
+                        return
+            else:
+                logger.warning(f"AntiGhostPing [{guild.name}]: Permission 'View Audit Log' manquante.")
+        except discord.Forbidden:
+            logger.warning(f"AntiGhostPing [{guild.name}]: Accès interdit aux logs d'audit.")
+        except Exception as e:
+            logger.error(f"AntiGhostPing [{guild.name}]: Erreur lors de la vérification du log d'audit (lot): {type(e).__name__} - {e}")
+
+        logger.info(f"AntiGhostPing: {len(candidates)} ghost ping(s) potentiel(s) détecté(s) dans une suppression en masse dans {channel.name}")
+        if self.incident_store:
+            for message in candidates:
+                self.incident_store.record(Incident.from_message(message, source='bulk'))
+
+        # 3. Une seule alerte récapitulative pour le canal (fusionnée avec les lots suivants de la fenêtre)
+        render = lambda batches, count: self._build_bulk_summary_embed(channel, [m for batch in batches for m in batch])
+        if self.alert_scheduler.submit(channel, 'bulk', candidates, render):
+            logger.info(f"AntiGhostPing: Récapitulatif planifié pour {len(candidates)} message(s) dans {channel.name}.")
+        else:
+            logger.warning(f"AntiGhostPing: Récapitulatif abandonné dans {channel.name} (file pleine).")
+
+    def _build_bulk_summary_embed(self, channel, candidates: list[Message], max_lines: int = 10) -> Embed:
+        """Construit l'embed récapitulatif d'une suppression en masse (un champ par auteur, borné)."""
+        embed = Embed(
+            color=discord.Color.from_rgb(0, 255, 255), # Cyan électrique, comme l'alerte unitaire
+            timestamp=discord.utils.utcnow()
+        )
+        embed.set_author(name="🚨 ALERTE GHOST PING // SUPPRESSION EN MASSE 🚨", icon_url=self.bot.user.avatar.url if self.bot.user.avatar else None)
+        embed.description = f"{len(candidates)} message(s) avec mentions supprimé(s) dans {channel.mention}."
+
+        by_author: dict[int, list[Message]] = {}
+        for message in candidates:
+            by_author.setdefault(message.author.id, []).append(message)
+
+        for messages in list(by_author.values())[:max_lines]:
+            author = messages[0].author
+            targets = {m.mention for message in messages for m in message.mentions if m != author and not m.bot}
+            value = f"{len(messages)} message(s) | Cible(s): {', '.join(sorted(targets)) if targets else 'Aucune'}"
+            if len(value) > 1024:
+                value = value[:1020] + "..."
+            embed.add_field(name=f"🕵️‍♂️ {author.name} ({author.id})", value=value, inline=False)
+
+        if len(by_author) > max_lines:
+            embed.add_field(name="…", value=f"{len(by_author) - max_lines} autre(s) auteur(s) non affiché(s).", inline=False)
+
+        embed.set_footer(
+            text="Système de détection v2.1 | Mode lot",
+            icon_url="https://cdn.discordapp.com/emojis/797907288890671104.png?v=1"
+        )
+        return embed
+
+
+    @app_commands.command(name="ghostpings", description="Historique des ghost pings du serveur.")
+    @app_commands.describe(
+        author="Filtrer par auteur des ghost pings.",
+        target="Filtrer par personne mentionnée.",
+        days="Période en jours (30 par défaut)."
+    )
+    @app_commands.guild_only()
+    @app_commands.checks.has_permissions(manage_messages=True)
+    async def ghostpings(self, interaction: discord.Interaction, author: discord.User = None, target: discord.User = None,
+                         days: app_commands.Range[int, 1, 3650] = 30):
+        """Affiche les ghost pings enregistrés, filtrés par auteur et/ou cible, avec pagination."""
+        if self.incident_store is None:
+            await interaction.response.send_message("L'historique des ghost pings est désactivé.", ephemeral=True)
+            return
+        await interaction.response.defer(ephemeral=True)
+        response = await self.ghostpings_page(interaction, author.id if author else 0, target.id if target else 0, days, 0)
+        await interaction.followup.send(**response, ephemeral=True)
+
+    async def ghostpings_page(self, interaction: discord.Interaction, author_id: int, target_id: int, days: int, page: int) -> dict:
+        """Contenu (embed et boutons) d'une page de /ghostpings."""
+        since = discord.utils.utcnow().timestamp() - days * 86400
+        total, incidents = await self.incident_store.query(
+            interaction.guild_id, author_id=author_id or None, target_id=target_id or None, since=since,
+            limit=GHOSTPINGS_PAGE_SIZE, offset=page * GHOSTPINGS_PAGE_SIZE
+        )
+        pages = max(1, -(-total // GHOSTPINGS_PAGE_SIZE))
+        if page >= pages and total:
+            # La page demandée n'existe plus (purge) : afficher la dernière
+            return await self.ghostpings_page(interaction, author_id, target_id, days, pages - 1)
+
+        filters = [f"{days} dernier(s) jour(s)"]
+        if author_id:
+            filters.append(f"auteur <@{author_id}>")
+        if target_id:
+            filters.append(f"cible <@{target_id}>")
+        embed = Embed(
+            title="👻 Historique des ghost pings",
+            description=f"**{total}** ghost ping(s) | {', '.join(filters)}",
+            color=discord.Color.from_rgb(0, 255, 255)
+        )
+        for incident in incidents:
+            targets = ", ".join(f"<@{user_id}>" for user_id in incident.target_ids[:10]) or "Aucune"
+            content = discord.utils.escape_markdown(incident.content[:150]) or "[Contenu vide]"
+            embed.add_field(
+                name=f"#{incident.id} | {'Suppression en masse' if incident.source == 'bulk' else 'Message supprimé'}",
+                value=f"<t:{int(incident.created_at)}:f> dans <#{incident.channel_id}>\n"
+                      f"Auteur: <@{incident.author_id}> → {targets}\n> {content}"[:1024],
+                inline=False
+            )
+        if not incidents:
+            embed.add_field(name="Aucun incident", value="Aucun ghost ping ne correspond à ces critères.", inline=False)
+        embed.set_footer(text=f"Page {page + 1}/{pages}")
+        if pages <= 1:
+            # Les deux flèches auraient le même custom_id, ce que Discord refuse
+            return {'embed': embed}
+        return {'embed': embed, 'view': ghostpings_pagination_view(interaction.user.id, author_id, target_id, days, page, pages)}
+
+
+class RaidDetectionCog(commands.Cog, name="RaidDetection"):
+    """
+    Détecte les raids en temps réel (vagues d'arrivées, spam de mentions, messages copiés dans plusieurs salons).
+    Chaque dépassement de seuil est diffusé avec `bot.dispatch('raid_detected', event)` :
+    les autres cogs (ex: AdminCommands) y réagissent via `on_raid_detected`.
+    """
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.detector = RaidDetector.from_config(config.raid_detection)
+        self._sweep_task: asyncio.Task | None = None
+        logger.info("Cog RaidDetection initialisé.")
+
+    async def cog_load(self):
+        state = take_handoff(self.bot, self.qualified_name)
+        if state is not None:
+            # Rechargement à chaud : les fenêtres glissantes en cours ne repartent pas de zéro
+            self.detector = state['detector']
+        if not self.bot.intents.members:
+            logger.warning(
+                "RaidDetection: L'intent des membres est désactivé, les vagues d'arrivées ne seront pas détectées "
+                "(profil de cache 'moderation' ou 'full' requis)."
+            )
+        self._sweep_task = asyncio.create_task(self._sweep_loop())
+
+    def cog_export_state(self) -> dict:
+        """État repris par la nouvelle instance lors d'un rechargement à chaud (voir utils/hot_reload.py)."""
+        return {'detector': self.detector}
+
+    def cog_unload(self):
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+        logger.info(f"RaidDetection: Statistiques: {self.detector.stats()}")
+
+    @commands.Cog.listener()
+    async def on_config_reload(self, old, new, changed: frozenset[str]):
+        if 'raid_detection' in changed:
+            # Les fenêtres peuvent avoir changé de taille : les compteurs repartent de zéro
+            self.detector = RaidDetector.from_config(new.raid_detection)
+            logger.info("RaidDetection: Seuils rechargés depuis la configuration.")
+
+    async def _sweep_loop(self):
+        """Libère périodiquement l'état des serveurs inactifs."""
+        while True:
+            await asyncio.sleep(300)
+            self.detector.sweep()
+
+    def _dispatch(self, event):
+        guild = self.bot.get_guild(event.guild_id)
+        logger.warning(
+            f"RaidDetection [{guild.name if guild else event.guild_id}]: Seuil '{event.kind}' dépassé "
+            f"({event.value}/{event.threshold}, {len(event.user_ids)} utilisateur(s) impliqué(s))."
+        )
+        self.bot.dispatch('raid_detected', event)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        if member.bot:
+            return
+        event = self.detector.record_join(member.guild.id, member.id)
+        if event is not None:
+            self._dispatch(event)
+
+    @commands.Cog.listener()
+    async def on_message(self, message: Message):
+        if not message.guild or message.author.bot or message.webhook_id:
+            return
+        # Les modérateurs ne sont pas analysés (annonces, mentions de rôles légitimes)
+        if isinstance(message.author, discord.Member) and message.author.guild_permissions.manage_messages:
+            return
+        for event in self.detector.record_message(message):
+            self._dispatch(event)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.detector.remove_guild(guild.id)
 
 
 async def setup(bot: commands.Bot):
     """
-    Charge le cog AntiGhostPing (version stylée).
+    Charge le cog AntiGhostPing (version stylée) et, s'il est activé, le cog RaidDetection.
 
     Args:
         bot: L'instance du bot Discord.
     """
     await bot.add_cog(AntiGhostPingCog(bot))
-    logger.info("Cog AntiGhostPing [Stylé] chargé avec succès.")
\ No newline at end of file
+    logger.info("Cog AntiGhostPing [Stylé] chargé avec succès.")
+    if config.raid_detection.get('enabled', True):
+        await bot.add_cog(RaidDetectionCog(bot))
+        logger.info("Cog RaidDetection chargé avec succès.")
\ No newline at end of file
@@ -6,132 +6,20 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import logging
-import ast  # Pour l'analyse de code
-import io   # Pour capturer stdout
-import contextlib # Pour redirect_stdout
-import traceback # Pour les erreurs détaillées
+import io   # Pour les sorties jointes en fichier
 import asyncio
-import concurrent.futures # Pour ThreadPoolExecutor
-import math # Exemple de module sûr
-import datetime # Exemple de module sûr
-import random # Exemple de module sûr
+import config
+from utils.checks import is_bot_owner
+from utils.job_queue import FairJobQueue, QueueFull, UserLimitReached
+from utils.hot_reload import handoff_pending, take_handoff
+from utils.lazy import LazyFeature
 
 # Configuration du logger
 logger = logging.getLogger('discord.general_commands')
 logger.setLevel(logging.DEBUG) # Mettez INFO en production si DEBUG est trop verbeux
 
-# --- Définitions pour l'analyse et l'exécution sécurisée ---
-
-# Modules dont l'import direct est interdit
-DISALLOWED_MODULES  = {
-    'os', 'subprocess', 'sys', 'shutil', 'ctypes', 'socket', 'requests',
-    'pickle', 'marshal', 'importlib', 'ptrace', 'fcntl', 'urllib',
-    '_thread', 'threading', 'multiprocessing', 'asyncio' # Éviter la manipulation de l'event loop du bot
-}
-
-# Fonctions/builtins dont l'appel direct est interdit
-DISALLOWED_BUILTINS_CALLS = {
-    'eval', 'exec', 'open', '__import__', 'compile', 'input', 'exit', 'quit',
-    'breakpoint', 'memoryview'
-}
-
-# Noms dont l'utilisation directe ou l'accès à des attributs est suspect
-DISALLOWED_NAMES_ATTRIBUTES = {
-    '__builtins__', '__class__', '__subclasses__', '__globals__', '__code__',
-    '__mro__', '__bases__', '__dict__', 'system', 'remove', 'unlink', 'rmdir',
-    'listdir', 'popen', 'call', 'run', 'getoutput', 'check_output', 'path',
-    'start_new_thread', 'fork'
-}
-
-# Builtins autorisés dans l'environnement d'exécution
-ALLOWED_BUILTINS = {
-    'print': print, 'len': len, 'range': range, 'str': str, 'int': int, 'float': float,
-    'list': list, 'dict': dict, 'set': set, 'tuple': tuple, 'bool': bool,
-    'abs': abs, 'round': round, 'max': max, 'min': min, 'sum': sum,
-    'True': True, 'False': False, 'None': None,
-    'isinstance': isinstance, 'issubclass': issubclass, 'callable': callable,
-    'repr': repr, 'ascii': ascii, 'format': format, 'hasattr': hasattr, # getattr est risqué
-    'sorted': sorted, 'zip': zip, 'enumerate': enumerate, 'reversed': reversed,
-    'all': all, 'any': any, 'map': map, 'filter': filter,
-    # Exclus : eval, exec, open, input, __import__, etc.
-    # ATTENTION: getattr peut être utilisé pour contourner certaines protections.
-}
-
-# Globals sûrs pour l'exécution
-SAFE_GLOBALS = {
-    "__builtins__": ALLOWED_BUILTINS,
-    "math": math,
-    "datetime": datetime,
-    "random": random,
-    # Vous pouvez ajouter ici d'autres modules/fonctions que vous jugez sûrs
-    # "votre_fonction_utile": votre_fonction_utile,
-}
-
-
-class CodeAnalyzer(ast.NodeVisitor):
-    def __init__(self):
-        self.violations = []
-        self.imported_modules_in_code = set() # Modules que le code essaie d'importer
-
-    def visit_Import(self, node: ast.Import):
-        for alias in node.names:
-            self.imported_modules_in_code.add(alias.name.split('.')[0]) # os.path -> os
-            if alias.name.split('.')[0] in DISALLOWED_MODULES:
-                self.violations.append(f"Import interdit du module : `{alias.name}`")
-        self.generic_visit(node)
-
-    def visit_ImportFrom(self, node: ast.ImportFrom):
-        if node.module: # peut être None pour `from . import x`
-            self.imported_modules_in_code.add(node.module.split('.')[0])
-            if node.module.split('.')[0] in DISALLOWED_MODULES:
-                self.violations.append(f"Import interdit depuis le module : `{node.module}`")
-        self.generic_visit(node)
-
-    def visit_Call(self, node: ast.Call):
-        func_name = ""
-        if isinstance(node.func, ast.Name): # Appel direct ex: print(), eval()
-            func_name = node.func.id
-            if func_name in DISALLOWED_BUILTINS_CALLS:
-                self.violations.append(f"Appel interdit à la fonction/built-in : `{func_name}`")
-        elif isinstance(node.func, ast.Attribute): # Appel de méthode ex: os.system()
-            # Tenter de reconstruire l'appel pour une meilleure détection
-            # `value` est l'objet, `attr` est l'attribut (méthode)
-            obj_name = ""
-            if isinstance(node.func.value, ast.Name):
-                obj_name = node.func.value.id
-
-            method_name = node.func.attr
-            full_call_str = f"{obj_name}.{method_name}" if obj_name else method_name
-
-            if obj_name in self.imported_modules_in_code and obj_name in DISALLOWED_MODULES:
-                 self.violations.append(f"Appel à une méthode du module interdit `{obj_name}` : `{method_name}`")
-            elif method_name in DISALLOWED_NAMES_ATTRIBUTES :
-                 self.violations.append(f"Appel de méthode potentiellement dangereux : `{full_call_str}`")
-
-
-        self.generic_visit(node)
-
-    def visit_Name(self, node: ast.Name): # Utilisation de variables/noms
-        if node.id in DISALLOWED_NAMES_ATTRIBUTES:
-            self.violations.append(f"Utilisation du nom potentiellement dangereux : `{node.id}`")
-        self.generic_visit(node)
-
-    def visit_Attribute(self, node: ast.Attribute): # Accès à des attributs ex: foo.bar
-        # node.value est l'objet, node.attr est l'attribut
-        attr_name = node.attr
-        obj_name = ""
-        if isinstance(node.value, ast.Name):
-            obj_name = node.value.id
-
-        if attr_name in DISALLOWED_NAMES_ATTRIBUTES:
-            self.violations.append(f"Accès à l'attribut potentiellement dangereux : `.{attr_name}`")
-
-        if obj_name in self.imported_modules_in_code and obj_name in DISALLOWED_MODULES:
-            self.violations.append(f"Accès à un attribut du module interdit `{obj_name}` : `.{attr_name}`")
-
-        self.generic_visit(node)
-
-# --- Fin des définitions ---
+# Taille maximale de la sortie affichée dans un champ d'embed (limite Discord : 1024 caractères)
+OUTPUT_FIELD_LIMIT = 950
 
 
 class GeneralCommands(commands.Cog):
@@ -140,42 +28,53 @@ class GeneralCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         logger.info(f"Cog GeneralCommands initialisé avec bot: {bot.user if bot.user else 'Non connecté'}")
-        # ThreadPoolExecutor pour exécuter le code de manière non bloquante
-        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
-
-
-    def cog_unload(self):
-        # S'assurer que l'executor est arrêté proprement
-        self.executor.shutdown(wait=True)
-
-    async def _analyze_code_ast(self, code_string: str) -> tuple[bool, list[str]]:
-        """Analyse le code avec AST pour détecter des patterns dangereux."""
-        try:
-            tree = ast.parse(code_string)
-            analyzer = CodeAnalyzer()
-            analyzer.visit(tree)
-            if analyzer.violations:
-                return False, analyzer.violations
-            return True, []
-        except SyntaxError as e:
-            return False, [f"Erreur de syntaxe dans le code fourni : {e}"]
-        except Exception as e:
-            logger.error(f"Erreur inattendue lors de l'analyse AST : {e}")
-            return False, ["Erreur interne lors de l'analyse du code."]
-
-    def _execute_code_in_thread(self, code_to_run_compiled, custom_globals, output_buffer):
-        """Fonction exécutée dans le thread."""
-        try:
-            with contextlib.redirect_stdout(output_buffer):
-                exec(code_to_run_compiled, custom_globals)
-            return output_buffer.getvalue(), None
-        except Exception: # Capturer toutes les exceptions d'exécution
-            # Renvoyer la trace complète dans la sortie standard (capturée)
-            # et aussi dans le message d'erreur pour plus de clarté.
-            tb_str = traceback.format_exc()
-            print(f"\n--- ERREUR D'EXÉCUTION ---\n{tb_str}") # Sera capturé par redirect_stdout
-            return output_buffer.getvalue(), tb_str
-
+        # Affichage progressif de la sortie pendant l'exécution
+        self.streaming = config.run.get('streaming', True)
+        self.stream_interval = config.run.get('stream_interval', 1.0)
+        # Analyse, cache et pool d'exécution de /run (utils/run_runtime.py) : importés et démarrés
+        # à la première exécution de /run, pas au chargement du cog
+        self.run_settings = config.run
+        self.run_runtime = LazyFeature('utils.run_runtime', 'RunRuntime', self.run_settings)
+        # File d'attente équitable : limite globale (taille du pool), limite par utilisateur et rejet si pleine
+        self.job_queue = FairJobQueue(
+            capacity=config.run.get('pool_size', 2),
+            max_pending=config.run.get('max_pending', 20),
+            per_user_limit=config.run.get('per_user_limit', 1),
+            per_user_pending=config.run.get('per_user_pending', 3),
+        )
+        # Arrêt de l'ancien pool après un rechargement qui ne l'a pas repris
+        self._retiring: asyncio.Task | None = None
+
+    async def cog_load(self):
+        state = take_handoff(self.bot, self.qualified_name)
+        if state is None:
+            return
+        if state['run_settings'] == self.run_settings:
+            # Rechargement à chaud : les exécutions en cours sur l'ancienne instance continuent
+            # avec le même pool, le même cache d'analyse et la même file
+            self.run_runtime = state['run_runtime']
+            self.job_queue = state['job_queue']
+        else:
+            # Clé "run" modifiée depuis le chargement précédent : nouveau pool et nouvelle file,
+            # l'ancien pool s'arrête après ses exécutions en cours
+            self._retiring = asyncio.create_task(state['run_runtime'].close())
+
+    def cog_export_state(self) -> dict:
+        """État repris par la nouvelle instance lors d'un rechargement à chaud (voir utils/hot_reload.py)."""
+        return {'run_settings': self.run_settings, 'run_runtime': self.run_runtime, 'job_queue': self.job_queue}
+
+    async def cog_unload(self):
+        # Arrêt non bloquant du pool, après les exécutions en cours ; rien à fermer si l'état a été remis
+        if not handoff_pending(self.bot, self.qualified_name):
+            await self.run_runtime.close()
+
+    @commands.Cog.listener()
+    async def on_config_reload(self, old, new, changed: frozenset[str]):
+        if 'run' in changed:
+            self.streaming = new.run.get('streaming', True)
+            self.stream_interval = new.run.get('stream_interval', 1.0)
+            # Le pool d'exécution et la file gardent leur taille jusqu'au rechargement du cog (/reload)
+            logger.info("Paramètres d'affichage de /run rechargés depuis la configuration.")
 
     @app_commands.command(name="ping", description="Commande simple pour tester si le bot répond.")
     async def ping(self, interaction: discord.Interaction):
@@ -222,16 +121,7 @@ class GeneralCommands(commands.Cog):
 
     # Fonction de vérification personnalisée pour le propriétaire
     async def is_bot_owner(self, interaction: discord.Interaction) -> bool:
-        if self.bot.owner_id:
-            return interaction.user.id == self.bot.owner_id
-        if self.bot.owner_ids:
-            return interaction.user.id in self.bot.owner_ids
-        # Si aucun owner_id(s) n'est défini, essayez de récupérer le propriétaire de l'application
-        # Cela peut être moins fiable si le bot est dans une équipe sans propriétaires explicitement définis.
-        app_info = await self.bot.application_info()
-        if app_info.team:
-            return interaction.user.id in [member.id for member in app_info.team.members]
-        return interaction.user.id == app_info.owner.id
+        return await is_bot_owner(self.bot, interaction)
 
     @app_commands.command(name="run", description="[DANGEREUX] Exécute du code Python (propriétaire du bot uniquement).")
     @app_commands.describe(code="Le bloc de code Python à exécuter.")
@@ -248,18 +138,44 @@ class GeneralCommands(commands.Cog):
             logger.warning(f"Tentative d'utilisation de /run par un non-propriétaire: {interaction.user} (ID: {interaction.user.id})")
             return
 
+        # Contrôle d'admission avant le defer : une demande rejetée ne garde pas d'interaction en attente
+        try:
+            self.job_queue.check_admission(interaction.user.id)
+        except QueueFull:
+            await interaction.response.send_message("⏳ La file d'exécution de /run est pleine, réessayez dans quelques instants.", ephemeral=True)
+            logger.warning(f"/run rejeté pour {interaction.user} : file pleine ({self.job_queue.pending} en attente)")
+            return
+        except UserLimitReached:
+            await interaction.response.send_message("⏳ Vous avez déjà trop d'exécutions en attente, patientez avant d'en lancer d'autres.", ephemeral=True)
+            return
+
         await interaction.response.defer(ephemeral=False) # Réponse initiale, peut prendre du temps
         logger.info(f"Commande /run invoquée par {interaction.user} (propriétaire). Code: {code[:100]}...")
 
-        # 1. Analyse statique du code
-        is_safe, violations = await self._analyze_code_ast(code)
-        if not is_safe:
+        # Premier /run : chargement de l'environnement d'exécution (import, démarrage du pool).
+        # En cas d'échec, le prochain /run retentera le chargement.
+        try:
+            runtime = await self.run_runtime.get()
+        except Exception as e:
+            logger.error(f"Impossible de charger l'environnement d'exécution de /run: {type(e).__name__} - {e}")
+            logger.exception("Trace complète de l'erreur de chargement de /run:")
+            embed = discord.Embed(
+                title="❌ Environnement d'exécution indisponible",
+                description=f"L'environnement d'exécution de /run n'a pas pu être chargé: `{type(e).__name__}: {str(e)[:300]}`\nRéessayez plus tard.",
+                color=discord.Color.red()
+            )
+            await interaction.followup.send(embed=embed)
+            return
+
+        # 1. Analyse statique et compilation du code (mises en cache)
+        analysis = runtime.analyze(code)
+        if not analysis.is_safe:
             # Limiter la taille du code à afficher
             code_display = code
             if len(code_display) > 1000:
                 code_display = code_display[:1000] + "\n... (code tronqué)"
 
-            violations_str = "\n- ".join(violations)
+            violations_str = "\n- ".join(analysis.violations)
             embed = discord.Embed(
                 title="❌ Analyse du Code Échouée",
                 color=discord.Color.red()
@@ -282,10 +198,8 @@ class GeneralCommands(commands.Cog):
             await interaction.followup.send(embed=embed)
             return
 
-        # 2. Compilation (rapide vérification de syntaxe supplémentaire)
-        try:
-            compiled_code = compile(code, '<discord_run_command>', 'exec')
-        except SyntaxError as e:
+        # 2. Erreurs détectées à la compilation
+        if analysis.compile_error:
             # Limiter la taille du code à afficher
             code_display = code
             if len(code_display) > 1000:
@@ -306,100 +220,46 @@ class GeneralCommands(commands.Cog):
             # Ajouter l'erreur de syntaxe
             embed.add_field(
                 name="⚠️ Erreur de Syntaxe",
-                value=f"```py\n{e}\n```",
+                value=f"```py\n{analysis.compile_error}\n```",
                 inline=False
             )
 
             await interaction.followup.send(embed=embed)
             return
 
-        # 3. Exécution du code dans un thread séparé
-        output_buffer = io.StringIO()
-        custom_globals = SAFE_GLOBALS.copy()
+        compiled_code = analysis.compiled
 
+        # 3. Attente d'une place d'exécution (tourniquet entre utilisateurs)
         try:
-            # Exécuter le code dans un thread pour éviter de bloquer la boucle d'événements
-            future = self.bot.loop.run_in_executor(
-                self.executor,
-                self._execute_code_in_thread,
-                compiled_code,
-                custom_globals,
-                output_buffer
-            )
-
-            # Attendre le résultat avec timeout
-            output, error = await asyncio.wait_for(future, timeout=5.0)
-
-            # Préparer la réponse
-            if output:
-                # Limiter la taille de la sortie
-                if len(output) > 1900:
-                    output = output[:1900] + "\n... (sortie tronquée)"
-
-                # Limiter la taille du code à afficher
-                code_display = code
-                if len(code_display) > 1000:
-                    code_display = code_display[:1000] + "\n... (code tronqué)"
-
-                embed = discord.Embed(
-                    title="✅ Code Exécuté",
-                    color=discord.Color.green()
-                )
+            await self.job_queue.acquire(interaction.user.id)
+        except (QueueFull, UserLimitReached):
+            await interaction.followup.send("⏳ La file d'exécution de /run est pleine, réessayez dans quelques instants.", ephemeral=True)
+            return
 
-                # Ajouter le code source
-                embed.add_field(
-                    name="📝 Code Source",
-                    value=f"```py\n{code_display}\n```",
-                    inline=False
-                )
+        # 4. Exécution du code dans un processus (ou un thread) séparé
+        stream_message = None
+        stream_task = None
+        file = None
+        try:
+            on_output = None
+            if runtime.sandbox_pool and self.streaming:
+                # Mode streaming : un message de suivi est modifié au fil de la sortie
+                stream_message = await interaction.followup.send(embed=self._build_running_embed(code, ""), wait=True)
+                live_output = []
+                output_event = asyncio.Event()
 
-                # Ajouter le résultat
-                embed.add_field(
-                    name="🔍 Résultat",
-                    value=f"```py\n{output}\n```",
-                    inline=False
-                )
+                def on_output(chunk: str):
+                    live_output.append(chunk)
+                    output_event.set()
 
-                if error:
-                    embed.add_field(
-                        name="⚠️ Erreur d'exécution",
-                        value=f"```py\n{error[:1000]}\n```",
-                        inline=False
-                    )
-                    embed.color = discord.Color.gold()
-            else:
-                # Limiter la taille du code à afficher
-                code_display = code
-                if len(code_display) > 1000:
-                    code_display = code_display[:1000] + "\n... (code tronqué)"
-
-                embed = discord.Embed(
-                    title="✅ Code Exécuté",
-                    color=discord.Color.green()
-                )
+                stream_task = asyncio.create_task(self._stream_output(stream_message, code, live_output, output_event))
 
-                # Ajouter le code source
-                embed.add_field(
-                    name="📝 Code Source",
-                    value=f"```py\n{code_display}\n```",
-                    inline=False
-                )
+            output, error = await runtime.execute(compiled_code, on_output=on_output)
 
-                # Ajouter le résultat
-                embed.add_field(
-                    name="🔍 Résultat",
-                    value="Le code a été exécuté sans sortie.",
-                    inline=False
-                )
-
-            await interaction.followup.send(embed=embed)
+            # Préparer la réponse (la sortie trop longue pour l'embed part en pièce jointe)
+            embed, file = self._build_result_embed(code, output, error)
 
         except asyncio.TimeoutError:
-            # Limiter la taille du code à afficher
-            code_display = code
-            if len(code_display) > 1000:
-                code_display = code_display[:1000] + "\n... (code tronqué)"
-
             embed = discord.Embed(
                 title="⏱️ Timeout",
                 description="L'exécution du code a pris trop de temps et a été interrompue.",
@@ -409,20 +269,14 @@ class GeneralCommands(commands.Cog):
             # Ajouter le code source
             embed.add_field(
                 name="📝 Code Source",
-                value=f"```py\n{code_display}\n```",
+                value=f"```py\n{self._code_display(code)}\n```",
                 inline=False
             )
 
-            await interaction.followup.send(embed=embed)
-
         except Exception as e:
+            import traceback # Chargé seulement en cas d'erreur
             logger.error(f"Erreur inattendue lors de l'exécution du code: {e}")
 
-            # Limiter la taille du code à afficher
-            code_display = code
-            if len(code_display) > 1000:
-                code_display = code_display[:1000] + "\n... (code tronqué)"
-
             embed = discord.Embed(
                 title="❌ Erreur Inattendue",
                 color=discord.Color.red()
@@ -431,19 +285,154 @@ class GeneralCommands(commands.Cog):
             # Ajouter le code source
             embed.add_field(
                 name="📝 Code Source",
-                value=f"```py\n{code_display}\n```",
+                value=f"```py\n{self._code_display(code)}\n```",
                 inline=False
             )
 
             # Ajouter l'erreur
             embed.add_field(
                 name="⚠️ Erreur",
-                value=f"```py\n{traceback.format_exc()[:1500]}\n```",
+                value=f"```py\n{traceback.format_exc()[:1000]}\n```",
                 inline=False
             )
 
-            await interaction.followup.send(embed=embed)
+        finally:
+            if stream_task:
+                stream_task.cancel()
+            self.job_queue.release(interaction.user.id)
 
+        # Envoyer le résultat final (en remplaçant le message de streaming s'il existe)
+        try:
+            if stream_message:
+                await stream_message.edit(embed=embed, attachments=[file] if file else [])
+            elif file:
+                await interaction.followup.send(embed=embed, file=file)
+            else:
+                await interaction.followup.send(embed=embed)
+        except discord.HTTPException as e:
+            logger.error(f"Erreur lors de l'envoi du résultat de /run: {type(e).__name__} - {e}")
+
+    @app_commands.command(name="run-status", description="Affiche l'état de la file d'exécution de /run (propriétaire du bot uniquement).")
+    async def run_status(self, interaction: discord.Interaction):
+        """Affiche la profondeur de la file, les exécutions en cours et les temps d'attente."""
+        if not await self.is_bot_owner(interaction):
+            await interaction.response.send_message(
+                "❌ Désolé, cette commande est réservée au(x) propriétaire(s) du bot.",
+                ephemeral=True
+            )
+            return
+
+        queue_stats = self.job_queue.stats()
+        embed = discord.Embed(
+            title="📊 État de la file /run",
+            color=discord.Color.blurple()
+        )
+        embed.add_field(name="⚙️ En cours", value=f"{queue_stats['running']} / {queue_stats['capacity']}", inline=True)
+        embed.add_field(name="⏳ En attente", value=f"{queue_stats['pending']} / {queue_stats['max_pending']}", inline=True)
+        embed.add_field(name="👥 Utilisateurs", value=f"{queue_stats['users_running']} actif(s), {queue_stats['users_waiting']} en attente", inline=True)
+        embed.add_field(name="⏱️ Attente p50", value=f"{queue_stats['wait_p50'] * 1000:.0f} ms", inline=True)
+        embed.add_field(name="⏱️ Attente p95", value=f"{queue_stats['wait_p95'] * 1000:.0f} ms", inline=True)
+        embed.add_field(name="✅ Admises / ❌ Rejetées", value=f"{queue_stats['admitted']} / {queue_stats['rejected']}", inline=True)
+        runtime = self.run_runtime.instance
+        if runtime is None:
+            embed.add_field(name="🧪 Environnement d'exécution", value="Non chargé (démarré à la première exécution de /run).", inline=False)
+        else:
+            if runtime.sandbox_pool:
+                pool_stats = runtime.sandbox_pool.stats()
+                embed.add_field(
+                    name="🧪 Pool de processus",
+                    value=f"{pool_stats['workers']} worker(s), {pool_stats['idle']} libre(s) | Timeouts: {pool_stats['timeouts']} | Crashs: {pool_stats['crashes']}",
+                    inline=False
+                )
+            cache_stats = runtime.code_cache.stats()
+            embed.add_field(
+                name="🗃️ Cache d'analyse",
+                value=f"{cache_stats['entries']} entrée(s), {cache_stats['bytes'] // 1024} Ko | Taux de succès: {cache_stats['hit_rate']:.0%}",
+                inline=False
+            )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    def _code_display(self, code: str) -> str:
+        """Limite la taille du code à afficher (le champ entier, avec les balises ```py, tient dans les 1024 caractères)."""
+        if len(code) > 1000:
+            return code[:990] + "\n... (code tronqué)"
+        return code
+
+    def _build_running_embed(self, code: str, output: str) -> discord.Embed:
+        """Embed affiché pendant l'exécution en mode streaming (fin de la sortie partielle)."""
+        embed = discord.Embed(
+            title="⏳ Exécution en cours...",
+            color=discord.Color.blurple()
+        )
+        embed.add_field(
+            name="📝 Code Source",
+            value=f"```py\n{self._code_display(code)}\n```",
+            inline=False
+        )
+        if len(output) > OUTPUT_FIELD_LIMIT:
+            output = "...\n" + output[-OUTPUT_FIELD_LIMIT:]
+        embed.add_field(
+            name="🔍 Sortie (en direct)",
+            value=f"```py\n{output}\n```" if output else "Aucune sortie pour le moment.",
+            inline=False
+        )
+        return embed
+
+    async def _stream_output(self, message: discord.WebhookMessage, code: str, live_output: list[str], output_event: asyncio.Event):
+        """Modifie le message de streaming au plus une fois par `stream_interval` secondes."""
+        while True:
+            await output_event.wait()
+            output_event.clear()
+            try:
+                await message.edit(embed=self._build_running_embed(code, "".join(live_output)))
+            except discord.HTTPException as e:
+                logger.debug(f"Mise à jour du streaming de /run échouée: {type(e).__name__} - {e}")
+            await asyncio.sleep(self.stream_interval)
+
+    def _build_result_embed(self, code: str, output: str, error: str | None) -> tuple[discord.Embed, discord.File | None]:
+        """Construit l'embed de résultat ; une sortie trop longue pour l'embed est jointe en fichier."""
+        embed = discord.Embed(
+            title="✅ Code Exécuté",
+            color=discord.Color.green()
+        )
+
+        # Ajouter le code source
+        embed.add_field(
+            name="📝 Code Source",
+            value=f"```py\n{self._code_display(code)}\n```",
+            inline=False
+        )
+
+        file = None
+        if not output:
+            # Ajouter le résultat
+            embed.add_field(
+                name="🔍 Résultat",
+                value="Le code a été exécuté sans sortie.",
+                inline=False
+            )
+            return embed, file
+
+        output_display = output
+        if len(output) > OUTPUT_FIELD_LIMIT:
+            output_display = output[:OUTPUT_FIELD_LIMIT] + "\n... (sortie complète en pièce jointe)"
+            file = discord.File(io.BytesIO(output.encode('utf-8')), filename="sortie.txt")
+
+        # Ajouter le résultat
+        embed.add_field(
+            name="🔍 Résultat",
+            value=f"```py\n{output_display}\n```",
+            inline=False
+        )
+
+        if error:
+            embed.add_field(
+                name="⚠️ Erreur d'exécution",
+                value=f"```py\n{error[-1000:]}\n```",
+                inline=False
+            )
+            embed.color = discord.Color.gold()
+        return embed, file
 
 async def setup(bot):
     """Fonction d'installation du cog, appelée par bot.load_extension()."""
@@ -7,22 +7,211 @@ import discord
 from discord.ext import commands
 from discord import app_commands, Embed, Color
 import datetime
-from collections import defaultdict # Pour grouper les commandes par cog
 import logging # Ajout du logger
+import asyncio
+import config
+
+from utils.bot_stats import BotStatsService
+from utils.help_index import HelpIndex
+from utils.hot_reload import take_handoff
+from utils.embed_cache import EmbedCache
 
 logger = logging.getLogger('discord.info_commands') # Logger spécifique au cog
 
+class HelpPageButton(discord.ui.DynamicItem[discord.ui.Button], template=r'help:page:(?P<user_id>[0-9]+):(?P<page>[0-9]+)'):
+    """
+    Bouton de pagination de /help. Tout l'état (auteur, page demandée) est dans le custom_id :
+    le bouton fonctionne après un redémarrage, et un changement de page ne rend que la page demandée.
+    """
+
+    def __init__(self, user_id: int, page: int, label: str = "·", disabled: bool = False):
+        super().__init__(discord.ui.Button(
+            label=label,
+            style=discord.ButtonStyle.secondary,
+            custom_id=f"help:page:{user_id}:{page}",
+            disabled=disabled
+        ))
+        self.user_id = user_id
+        self.page = page
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(int(match['user_id']), int(match['page']), item.label)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id == self.user_id:
+            return True
+        await interaction.response.send_message("Seul l'auteur de la commande peut changer de page. Utilisez `/help` pour votre propre liste.", ephemeral=True)
+        return False
+
+    async def callback(self, interaction: discord.Interaction):
+        cog = interaction.client.get_cog('InfoCommands')
+        if cog is None:
+            await interaction.response.send_message("L'aide n'est pas disponible pour le moment.", ephemeral=True)
+            return
+        await interaction.response.edit_message(**cog.help_listing(interaction, self.page))
+
+
+def help_pagination_view(user_id: int, page: int, pages: int) -> discord.ui.View:
+    """Boutons précédent / position / suivant pour la page `page` (commençant à 0) sur `pages`."""
+    view = discord.ui.View(timeout=None)
+    view.add_item(HelpPageButton(user_id, max(page - 1, 0), "◀", disabled=page == 0))
+    view.add_item(discord.ui.Button(label=f"{page + 1}/{pages}", custom_id=f"help:position:{user_id}", disabled=True))
+    view.add_item(HelpPageButton(user_id, min(page + 1, pages - 1), "▶", disabled=page >= pages - 1))
+    # Les clics sont traités par HelpPageButton (enregistré dans cog_load) : la vue n'a pas besoin
+    # d'être gardée en mémoire pour chaque message envoyé
+    view.stop()
+    return view
+
+
 class InfoCommands(commands.Cog):
     """Commandes fournissant des informations et la commande d'aide."""
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        # Totaux et propriétaires maintenus par événements : /botinfo ne parcourt rien et n'appelle pas l'API
+        self.stats = BotStatsService(bot)
+        bot.bot_stats = self.stats
+        # Index de l'aide, reconstruit uniquement quand l'arbre de commandes change
+        self.help_index = HelpIndex(bot)
+        # Rendus de /serverinfo et /userinfo, invalidés par les événements de serveur, salons, rôles et membres
+        embed_cache_config = config.info_commands.get('embed_cache', {})
+        self.embed_cache = EmbedCache(
+            ttl=embed_cache_config.get('ttl', 60.0),
+            max_entries=embed_cache_config.get('max_entries', 1024),
+            max_bytes=embed_cache_config.get('max_bytes', 2 * 1024 * 1024),
+        )
         logger.info("Cog InfoCommands initialisé.") # Log d'initialisation
 
+    async def cog_load(self):
+        # Boutons de pagination de /help, y compris ceux des messages envoyés avant un redémarrage
+        self.bot.add_dynamic_items(HelpPageButton)
+        state = take_handoff(self.bot, self.qualified_name)
+        if state is not None:
+            # Rechargement à chaud : propriétaires en cache et compteurs repris ; les rendus en cache
+            # sont vidés car le code qui les produit a pu changer
+            self.stats = state['stats']
+            self.bot.bot_stats = self.stats
+            self.help_index = state['help_index']
+            self.embed_cache = state['embed_cache']
+            self.embed_cache.invalidate_all()
+        command_metrics = getattr(self.bot.tree, 'metrics', None)
+        if command_metrics is not None:
+            command_metrics.register_cache('info_embeds', self.embed_cache.stats)
+        if self.bot.is_ready(): # Rechargement du cog après la connexion (événements manqués pendant le remplacement)
+            self.stats.rebuild()
+
+    def cog_export_state(self) -> dict:
+        """État repris par la nouvelle instance lors d'un rechargement à chaud (voir utils/hot_reload.py)."""
+        return {'stats': self.stats, 'help_index': self.help_index, 'embed_cache': self.embed_cache}
+
+    @commands.Cog.listener()
+    async def on_config_reload(self, old, new, changed: frozenset[str]):
+        if 'info_commands' in changed:
+            embed_cache_config = new.info_commands.get('embed_cache', {})
+            self.embed_cache.ttl = embed_cache_config.get('ttl', 60.0)
+            self.embed_cache.max_entries = embed_cache_config.get('max_entries', 1024)
+            self.embed_cache.max_bytes = embed_cache_config.get('max_bytes', 2 * 1024 * 1024)
+            self.embed_cache.invalidate_all()
+
+    async def cog_unload(self):
+        self.bot.remove_dynamic_items(HelpPageButton)
+        command_metrics = getattr(self.bot.tree, 'metrics', None)
+        if command_metrics is not None:
+            command_metrics.unregister_cache('info_embeds')
+        logger.info(f"Statistiques du cache des embeds d'information: {self.embed_cache.stats()}")
+        if getattr(self.bot, 'bot_stats', None) is self.stats:
+            del self.bot.bot_stats
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # Rappelé à chaque reconnexion complète : recalcul des totaux et préchargement des propriétaires
+        self.stats.rebuild()
+        asyncio.create_task(self.stats.owners())
+        self.help_index.ensure() # Construit l'index une fois tous les cogs chargés et l'avatar connu
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        self.stats.guild_joined(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.stats.guild_removed(guild)
+        self.embed_cache.invalidate_guild(guild.id)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        self.stats.member_delta(member.guild, 1)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        self.stats.member_delta(member.guild, -1)
+        self.embed_cache.invalidate(('member', member.guild.id, member.id))
+
+    # --- Invalidation du cache des embeds de /serverinfo et /userinfo ---
+
+    @commands.Cog.listener()
+    async def on_guild_update(self, before: discord.Guild, after: discord.Guild):
+        self.embed_cache.invalidate_guild(after.id, members=False)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel):
+        self.embed_cache.invalidate_guild(channel.guild.id, members=False)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        self.embed_cache.invalidate_guild(channel.guild.id, members=False)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        if before.type != after.type: # Seul le nombre de salons textuels et vocaux est affiché
+            self.embed_cache.invalidate_guild(after.guild.id, members=False)
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: discord.Role):
+        self.embed_cache.invalidate_guild(role.guild.id, members=False)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        self.embed_cache.invalidate_guild(role.guild.id) # Nombre de rôles et rôles des membres
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        self.embed_cache.invalidate_guild(after.guild.id) # Nom, couleur et position affichés dans /userinfo
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        self.embed_cache.invalidate(('member', after.guild.id, after.id))
+        if after.guild.owner_id == after.id:
+            self.embed_cache.invalidate(('guild', after.guild.id))
+
+    @commands.Cog.listener()
+    async def on_user_update(self, before: discord.User, after: discord.User):
+        self.embed_cache.invalidate_user(after.id)
+
     # ... (vos commandes serverinfo, userinfo, botinfo restent les mêmes,
     #      j'ai juste ajouté le logger.info dans __init__ et importé logging)
     # Vous pouvez les améliorer comme suggéré dans la réponse précédente avec format_dt etc. si vous le souhaitez.
 
+    async def _resolve_member(self, guild: discord.Guild, user_id: int) -> discord.Member | None:
+        """Membre depuis le cache, ou récupéré via l'API si le profil de cache ne garde pas les membres."""
+        member = guild.get_member(user_id)
+        if member is not None:
+            return member
+        try:
+            return await guild.fetch_member(user_id)
+        except discord.NotFound:
+            return None
+        except discord.HTTPException as e:
+            logger.warning(f"Impossible de récupérer le membre {user_id} du serveur {guild.id}: {type(e).__name__} - {e}")
+            return None
+
+    def _finish_embed(self, embed: Embed, interaction: discord.Interaction) -> Embed:
+        """Ajoute ce qui est propre à chaque appel (pied de page, horodatage) à un embed rendu ou en cache."""
+        embed.timestamp = datetime.datetime.now(datetime.timezone.utc)
+        embed.set_footer(text=f"Demandé par {interaction.user.display_name}", icon_url=interaction.user.display_avatar.url if interaction.user.display_avatar else None)
+        return embed
+
     @app_commands.command(name="serverinfo", description="Affiche des informations sur le serveur.")
     async def server_info(self, interaction: discord.Interaction):
         guild = interaction.guild
@@ -30,39 +219,62 @@ class InfoCommands(commands.Cog):
             await interaction.response.send_message("Cette commande ne peut être utilisée que sur un serveur.", ephemeral=True)
             return
 
+        key = ('guild', guild.id)
+        embed = self.embed_cache.get(key)
+        if embed is None:
+            embed = await self._render_server_embed(guild)
+            self.embed_cache.put(key, embed)
+        await interaction.response.send_message(embed=self._finish_embed(embed, interaction))
+
+    async def _render_server_embed(self, guild: discord.Guild) -> Embed:
         embed = Embed(
             title=f"⚙️ Informations sur {guild.name}",
             description=guild.description if guild.description else "Aucune description de serveur.",
-            color=Color.blue(),
-            timestamp=datetime.datetime.now(datetime.timezone.utc)
+            color=Color.blue()
         )
         if guild.icon:
             embed.set_thumbnail(url=guild.icon.url)
-        embed.add_field(name="👑 Propriétaire", value=guild.owner.mention if guild.owner else "Inconnu", inline=True)
+        # Sans cache des membres, le propriétaire et le nombre de membres sont récupérés à la demande
+        owner = guild.owner or (await self._resolve_member(guild, guild.owner_id) if guild.owner_id else None)
+        member_count = guild.member_count
+        if member_count is None:
+            try:
+                member_count = (await self.bot.fetch_guild(guild.id, with_counts=True)).approximate_member_count
+            except discord.HTTPException as e:
+                logger.warning(f"Impossible de récupérer le nombre de membres du serveur {guild.id}: {type(e).__name__} - {e}")
+        embed.add_field(name="👑 Propriétaire", value=owner.mention if owner else "Inconnu", inline=True)
         embed.add_field(name="🆔 ID du Serveur", value=guild.id, inline=True)
         embed.add_field(name="📅 Créé le", value=discord.utils.format_dt(guild.created_at, style='D'), inline=True)
-        embed.add_field(name="👥 Membres", value=str(guild.member_count), inline=True)
+        embed.add_field(name="👥 Membres", value=str(member_count) if member_count is not None else "Inconnu", inline=True)
         embed.add_field(name="💬 Canaux", value=str(len(guild.text_channels) + len(guild.voice_channels)), inline=True)
         embed.add_field(name="🏷️ Rôles", value=str(len(guild.roles)), inline=True)
         if guild.banner:
             embed.set_image(url=guild.banner.url)
-        embed.set_footer(text=f"Demandé par {interaction.user.display_name}", icon_url=interaction.user.display_avatar.url if interaction.user.display_avatar else None)
-        await interaction.response.send_message(embed=embed)
+        return embed
 
     @app_commands.command(name="userinfo", description="Affiche des informations sur un utilisateur.")
     @app_commands.describe(member="Le membre dont on veut les informations (par défaut: vous-même).")
     async def user_info(self, interaction: discord.Interaction, member: discord.Member = None):
         target_member = member or interaction.user
-
+        key = ('member', interaction.guild.id if interaction.guild else None, target_member.id)
+        embed = self.embed_cache.get(key)
+        if embed is None:
+            if interaction.guild and not isinstance(target_member, discord.Member):
+                # Membre absent du cache (profil minimal) : récupération à la demande
+                target_member = await self._resolve_member(interaction.guild, target_member.id) or target_member
+            embed = self._render_user_embed(target_member)
+            self.embed_cache.put(key, embed)
+        await interaction.response.send_message(embed=self._finish_embed(embed, interaction))
+
+    def _render_user_embed(self, target_member: discord.Member | discord.User) -> Embed:
         embed = Embed(
             title=f"👤 Informations sur {target_member.display_name}",
-            color=target_member.color if target_member.color != Color.default() else Color.light_grey(),
-            timestamp=datetime.datetime.now(datetime.timezone.utc)
+            color=target_member.color if target_member.color != Color.default() else Color.light_grey()
         )
         embed.set_thumbnail(url=target_member.display_avatar.url if target_member.display_avatar else None)
         embed.add_field(name="📛 Nom complet", value=f"{target_member}", inline=True) # Utilise __str__ qui inclut le discr.
         embed.add_field(name="🆔 ID Utilisateur", value=target_member.id, inline=True)
-        embed.add_field(name="✏️ Surnom", value=target_member.nick or "Aucun", inline=True)
+        embed.add_field(name="✏️ Surnom", value=getattr(target_member, 'nick', None) or "Aucun", inline=True)
         embed.add_field(name="📅 Compte créé le", value=discord.utils.format_dt(target_member.created_at, style='R'), inline=True)
         if isinstance(target_member, discord.Member) and target_member.joined_at:
              embed.add_field(name="👋 A rejoint le serveur le", value=discord.utils.format_dt(target_member.joined_at, style='R'), inline=True)
@@ -73,9 +285,7 @@ class InfoCommands(commands.Cog):
             if len(roles_str) > 1020:
                 roles_str = roles_str[:1020] + "..."
             embed.add_field(name=f"🛡️ Rôles ({len(roles)})", value=roles_str, inline=False)
-
-        embed.set_footer(text=f"Demandé par {interaction.user.display_name}", icon_url=interaction.user.display_avatar.url if interaction.user.display_avatar else None)
-        await interaction.response.send_message(embed=embed)
+        return embed
 
     @app_commands.command(name="botinfo", description="Affiche des informations sur le bot.")
     async def display_bot_info(self, interaction: discord.Interaction):
@@ -90,39 +300,35 @@ class InfoCommands(commands.Cog):
         if bot_user.avatar:
             embed.set_thumbnail(url=bot_user.avatar.url)
 
-        # Lire le dev_id depuis la config pour l'afficher si c'est pertinent
-        dev_mention = "Non spécifié"
-        if self.bot.owner_id:
-            try:
-                owner = await self.bot.fetch_user(self.bot.owner_id)
-                dev_mention = owner.mention
-            except discord.NotFound:
-                dev_mention = f"ID: {self.bot.owner_id} (utilisateur non trouvé)"
-        elif self.bot.owner_ids:
-            owners_mentions = []
-            for owner_id_val in self.bot.owner_ids:
-                try:
-                    owner = await self.bot.fetch_user(owner_id_val)
-                    owners_mentions.append(owner.mention)
-                except discord.NotFound:
-                     owners_mentions.append(f"ID: {owner_id_val} (non trouvé)")
-            dev_mention = ", ".join(owners_mentions) if owners_mentions else "Non spécifié"
-
+        # Propriétaires résolus une fois puis gardés en cache (voir utils/bot_stats.py)
+        owners = await self.stats.owners()
+        dev_mention = ", ".join(
+            owner.mention if isinstance(owner, discord.User) else f"ID: {owner} (non trouvé)" for owner in owners
+        ) or "Non spécifié"
 
         embed.add_field(name=" डेवलपeur(s)", value=dev_mention, inline=True)
         embed.add_field(name="🏷️ Version", value="1.0.1", inline=True)
         embed.add_field(name="⚙️ Librairie", value=f"discord.py v{discord.__version__}", inline=True)
         embed.add_field(name="📅 Créé le", value=discord.utils.format_dt(bot_user.created_at, style='D'), inline=True)
-        embed.add_field(name="🌍 Serveurs", value=str(len(self.bot.guilds)), inline=True)
-
-        # Calcul des utilisateurs plus robuste
-        total_users = 0
-        try: # Pourrait échouer si les intents de membres ne sont pas activés partout
-            total_users = sum(g.member_count for g in self.bot.guilds if g.member_count is not None)
-        except AttributeError: # Si guild.member_count n'est pas disponible
-            total_users = "N/A (Intents manquants?)"
+        # En mode clusters (launcher.py), les totaux de tous les processus sont agrégés via l'IPC
+        cluster_ipc = getattr(self.bot, 'cluster_ipc', None)
+        cluster_totals = cluster_ipc.totals if cluster_ipc is not None else None
+        if cluster_totals:
+            embed.add_field(name="🌍 Serveurs", value=str(cluster_totals['guilds']), inline=True)
+            total_users = cluster_totals['users']
+        else:
+            embed.add_field(name="🌍 Serveurs", value=str(self.stats.guild_count), inline=True)
+            total_users = self.stats.user_count
 
         embed.add_field(name="👥 Utilisateurs (estimé)", value=str(total_users), inline=True)
+        if cluster_totals:
+            embed.add_field(
+                name="🧩 Shards",
+                value=f"{cluster_totals['shards']} ({cluster_totals['clusters_ready']}/{cluster_totals['clusters']} clusters prêts)",
+                inline=True
+            )
+        elif self.bot.shard_count:
+            embed.add_field(name="🧩 Shards", value=str(self.bot.shard_count), inline=True)
         embed.set_footer(text=f"Demandé par {interaction.user.display_name}", icon_url=interaction.user.display_avatar.url if interaction.user.display_avatar else None)
         await interaction.response.send_message(embed=embed)
 
@@ -131,142 +337,48 @@ class InfoCommands(commands.Cog):
     @app_commands.describe(command_name="Le nom de la commande pour laquelle afficher l'aide (optionnel).")
     async def help_command(self, interaction: discord.Interaction, command_name: str = None):
         """Affiche une liste de toutes les commandes slash ou des détails sur une commande spécifique."""
-
-        # DEFER EST IMPORTANT, surtout si la recherche de commande peut prendre du temps.
-        # Si command_name est fourni, on pourrait faire une recherche, donc defer.
-        # Si pas de command_name, la construction de la liste peut aussi prendre un peu de temps.
-        # On peut rendre éphémère si on s'attend à des erreurs, sinon non.
-        await interaction.response.defer(ephemeral=False) # Modifié pour ne pas être éphémère par défaut
-
-        bot_user = self.bot.user
-        embed_color = Color.blurple()
+        # Les embeds sont préconstruits (utils/help_index.py) : réponse immédiate, sans defer
+        index = self.help_index.ensure()
+        requested_by = f"Demandé par {interaction.user.display_name}"
+        icon_url = interaction.user.display_avatar.url if interaction.user.display_avatar else None
 
         if command_name:
-            cmd_to_find_str = command_name.lower().strip().replace("/", "") # Nettoyer le nom
-            found_cmd: app_commands.Command | app_commands.Group = None
-
-            # Rechercher dans toutes les commandes enregistrées (globales et de guilde)
-            # bot.tree.walk_commands() est excellent pour cela.
-            for cmd_obj in self.bot.tree.walk_commands():
-                # Pour les sous-commandes, qualified_name est 'group subcommand'
-                # Pour les commandes simples, qualified_name est 'command'
-                if cmd_obj.qualified_name == cmd_to_find_str:
-                    found_cmd = cmd_obj
-                    break
-                # Si ce n'est pas une correspondance exacte et que l'utilisateur n'a pas mis le nom du groupe
-                # pour une sous-commande, on pourrait essayer de le trouver.
-                # Exemple: /help clear au lieu de /help admin clear
-                if isinstance(cmd_obj.parent, app_commands.Group) and cmd_obj.name == cmd_to_find_str:
-                    # Prudence ici, peut mener à des ambiguïtés si 'clear' existe en global et en sous-commande
-                    # Pour l'instant, on priorise la correspondance exacte avec qualified_name
-                    pass # On laisse la recherche par qualified_name gérer cela
-
-            if not found_cmd:
-                await interaction.followup.send( # Utiliser followup après defer
-                    f"😕 Désolé, la commande `/{command_name}` n'a pas été trouvée ou n'est pas accessible.",
-                    ephemeral=True
-                )
+            entry = index.lookup(command_name)
+            if entry is None:
+                message = f"😕 Désolé, la commande `/{command_name}` n'a pas été trouvée ou n'est pas accessible."
+                suggestions = index.suggest(command_name, limit=3)
+                if suggestions:
+                    message += "\nVouliez-vous dire : " + ", ".join(f"`/{suggestion.qualified_name}`" for suggestion in suggestions) + " ?"
+                await interaction.response.send_message(message, ephemeral=True)
                 return
+            embed = index.command_embed(entry)
+            embed.set_footer(text=requested_by, icon_url=icon_url)
+        else: # Afficher la liste de toutes les commandes (première page)
+            await interaction.response.send_message(**self.help_listing(interaction, 0))
+            return
 
-            embed = Embed(
-                title=f"❓ Aide pour : `/{found_cmd.qualified_name}`",
-                description=found_cmd.description or "Aucune description fournie.",
-                color=embed_color,
-                timestamp=datetime.datetime.now(datetime.timezone.utc)
-            )
-            if bot_user and bot_user.avatar:
-                embed.set_thumbnail(url=bot_user.avatar.url)
-
-            usage = f"`/{found_cmd.qualified_name}`"
-            if hasattr(found_cmd, 'parameters') and found_cmd.parameters:
-                params_usage = []
-                params_description_list = []
-                for param in found_cmd.parameters:
-                    param_type_name = param.type.name if hasattr(param.type, 'name') else str(param.type).split('.')[-1].lower()
-                    required_text = "" if param.required else " (Optionnel)" # "Requis" est implicite sans ça
-                    param_name_formatted = f"<{param.name}>" if param.required else f"[{param.name}]"
-                    params_usage.append(param_name_formatted)
-
-                    desc_line = f"**`{param.name}`** (`{param_type_name}`{required_text}):\n> {param.description or 'Pas de description.'}"
-                    if param.choices:
-                        choices_str = ", ".join([f"`{choice.name}` (`{choice.value}`)" for choice in param.choices])
-                        desc_line += f"\n> *Choix possibles:* {choices_str}"
-                    params_description_list.append(desc_line)
-
-                usage += " " + " ".join(params_usage)
-                embed.add_field(name="📝 Utilisation", value=usage, inline=False)
-                if params_description_list: # S'assurer qu'il y a des descriptions à afficher
-                    embed.add_field(
-                        name="🔧 Paramètres",
-                        value="\n\n".join(params_description_list),
-                        inline=False
-                    )
-                else:
-                    embed.add_field(name="🔧 Paramètres", value="Cette commande ne prend aucun paramètre.", inline=False)
-
-            else: # Cas des groupes qui n'ont pas de "parameters" directement mais des sous-commandes
-                embed.add_field(name="📝 Utilisation", value=usage, inline=False)
-                if isinstance(found_cmd, app_commands.Group):
-                    sub_cmds_list = [f"`/{sub.qualified_name}`: {sub.description or 'Pas de description.'}" for sub in found_cmd.commands]
-                    if sub_cmds_list:
-                         embed.add_field(name="Sous-commandes", value="\n".join(sub_cmds_list), inline=False)
-                else:
-                    embed.add_field(name="🔧 Paramètres", value="Cette commande ne prend aucun paramètre.", inline=False)
-
-            if found_cmd.cog_name:
-                 embed.add_field(name="📦 Module", value=found_cmd.cog_name, inline=True)
-
-            embed.set_footer(text=f"Demandé par {interaction.user.display_name}", icon_url=interaction.user.display_avatar.url if interaction.user.display_avatar else None)
-            await interaction.followup.send(embed=embed)
-
-        else: # Afficher la liste de toutes les commandes
-            embed = Embed(
-                title=f"📜 Aide des Commandes de {bot_user.name if bot_user else 'ce Bot'}",
-                description=f"Voici la liste des commandes slash disponibles.\nUtilisez `/help <nom_commande>` pour plus de détails.",
-                color=embed_color,
-                timestamp=datetime.datetime.now(datetime.timezone.utc)
-            )
-            if bot_user and bot_user.avatar:
-                embed.set_thumbnail(url=bot_user.avatar.url)
-
-            cogs_commands = defaultdict(list)
-            # Utiliser walk_commands pour obtenir une liste plate de toutes les commandes (y compris sous-commandes)
-            # Mais pour l'affichage général, on veut souvent grouper par cog et afficher les commandes de haut niveau.
-
-            # On récupère les commandes de premier niveau.
-            # walk_commands itère sur tout, y compris les sous-commandes.
-            # get_commands() sans argument ou avec guild=None retourne les commandes globales de haut niveau.
-            # get_commands(guild=interaction.guild) retourne celles de la guilde.
-
-            top_level_commands = set()
-            top_level_commands.update(self.bot.tree.get_commands(guild=None))
-            if interaction.guild:
-                 top_level_commands.update(self.bot.tree.get_commands(guild=interaction.guild))
-
-            sorted_commands = sorted(list(top_level_commands), key=lambda cmd: cmd.qualified_name)
-
-            for cmd_obj in sorted_commands:
-                cog_name = cmd_obj.cog_name if hasattr(cmd_obj, "cog_name") and cmd_obj.cog_name else "Autres Commandes"
-                cmd_display = f"`/{cmd_obj.qualified_name}`: {cmd_obj.description or 'Pas de description.'}"
-
-                # Si c'est un groupe, indiquer qu'il a des sous-commandes
-                if isinstance(cmd_obj, app_commands.Group) and cmd_obj.commands:
-                    cmd_display += f" (Groupe - {len(cmd_obj.commands)} sous-commande(s))"
-
-                cogs_commands[cog_name].append(cmd_display)
-
-            if not cogs_commands:
-                embed.description += "\n\n😕 Aucune commande n'a été trouvée."
-            else:
-                for cog_name_sorted, cmd_list in sorted(cogs_commands.items()):
-                    if cmd_list:
-                        field_value = "\n".join(cmd_list)
-                        if len(field_value) > 1024:
-                            field_value = field_value[:1020] + "\n..."
-                        embed.add_field(name=f"**{cog_name_sorted}**", value=field_value, inline=False)
-
-            embed.set_footer(text=f"Demandé par {interaction.user.display_name} | Total: {len(sorted_commands)} commandes de haut niveau", icon_url=interaction.user.display_avatar.url if interaction.user.display_avatar else None)
-            await interaction.followup.send(embed=embed)
+        embed.timestamp = datetime.datetime.now(datetime.timezone.utc)
+        await interaction.response.send_message(embed=embed)
+
+    def help_listing(self, interaction: discord.Interaction, page: int) -> dict:
+        """Arguments d'envoi (embed et boutons) de la page `page` de la liste des commandes."""
+        embed, pages = self.help_index.ensure().listing_page(interaction.guild, interaction.locale, page)
+        page = max(0, min(page, pages - 1))
+        embed.set_footer(
+            text=f"Demandé par {interaction.user.display_name} | {embed.footer.text}",
+            icon_url=interaction.user.display_avatar.url if interaction.user.display_avatar else None
+        )
+        embed.timestamp = datetime.datetime.now(datetime.timezone.utc)
+        if pages <= 1:
+            return {'embed': embed}
+        return {'embed': embed, 'view': help_pagination_view(interaction.user.id, page, pages)}
+
+    @help_command.autocomplete('command_name')
+    async def help_command_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        return [
+            app_commands.Choice(name=f"/{entry.qualified_name}", value=entry.qualified_name)
+            for entry in self.help_index.ensure().suggest(current)
+        ]
 
 
 async def setup(bot: commands.Bot):
@@ -0,0 +1,199 @@
+"""
+Commandes réservées aux propriétaires du bot.
+Ce module contient les commandes de supervision (mesures de performance, synchronisation des commandes,
+rechargement à chaud des cogs, etc.).
+"""
+import discord
+from discord.ext import commands
+from discord import app_commands
+import io
+import logging
+
+from utils.checks import is_bot_owner
+from utils.hot_reload import ReloadAborted
+
+logger = logging.getLogger('discord.owner_commands')
+logger.setLevel(logging.INFO)
+
+
+class OwnerCommands(commands.Cog):
+    """Commandes de supervision réservées aux propriétaires du bot."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        logger.info("Cog OwnerCommands initialisé.")
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        # Toutes les commandes de ce cog sont réservées aux propriétaires
+        if await is_bot_owner(self.bot, interaction):
+            return True
+        await interaction.response.send_message(
+            "❌ Désolé, cette commande est réservée au(x) propriétaire(s) du bot.",
+            ephemeral=True
+        )
+        logger.warning(f"Tentative d'utilisation d'une commande propriétaire par {interaction.user} (ID: {interaction.user.id})")
+        return False
+
+    @app_commands.command(name="metrics", description="Affiche les mesures de latence des commandes (propriétaire du bot uniquement).")
+    @app_commands.describe(prometheus="Joindre l'export complet au format Prometheus.")
+    async def metrics(self, interaction: discord.Interaction, prometheus: bool = False):
+        """Affiche, par commande, les appels, erreurs et latences p50/p95."""
+        command_metrics = getattr(self.bot.tree, 'metrics', None)
+        if command_metrics is None:
+            await interaction.response.send_message("L'instrumentation des commandes n'est pas active.", ephemeral=True)
+            return
+
+        lines = []
+        for name, stats in sorted(command_metrics.commands.items(), key=lambda item: -item[1].calls):
+            line = (
+                f"`/{name}` — {stats.calls} appel(s), {stats.errors} erreur(s) | "
+                f"total p50 {stats.total.quantile(0.5) * 1000:.0f} ms, p95 {stats.total.quantile(0.95) * 1000:.0f} ms"
+            )
+            if stats.first_response.count:
+                line += f" | 1re réponse p95 {stats.first_response.quantile(0.95) * 1000:.0f} ms"
+            if stats.defer.count:
+                line += f" | defer p95 {stats.defer.quantile(0.95) * 1000:.0f} ms"
+            lines.append(line)
+
+        description = "\n".join(lines) if lines else "Aucune commande mesurée pour le moment."
+        cache_lines = []
+        for name, cache_stats in sorted(command_metrics.caches.items()):
+            stats = cache_stats()
+            cache_lines.append(
+                f"`{name}` — {stats.get('entries', 0)} entrée(s), taux de succès {stats.get('hit_rate', 0.0):.0%} "
+                f"({stats.get('hits', 0)}/{stats.get('hits', 0) + stats.get('misses', 0)})"
+            )
+        if cache_lines:
+            description += "\n\n**Caches**\n" + "\n".join(cache_lines)
+        if len(description) > 4000:
+            description = description[:4000] + "\n..."
+        embed = discord.Embed(
+            title="📈 Mesures des commandes",
+            description=description,
+            color=discord.Color.blurple()
+        )
+
+        if prometheus:
+            file = discord.File(io.BytesIO(command_metrics.to_prometheus().encode('utf-8')), filename="metrics.prom")
+            await interaction.response.send_message(embed=embed, file=file, ephemeral=True)
+        else:
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="sync", description="Synchronise les commandes slash (propriétaire du bot uniquement).")
+    @app_commands.describe(
+        force="Envoyer la synchronisation même si l'arbre de commandes n'a pas changé.",
+        scope="Portée à synchroniser (par défaut : globale et serveurs de développement)."
+    )
+    @app_commands.choices(scope=[
+        app_commands.Choice(name="Globale et serveurs de développement", value="all"),
+        app_commands.Choice(name="Globale uniquement", value="global"),
+        app_commands.Choice(name="Ce serveur uniquement", value="guild"),
+    ])
+    async def sync(self, interaction: discord.Interaction, force: bool = False, scope: str = "all"):
+        """Synchronise les commandes slash, en évitant l'envoi si l'empreinte de l'arbre est inchangée."""
+        command_sync = getattr(self.bot, 'command_sync', None)
+        if command_sync is None:
+            await interaction.response.send_message("Le gestionnaire de synchronisation n'est pas actif.", ephemeral=True)
+            return
+        if scope == "guild" and interaction.guild is None:
+            await interaction.response.send_message("Cette portée n'est utilisable que dans un serveur.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        if scope == "all":
+            results = await command_sync.sync_all(force=force)
+        else:
+            guild = interaction.guild if scope == "guild" else None
+            try:
+                results = {command_sync._scope(guild): await command_sync.sync(guild=guild, force=force)}
+            except (discord.HTTPException, app_commands.AppCommandError) as e:
+                logger.error(f"Erreur lors de la synchronisation forcée: {type(e).__name__} - {e}")
+                await interaction.followup.send(f"❌ Échec de la synchronisation: {type(e).__name__} - {e}", ephemeral=True)
+                return
+
+        lines = []
+        for name, synced in results.items():
+            if synced is None:
+                lines.append(f"`{name}` — inchangé, envoi évité")
+            else:
+                lines.append(f"`{name}` — {len(synced)} commande(s) synchronisée(s)")
+        if scope == "all" and len(results) < 1 + len(command_sync.dev_guild_ids):
+            lines.append("⚠️ Certaines portées ont échoué, voir les logs.")
+        await interaction.followup.send("\n".join(lines) or "Aucune portée synchronisée.", ephemeral=True)
+        logger.info(f"Synchronisation des commandes demandée par {interaction.user} (force={force}, portée={scope})")
+
+    @app_commands.command(name="reload", description="Recharge un cog sans redémarrer le bot (propriétaire du bot uniquement).")
+    @app_commands.describe(
+        cog="Extension à recharger (ex: cogs.general_commands).",
+        force="Recharger même si des exécutions du cog sont toujours en cours à la fin du délai d'attente."
+    )
+    async def reload(self, interaction: discord.Interaction, cog: str, force: bool = False):
+        """Recharge une extension : reprise de son état, attente des exécutions en cours et envoi des seules commandes modifiées."""
+        reloader = getattr(self.bot, 'cog_reloader', None)
+        if reloader is None:
+            await interaction.response.send_message("Le rechargement à chaud n'est pas actif.", ephemeral=True)
+            return
+        if cog not in self.bot.extensions:
+            await interaction.response.send_message(f"❌ L'extension `{cog}` n'est pas chargée.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        logger.info(f"Rechargement de {cog} demandé par {interaction.user} (force={force})")
+        try:
+            report = await reloader.reload(cog, force=force, ignore_interaction=interaction.id)
+        except ReloadAborted as e:
+            await interaction.followup.send(f"⚠️ Rechargement annulé, l'ancienne version reste active: {e}", ephemeral=True)
+            return
+        except commands.ExtensionFailed as e:
+            # L'exception originale est dans e.__cause__
+            original_exception = e.__cause__ if e.__cause__ else e
+            logger.error(f"Échec du rechargement du cog {cog}, ancienne version restaurée: {type(original_exception).__name__} - {original_exception}")
+            logger.exception(f"Trace complète de l'échec du rechargement du cog {cog}:")
+            await interaction.followup.send(
+                f"❌ La nouvelle version n'a pas pu être chargée, l'ancienne a été restaurée: {type(original_exception).__name__} - {original_exception}",
+                ephemeral=True
+            )
+            return
+        except Exception as e:
+            logger.error(f"Erreur inattendue lors du rechargement du cog {cog}: {type(e).__name__} - {e}")
+            logger.exception("Trace complète de l'erreur de rechargement du cog:")
+            await interaction.followup.send(f"❌ Échec du rechargement: {type(e).__name__} - {e}", ephemeral=True)
+            return
+
+        lines = [f"✅ `{cog}` rechargé en {report.duration_ms:.0f} ms."]
+        if report.handed_off:
+            lines.append(f"État repris: {', '.join(report.handed_off)}")
+        if report.drained:
+            lines.append(f"Exécutions en cours attendues: {', '.join(report.drained)}")
+        if report.sync is None:
+            lines.append("Commandes slash: non synchronisées (voir /sync).")
+        for scope, result in report.sync.items() if report.sync else ():
+            if result is None:
+                lines.append(f"`{scope}` — commandes inchangées, envoi évité")
+            elif result['full']:
+                lines.append(f"`{scope}` — arbre complet synchronisé ({len(result['full'])} commande(s))")
+            else:
+                changes = [f"/{name}" for name in result['updated']] + [f"/{name} (supprimée)" for name in result['removed']]
+                lines.append(f"`{scope}` — {', '.join(changes)}")
+        await interaction.followup.send("\n".join(lines), ephemeral=True)
+
+    @reload.autocomplete('cog')
+    async def reload_cog_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        # interaction_check ne s'applique pas à l'autocomplétion
+        if not await is_bot_owner(self.bot, interaction):
+            return []
+        return [
+            app_commands.Choice(name=name, value=name)
+            for name in sorted(self.bot.extensions) if current.lower() in name.lower()
+        ][:25]
+
+
+async def setup(bot: commands.Bot):
+    """
+    Charge le cog OwnerCommands.
+
+    Args:
+        bot: L'instance du bot Discord.
+    """
+    await bot.add_cog(OwnerCommands(bot))
+    logger.info("Cog OwnerCommands chargé avec succès.")
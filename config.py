@@ -1,15 +1,40 @@
 """
 Configuration du bot Discord.
-Ce fichier contient les paramètres de configuration du bot.
+config.json est chargé dans un instantané typé et immuable (ConfigSnapshot). Les
+paramètres restent accessibles comme variables du module (config.token, config.cogs...) :
+quand utils/config_watcher.py recharge un fichier modifié et valide, elles sont toutes
+remplacées d'un bloc par celles du nouvel instantané. Pour lire plusieurs paramètres
+de façon cohérente à travers un `await`, utiliser config.current().
 """
+import dataclasses
 import json
-import os
+from types import MappingProxyType
+from typing import Any, Mapping
+
+CONFIG_PATH = 'config.json'
+
+# Cogs chargés si config.json ne définit pas de clé "cogs"
+DEFAULT_COGS = (
+    'cogs.general_commands',
+    'cogs.admin_commands',
+    'cogs.info_commands',
+    'cogs.functionality_bot',  # AntiGhostPing et détection de raids
+    'cogs.owner_commands',
+)
+
+# Paramètres lus une seule fois au démarrage : les modifier demande un redémarrage du bot
+RESTART_REQUIRED = frozenset({'token', 'cache_profile', 'sharding', 'max_messages', 'metrics', 'command_sync', 'logging', 'config_reload'})
+
+
+class ConfigError(ValueError):
+    """config.json illisible ou invalide."""
+
 
 # Charger la configuration depuis le fichier config.json
-def load_config():
+def load_config(path: str = CONFIG_PATH):
     """Charge la configuration depuis le fichier config.json"""
     try:
-        with open('config.json', 'r') as f:
+        with open(path, 'r') as f:
             return json.load(f)
     except FileNotFoundError:
         print("ERREUR: Le fichier config.json n'a pas été trouvé.")
@@ -18,22 +43,162 @@ def load_config():
         print("ERREUR: Le fichier config.json contient des erreurs de syntaxe JSON.")
         return None
 
-# Charger la configuration
-config = load_config()
 
-# Token du bot
-token = config.get('token') if config else None
+def _freeze(value: Any) -> Any:
+    """Copie en lecture seule : dict -> MappingProxyType, list -> tuple (récursivement)."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
 
-# Liste des cogs à charger
-cogs = [
-    'cogs.general_commands',
-    'cogs.admin_commands',
-    'cogs.info_commands',
-    'cogs.functionality_bot'  # Ajout du nouveau cog pour AntiGhostPing
-]
 
-# IDs des canaux de statut
-status_channel_ids = config.get('status_channel_ids', []) if config else []
+def _section(data: dict, name: str) -> Mapping[str, Any]:
+    value = data.get(name, {})
+    if value is None:
+        value = {}
+    if not isinstance(value, dict):
+        raise ConfigError(f"La clé \"{name}\" doit être un objet JSON.")
+    return _freeze(value)
+
+
+def _ids(data: dict, name: str) -> tuple[int, ...]:
+    """Liste d'IDs (entiers ou chaînes numériques) ; un ID seul est accepté."""
+    value = data.get(name, [])
+    values = value if isinstance(value, list) else [value]
+    try:
+        return tuple(int(item) for item in values if item not in (None, ""))
+    except (TypeError, ValueError):
+        raise ConfigError(f"La clé \"{name}\" doit contenir des IDs Discord (nombres).") from None
+
+
+def _typed(data: dict, name: str, types: tuple, default: Any) -> Any:
+    value = data.get(name, default)
+    if value is not None and (isinstance(value, bool) and bool not in types or not isinstance(value, types)):
+        raise ConfigError(f"La clé \"{name}\" a un type invalide ({type(value).__name__}).")
+    return value
+
+
+@dataclasses.dataclass(frozen=True)
+class ConfigSnapshot:
+    """Instantané validé de config.json."""
+
+    # Contenu brut (en lecture seule), pour les clés sans champ dédié
+    config: Mapping[str, Any]
+    # Token du bot
+    token: str | None
+    # Préfixe des commandes texte
+    prefix: str
+    # Liste des cogs à charger (clé "cogs", sinon DEFAULT_COGS)
+    cogs: tuple[str, ...]
+    # IDs des canaux de statut
+    status_channel_ids: tuple[int, ...]
+    # IDs des développeurs (propriétaires du bot)
+    dev_id: tuple[int, ...]
+    # Profil d'intents et de cache des membres : "minimal" (par défaut), "moderation" ou "full"
+    cache_profile: str
+    # Sharding (clé "sharding") : "enabled", "shard_count", et pour launcher.py "clusters", "ipc_port", "ready_timeout"
+    sharding: Mapping[str, Any]
+    # Taille du cache de messages de discord.py (null pour le désactiver si le cache des mentions est actif)
+    max_messages: int | None
+    # Paramètres de l'AntiGhostPing (clé "anti_ghost_ping")
+    anti_ghost_ping: Mapping[str, Any]
+    # Paramètres des commandes d'information (clé "info_commands"), ex. "embed_cache": {"ttl": 60}
+    info_commands: Mapping[str, Any]
+    # Modération de masse (clé "bulk_moderation") : "max_targets", "batch_size", "progress_interval", "state_dir"
+    bulk_moderation: Mapping[str, Any]
+    # Détection de raids (clé "raid_detection") : "enabled", "joins", "mentions", "duplicates", "cooldown",
+    # et la réaction automatique : "action" ("none", "kick" ou "ban") et "log_channel_ids" ({"<guild_id>": <channel_id>}).
+    # La détection des vagues d'arrivées ("joins") nécessite l'intent des membres (profil de cache "moderation" ou "full")
+    raid_detection: Mapping[str, Any]
+    # Paramètres de la commande /run (clé "run")
+    run: Mapping[str, Any]
+    # Export des mesures des commandes (clé "metrics") : "prometheus_file" et/ou "prometheus_port"
+    metrics: Mapping[str, Any]
+    # Synchronisation des commandes slash (clé "command_sync") : "state_file", "dev_guild_ids"
+    # et "max_individual_updates" (commandes renvoyées une par une après /reload)
+    command_sync: Mapping[str, Any]
+    # Chargement des cogs (clé "cog_loading") : "parallel_imports", "main_thread_imports",
+    # "dependencies" ({"cogs.x": ["cogs.y"]} pour charger cogs.y avant cogs.x)
+    # et "reload_drain_timeout" (attente des exécutions en cours lors d'un /reload)
+    cog_loading: Mapping[str, Any]
+    # Rechargement à chaud de config.json (clé "config_reload") : "enabled", "interval"
+    config_reload: Mapping[str, Any]
+    # Paramètres du logging (clé "logging")
+    logging: Mapping[str, Any]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ConfigSnapshot':
+        """Valide le contenu de config.json ; lève ConfigError si une clé est invalide."""
+        if not isinstance(data, dict):
+            raise ConfigError("config.json doit contenir un objet JSON.")
+        cogs = data.get('cogs', DEFAULT_COGS)
+        if not isinstance(cogs, (list, tuple)) or not all(isinstance(cog, str) for cog in cogs):
+            raise ConfigError("La clé \"cogs\" doit être une liste de noms de modules.")
+        return cls(
+            config=_freeze(data),
+            token=_typed(data, 'token', (str,), None),
+            prefix=_typed(data, 'prefix', (str,), "!") or "!",
+            cogs=tuple(dict.fromkeys(cogs)),
+            status_channel_ids=_ids(data, 'status_channel_ids'),
+            dev_id=_ids(data, 'dev_id'),
+            cache_profile=_typed(data, 'cache_profile', (str,), 'minimal') or 'minimal',
+            sharding=_section(data, 'sharding'),
+            max_messages=_typed(data, 'max_messages', (int,), 1000),
+            anti_ghost_ping=_section(data, 'anti_ghost_ping'),
+            info_commands=_section(data, 'info_commands'),
+            bulk_moderation=_section(data, 'bulk_moderation'),
+            raid_detection=_section(data, 'raid_detection'),
+            run=_section(data, 'run'),
+            metrics=_section(data, 'metrics'),
+            command_sync=_section(data, 'command_sync'),
+            cog_loading=_section(data, 'cog_loading'),
+            config_reload=_section(data, 'config_reload'),
+            logging=_section(data, 'logging'),
+        )
+
+    def changed_fields(self, other: 'ConfigSnapshot') -> frozenset[str]:
+        """Noms des paramètres qui diffèrent entre deux instantanés (hors contenu brut)."""
+        return frozenset(
+            field.name for field in dataclasses.fields(self)
+            if field.name != 'config' and getattr(self, field.name) != getattr(other, field.name)
+        )
+
 
-# IDs des développeurs
-dev_id = config.get('dev_id', []) if config else []
+def read_snapshot(path: str = CONFIG_PATH) -> ConfigSnapshot:
+    """Lit et valide config.json ; lève ConfigError (fichier absent, JSON ou valeurs invalides)."""
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except OSError as e:
+        raise ConfigError(f"Impossible de lire {path}: {e}") from e
+    except json.JSONDecodeError as e:
+        raise ConfigError(f"{path} contient des erreurs de syntaxe JSON: {e}") from e
+    return ConfigSnapshot.from_dict(data)
+
+
+def current() -> ConfigSnapshot:
+    """Instantané en vigueur."""
+    return _current
+
+
+def swap(snapshot: ConfigSnapshot) -> ConfigSnapshot:
+    """Met en vigueur `snapshot` (instantané et variables du module, sans point de suspension) ; retourne l'ancien."""
+    global _current
+    previous = _current
+    _current = snapshot
+    globals().update({field.name: getattr(snapshot, field.name) for field in dataclasses.fields(snapshot)})
+    return previous
+
+
+# Charger la configuration
+# Variables du module : config (contenu brut), token, prefix, cogs, status_channel_ids, dev_id, cache_profile,
+# sharding, max_messages, anti_ghost_ping, info_commands, bulk_moderation, raid_detection, run, metrics,
+# command_sync, cog_loading, config_reload, logging (voir ConfigSnapshot)
+_raw_config = load_config()
+try:
+    _current = ConfigSnapshot.from_dict(_raw_config or {})
+except ConfigError as e:
+    print(f"ERREUR: {e}")
+    _current = ConfigSnapshot.from_dict({})
+swap(_current)
@@ -0,0 +1,182 @@
+"""
+Lanceur multi-processus du bot.
+Les shards sont répartis en plages contiguës sur plusieurs processus (clusters) ;
+chaque cluster exécute main.py avec le même `config.cogs` et ne gère que ses shards.
+Les clusters sont démarrés l'un après l'autre (le suivant attend que le précédent soit
+prêt) pour respecter les limites d'identification de la Gateway, et sont relancés s'ils
+s'arrêtent de façon inattendue. Le lanceur héberge le serveur IPC qui agrège les chiffres
+des clusters (voir utils/cluster_ipc.py).
+
+Usage : python launcher.py [--clusters N] [--shards M]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import secrets
+import signal
+import sys
+
+import discord
+
+import config
+from utils.cluster_ipc import ClusterIPCServer, cluster_env
+from utils.logging_setup import setup_logging
+
+log_listener = setup_logging({**config.logging, 'filename': 'launcher.log'})
+logger = logging.getLogger('launcher')
+logger.setLevel(logging.INFO)
+
+
+async def fetch_recommended_shards(token: str) -> tuple[int, int]:
+    """Retourne le nombre de shards recommandé par Discord et la concurrence d'identification autorisée."""
+    http = discord.http.HTTPClient(asyncio.get_running_loop())
+    try:
+        await http.static_login(token)
+        shard_count, _, session_start_limit = await http.get_bot_gateway()
+        return shard_count, session_start_limit.get('max_concurrency', 1)
+    finally:
+        await http.close()
+
+
+def split_shards(shard_count: int, cluster_count: int) -> list[list[int]]:
+    """Répartit les shards 0..shard_count-1 en `cluster_count` plages contiguës de tailles voisines."""
+    cluster_count = max(1, min(cluster_count, shard_count))
+    base, extra = divmod(shard_count, cluster_count)
+    ranges, start = [], 0
+    for cluster_id in range(cluster_count):
+        size = base + (1 if cluster_id < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+
+class Cluster:
+    """Un processus du bot et la plage de shards qu'il gère."""
+
+    __slots__ = ('cluster_id', 'shard_ids', 'process', 'restarts')
+
+    def __init__(self, cluster_id: int, shard_ids: list[int]):
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.process: asyncio.subprocess.Process | None = None
+        self.restarts = 0
+
+
+class ClusterLauncher:
+    """
+    Démarre et surveille les clusters.
+
+    Args:
+        shard_count: Nombre total de shards.
+        cluster_count: Nombre de processus.
+        ready_timeout: Attente maximale (secondes) qu'un cluster soit prêt avant de lancer le suivant.
+        max_restart_delay: Délai maximal (secondes) avant la relance d'un cluster arrêté.
+    """
+
+    def __init__(self, shard_count: int, cluster_count: int, ready_timeout: float = 180.0, max_restart_delay: float = 60.0):
+        self.shard_count = shard_count
+        self.clusters = [Cluster(cluster_id, shard_ids) for cluster_id, shard_ids in enumerate(split_shards(shard_count, cluster_count))]
+        self.ready_timeout = ready_timeout
+        self.max_restart_delay = max_restart_delay
+        self.ipc = ClusterIPCServer(secrets.token_hex(32), port=config.sharding.get('ipc_port', 0))
+        self._stopping = asyncio.Event()
+
+    async def _spawn(self, cluster: Cluster):
+        env = dict(os.environ)
+        env.update(cluster_env(cluster.cluster_id, len(self.clusters), cluster.shard_ids, self.shard_count, self.ipc.port, self.ipc.secret))
+        cluster.process = await asyncio.create_subprocess_exec(sys.executable, 'main.py', env=env)
+        logger.info(f"Cluster {cluster.cluster_id} démarré (PID {cluster.process.pid}, shards {cluster.shard_ids[0]}-{cluster.shard_ids[-1]})")
+
+    async def _wait_ready(self, cluster: Cluster):
+        """Attend que le cluster annonce être prêt via l'IPC (ou qu'il s'arrête, ou le délai maximal)."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.ready_timeout
+        while loop.time() < deadline and not self._stopping.is_set():
+            if self.ipc.clusters.get(str(cluster.cluster_id), {}).get('ready'):
+                logger.info(f"Cluster {cluster.cluster_id} prêt.")
+                return
+            if cluster.process.returncode is not None:
+                return
+            await asyncio.sleep(1.0)
+        logger.warning(f"Cluster {cluster.cluster_id} pas encore prêt après {self.ready_timeout:.0f}s, lancement du suivant.")
+
+    async def _supervise(self, cluster: Cluster):
+        while not self._stopping.is_set():
+            returncode = await cluster.process.wait()
+            self.ipc.forget(cluster.cluster_id)
+            if self._stopping.is_set():
+                return
+            cluster.restarts += 1
+            delay = min(self.max_restart_delay, 5.0 * cluster.restarts)
+            logger.error(f"Cluster {cluster.cluster_id} arrêté (code {returncode}), relance dans {delay:.0f}s (relance n°{cluster.restarts}).")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+                return
+            except asyncio.TimeoutError:
+                pass
+            await self._spawn(cluster)
+
+    def stop(self):
+        if self._stopping.is_set():
+            return
+        logger.info("Arrêt des clusters demandé.")
+        self._stopping.set()
+        for cluster in self.clusters:
+            if cluster.process and cluster.process.returncode is None:
+                cluster.process.terminate()
+
+    async def run(self):
+        await self.ipc.start()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except NotImplementedError:  # Windows
+                pass
+
+        logger.info(f"Lancement de {len(self.clusters)} cluster(s) pour {self.shard_count} shard(s).")
+        supervisors = []
+        for cluster in self.clusters:
+            if self._stopping.is_set():
+                break
+            await self._spawn(cluster)
+            supervisors.append(asyncio.create_task(self._supervise(cluster)))
+            await self._wait_ready(cluster)
+
+        await self._stopping.wait()
+        for cluster in self.clusters:
+            if cluster.process:
+                await cluster.process.wait()
+        for supervisor in supervisors:
+            supervisor.cancel()
+        await self.ipc.close()
+        logger.info("Tous les clusters sont arrêtés.")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Lance le bot sur plusieurs processus (clusters de shards).")
+    parser.add_argument('--clusters', type=int, default=config.sharding.get('clusters', os.cpu_count() or 1),
+                        help="Nombre de processus (par défaut : clé sharding.clusters ou nombre de cœurs).")
+    parser.add_argument('--shards', type=int, default=config.sharding.get('shard_count'),
+                        help="Nombre total de shards (par défaut : clé sharding.shard_count ou recommandation de Discord).")
+    args = parser.parse_args()
+
+    shard_count = args.shards
+    if not shard_count:
+        shard_count, max_concurrency = await fetch_recommended_shards(config.token)
+        logger.info(f"Discord recommande {shard_count} shard(s) (concurrence d'identification: {max_concurrency}).")
+
+    launcher = ClusterLauncher(shard_count, args.clusters, ready_timeout=config.sharding.get('ready_timeout', 180.0))
+    await launcher.run()
+
+
+if __name__ == "__main__":
+    if not config.token:
+        logger.critical("ERREUR CRITIQUE: Le token du bot n'est pas défini dans config.py ou config.json.")
+        log_listener.stop()
+        exit()
+    try:
+        asyncio.run(main())
+    finally:
+        log_listener.stop()
@@ -7,24 +7,79 @@ from discord.ext import commands
 import asyncio
 import logging
 import config  # Votre config.py qui charge config.json
+from utils.instrumentation import InstrumentedCommandTree, PrometheusExporter
+from utils.logging_setup import setup_logging
+from utils.command_sync import CommandSyncManager
+from utils.cache_profiles import get_profile
+from utils.cluster_ipc import ClusterIPCClient, cluster_from_env
+from utils.cog_loader import CogLoader
+from utils.config_watcher import ConfigWatcher
+from utils.hot_reload import CogReloader
 
-# Configuration du logging de base pour le bot
-logging.basicConfig(level=logging.INFO, format='%(asctime)s:%(levelname)s:%(name)s: %(message)s')
-discord_logger = logging.getLogger('discord')
-discord_logger.setLevel(logging.WARNING) # Réduire le bruit de discord.py, mettre INFO pour plus de détails
+# Configuration du logging : les loggers déposent dans une file, un thread d'arrière-plan écrit
+# dans la console et dans logs/ (rotation par taille et par durée, archives compressées dans logs/archives).
+# Le niveau de discord.py reste à WARNING par défaut ("discord_level" dans la clé "logging" de config.json).
+# Quand le bot est lancé par launcher.py, chaque cluster écrit dans son propre fichier de log
+cluster = cluster_from_env()
+log_listener = setup_logging(config.logging if cluster is None else {**config.logging, 'filename': f"bot-cluster{cluster['cluster_id']}.log"})
 logger = logging.getLogger('main')
 logger.setLevel(logging.INFO)
 
 # Vérifier si le token est chargé
 if not config.token:
     logger.critical("ERREUR CRITIQUE: Le token du bot n'est pas défini dans config.py ou config.json.")
+    log_listener.stop()
     exit()
 
-# Créer un bot avec tous les intents (ajustez si nécessaire pour la production)
-intents = discord.Intents.all()
-bot = commands.Bot(command_prefix=config.config.get("prefix", "!"), # Utiliser un préfixe de config.json ou défaut
-                   intents=intents,
-                   help_command=None) # help_command=None car nous avons une commande /help personnalisée
+# Intents et cache des membres selon le profil choisi ("cache_profile" de config.json : minimal, moderation ou full)
+cache_profile = get_profile(config.cache_profile)
+logger.info(f"Profil de cache '{cache_profile.name}' (chargement des membres au démarrage: {cache_profile.chunk_guilds_at_startup})")
+
+# Sharding : AutoShardedBot si activé dans la config ("sharding": {"enabled": true}) ou si lancé par launcher.py,
+# qui fixe alors la plage de shards de ce processus
+shard_kwargs = {}
+if cluster is not None:
+    shard_kwargs = {'shard_ids': cluster['shard_ids'], 'shard_count': cluster['shard_count']}
+    logger.info(f"Cluster {cluster['cluster_id']}/{cluster['cluster_count']} : shards {cluster['shard_ids']} sur {cluster['shard_count']}")
+elif config.sharding.get('shard_count'):
+    shard_kwargs = {'shard_count': config.sharding['shard_count']}
+bot_cls = commands.AutoShardedBot if cluster is not None or config.sharding.get('enabled') else commands.Bot
+bot = bot_cls(command_prefix=config.prefix, # Préfixe de config.json ("prefix", "!" par défaut)
+              **cache_profile.bot_kwargs(), # intents, member_cache_flags, chunk_guilds_at_startup
+              **shard_kwargs,
+              max_messages=config.max_messages, # Peut être réduit si le cache des mentions de l'AntiGhostPing est activé
+              tree_cls=InstrumentedCommandTree, # Mesure la latence et les erreurs de chaque commande slash
+              help_command=None) # help_command=None car nous avons une commande /help personnalisée
+
+# Chiffres agrégés de tous les clusters (None si le bot tourne dans un seul processus)
+bot.cluster_ipc = None
+if cluster is not None:
+    def cluster_stats() -> dict:
+        bot_stats = getattr(bot, 'bot_stats', None) # Totaux incrémentaux de InfoCommands, s'il est chargé
+        return {
+            'guilds': bot_stats.guild_count if bot_stats else len(bot.guilds),
+            'users': bot_stats.user_count if bot_stats else sum(guild.member_count or 0 for guild in bot.guilds),
+            'shards': sorted(bot.shards),
+            'latency': bot.latency if bot.is_ready() else None,
+            'ready': bot.is_ready(),
+        }
+    bot.cluster_ipc = ClusterIPCClient(cluster['cluster_id'], cluster_stats, cluster['ipc_secret'], port=cluster['ipc_port'])
+
+# Synchronisation des commandes slash évitée quand l'arbre n'a pas changé (forçable avec /sync)
+bot.command_sync = CommandSyncManager(
+    bot.tree,
+    state_path=config.command_sync.get('state_file', 'data/command_sync.json'),
+    dev_guild_ids=config.command_sync.get('dev_guild_ids', []),
+    max_individual_updates=config.command_sync.get('max_individual_updates', 5),
+)
+
+# Rechargement à chaud des cogs avec /reload (voir utils/hot_reload.py). Chaque processus recharge ses propres cogs ;
+# les commandes étant globales, seul le cluster 0 renvoie celles qui ont changé
+bot.cog_reloader = CogReloader(
+    bot,
+    drain_timeout=config.cog_loading.get('reload_drain_timeout', 30.0),
+    sync_commands=cluster is None or cluster['cluster_id'] == 0,
+)
 
 @bot.event
 async def on_ready():
@@ -35,81 +90,135 @@ async def on_ready():
     loaded_cogs = list(bot.cogs.keys())
     logger.info(f"Cogs chargés ({len(loaded_cogs)}): {', '.join(loaded_cogs)}")
 
-    # Synchronisation des commandes slash après la connexion du bot
-    logger.info("Synchronisation des commandes slash globales...")
-    try:
-        # Synchroniser les commandes globales.
-        # Pour synchroniser pour une guilde spécifique: await bot.tree.sync(guild=discord.Object(id=GUILD_ID))
-        synced = await bot.tree.sync()
-        logger.info(f"Synchronisé {len(synced)} commandes slash globales.")
-        for cmd in synced:
-            logger.debug(f"  - Commande synchronisée: /{cmd.name} (ID: {cmd.id})")
-    except discord.errors.Forbidden as e:
-        logger.error(f"Erreur de synchronisation des commandes slash: Accès interdit (Forbidden). Assurez-vous que le bot a la permission 'applications.commands'. Erreur: {e}")
-    except discord.app_commands.CommandSyncFailure as e:
-         logger.error(f"Échec de la synchronisation de certaines commandes slash. Commandes échouées: {e.failed_commands}")
-         logger.exception("Trace complète de l'erreur de synchronisation:")
-    except Exception as e:
-        logger.error(f"Erreur inattendue lors de la synchronisation des commandes slash: {type(e).__name__} - {e}")
-        logger.exception("Trace complète de l'erreur de synchronisation:")
+    # Synchronisation des commandes slash après la connexion du bot.
+    # on_ready est rappelé à chaque reconnexion : la synchronisation n'est envoyée à Discord
+    # que si l'empreinte de l'arbre de commandes a changé (voir utils/command_sync.py).
+    # Les serveurs de développement ("dev_guild_ids" de la clé "command_sync") sont synchronisés en plus.
+    if bot.cluster_ipc is not None:
+        bot.cluster_ipc.report_now() # Signale au lanceur que ce cluster est prêt
+        if cluster['cluster_id'] != 0:
+            return # Les commandes sont globales : seul le cluster 0 les synchronise
+    await bot.command_sync.sync_all()
 
 # Fonction asynchrone pour charger les cogs
+# Les modules sont importés en parallèle puis les setup sont exécutés selon les dépendances
+# déclarées (clé "cog_loading" de config.json) ; voir utils/cog_loader.py.
 async def load_all_cogs():
     logger.info("Début du chargement des cogs...")
-    loaded_cogs_list = []
-    for cog_name in config.cogs:
-        try:
-            await bot.load_extension(cog_name)
-            logger.info(f"Cog chargé avec succès: {cog_name}")
-            # Le nom réel du cog (nom de la classe) peut être différent du nom du fichier/module
-            # Pour obtenir le nom de la classe, il faudrait introspecter bot.cogs après le chargement
-        except commands.ExtensionNotFound:
-            logger.error(f"Erreur de chargement: Cog {cog_name} non trouvé (fichier manquant ou faute de frappe).")
-        except commands.ExtensionAlreadyLoaded:
-            logger.warning(f"Avertissement: Cog {cog_name} déjà chargé.")
-        except commands.NoEntryPointError:
-            logger.error(f"Erreur de chargement: Cog {cog_name} n'a pas de fonction setup().")
-        except commands.ExtensionFailed as e:
-            # L'exception originale est dans e.__cause__
-            original_exception = e.__cause__ if e.__cause__ else e
-            logger.error(f"Erreur de chargement: Cog {cog_name} a échoué. Erreur originale: {type(original_exception).__name__}: {original_exception}")
-            logger.exception(f"Trace complète de l'échec du chargement du cog {cog_name}:") # Loggue la stacktrace
-        except Exception as e:
-            logger.error(f"Erreur inattendue lors du chargement du cog {cog_name}: {type(e).__name__} - {e}")
-            logger.exception("Trace complète de l'erreur de chargement du cog:")
+    loader = CogLoader(
+        bot,
+        config.cogs,
+        dependencies=config.cog_loading.get('dependencies', {}),
+        parallel_imports=config.cog_loading.get('parallel_imports', True),
+        main_thread_imports=config.cog_loading.get('main_thread_imports', []),
+    )
+    bot.startup_profile = await loader.load_all()
+    logger.info(loader.report())
 
     # Afficher les noms de classe des cogs réellement chargés
     actual_loaded_cogs = list(bot.cogs.keys())
     logger.info(f"Chargement des cogs terminé. {len(actual_loaded_cogs)} cogs réellement dans bot.cogs: {', '.join(actual_loaded_cogs)}")
 
 
+# Assigner owner_id/owner_ids pour @app_commands.checks.is_owner() (au démarrage et quand "dev_id" est modifié)
+def apply_owners(dev_ids: tuple[int, ...]):
+    if len(dev_ids) == 1: # Si c'est un seul ID
+        bot.owner_id, bot.owner_ids = dev_ids[0], set()
+        logger.info(f"Propriétaire du bot (owner_id) défini sur : {bot.owner_id}")
+    elif dev_ids:
+        bot.owner_id, bot.owner_ids = None, set(dev_ids)
+        logger.info(f"Propriétaires du bot (owner_ids) définis sur : {bot.owner_ids}")
+    else:
+        bot.owner_id, bot.owner_ids = None, set()
+        logger.warning("Aucun dev_id trouvé dans config.json. @is_owner se basera sur le propriétaire de l'application Discord.")
+
+
+# Rechargement à chaud de config.json : les paramètres modifiés sont appliqués sans reconnexion à la gateway.
+# Les cogs réagissent à leurs propres paramètres dans leur listener on_config_reload(old, new, changed).
+async def on_config_change(old: config.ConfigSnapshot, new: config.ConfigSnapshot, changed: frozenset[str]):
+    if 'prefix' in changed:
+        bot.command_prefix = new.prefix
+    if 'dev_id' in changed:
+        apply_owners(new.dev_id)
+        bot_stats = getattr(bot, 'bot_stats', None)
+        if bot_stats is not None:
+            bot_stats.invalidate_owners()
+    if 'cog_loading' in changed:
+        bot.cog_reloader.drain_timeout = new.cog_loading.get('reload_drain_timeout', 30.0)
+    if 'cogs' in changed:
+        removed = [name for name in old.cogs if name not in new.cogs]
+        added = [name for name in new.cogs if name not in old.cogs]
+        for name in removed:
+            try:
+                await bot.unload_extension(name)
+                logger.info(f"Cog déchargé (retiré de la configuration): {name}")
+            except commands.ExtensionNotLoaded:
+                pass
+            except Exception as e:
+                logger.error(f"Erreur lors du déchargement du cog {name}: {type(e).__name__} - {e}")
+        if added:
+            loader = CogLoader(bot, added, dependencies=new.cog_loading.get('dependencies', {}),
+                               parallel_imports=new.cog_loading.get('parallel_imports', True),
+                               main_thread_imports=new.cog_loading.get('main_thread_imports', []))
+            await loader.load_all()
+            logger.info(loader.report())
+        # Les commandes sont globales : seul le cluster 0 les synchronise (envoi sauté si l'arbre n'a pas changé)
+        if (added or removed) and bot.is_ready() and (cluster is None or cluster['cluster_id'] == 0):
+            await bot.command_sync.sync_all()
+    bot.dispatch('config_reload', old, new, changed)
+
+bot.config_watcher = ConfigWatcher(config.CONFIG_PATH, interval=config.config_reload.get('interval', 2.0))
+bot.config_watcher.subscribe(on_config_change)
+
+
 # Fonction principale asynchrone
 async def main():
     """Fonction principale asynchrone."""
-    # Assigner owner_id/owner_ids pour @app_commands.checks.is_owner()
-    if config.dev_id:
-        if isinstance(config.dev_id, list) and len(config.dev_id) > 0 :
-            bot.owner_ids = set(int(id_str) for id_str in config.dev_id) # Assurez-vous que les IDs sont des int
-            logger.info(f"Propriétaires du bot (owner_ids) définis sur : {bot.owner_ids}")
-        elif isinstance(config.dev_id, (str, int)): # Si c'est un seul ID
-             bot.owner_id = int(config.dev_id)
-             logger.info(f"Propriétaire du bot (owner_id) défini sur : {bot.owner_id}")
-        else:
-            logger.warning("dev_id dans config.json n'est pas dans un format attendu (liste d'IDs ou ID unique). @is_owner pourrait ne pas fonctionner.")
-    else:
-        logger.warning("Aucun dev_id trouvé dans config.json. @is_owner se basera sur le propriétaire de l'application Discord.")
+    apply_owners(config.dev_id)
 
     async with bot:
         await load_all_cogs()
 
+        if bot.cluster_ipc is not None:
+            bot.cluster_ipc.start()
+
+        if config.config_reload.get('enabled', True):
+            bot.config_watcher.start()
+
+        # Export Prometheus des mesures des commandes (fichier local et/ou port HTTP local)
+        exporter = None
+        if config.metrics.get('prometheus_file') or config.metrics.get('prometheus_port'):
+            # En mode clusters, un fichier et un port par processus
+            cluster_id = cluster['cluster_id'] if cluster is not None else None
+            prometheus_file = config.metrics.get('prometheus_file')
+            prometheus_port = config.metrics.get('prometheus_port')
+            if cluster_id is not None:
+                prometheus_file = f"{prometheus_file}.{cluster_id}" if prometheus_file else None
+                prometheus_port = prometheus_port + cluster_id if prometheus_port else None
+            exporter = PrometheusExporter(
+                bot.tree.metrics,
+                path=prometheus_file,
+                port=prometheus_port,
+                interval=config.metrics.get('interval', 15.0),
+            )
+            await exporter.start()
+
         # La synchronisation des commandes slash est maintenant gérée dans l'événement on_ready
         # après que le bot soit complètement connecté
 
-        await bot.start(config.token)
+        try:
+            await bot.start(config.token)
+        finally:
+            # Arrêter l'écriture périodique et libérer le port HTTP de l'export
+            if exporter is not None:
+                await exporter.close()
 
 # Démarrer le bot
 if __name__ == "__main__":
     # Créer le dossier cogs s'il n'existe pas (au cas où, bien que les fichiers soient déjà là)
     # if not os.path.exists("cogs"):
     #     os.makedirs("cogs")
-    asyncio.run(main())
\ No newline at end of file
+    try:
+        asyncio.run(main())
+    finally:
+        log_listener.stop() # Vider la file de logs avant de quitter
\ No newline at end of file
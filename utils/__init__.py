@@ -0,0 +1,4 @@
+"""
+Initialisation du package utils.
+Ce package regroupe les briques réutilisables par les cogs (caches, files d'attente, etc.).
+"""
@@ -0,0 +1,224 @@
+"""
+Ordonnanceur d'envoi des alertes du bot.
+Chaque canal dispose de sa propre file d'attente vidée au rythme d'un seau à jetons
+(token bucket), pour ne jamais dépasser la limite d'envoi de Discord. Les alertes
+de même clé (ex: même auteur) arrivant dans une fenêtre donnée sont fusionnées :
+l'embed déjà envoyé est modifié au lieu d'en poster un nouveau.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Hashable
+
+import discord
+
+logger = logging.getLogger('discord.alert_scheduler')
+
+
+class TokenBucket:
+    """Seau à jetons : `rate` jetons par seconde, au plus `capacity` en réserve."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reconfigure(self, rate: float, capacity: int):
+        """Change le débit et la réserve ; les jetons accumulés jusqu'ici le sont à l'ancien débit."""
+        self._refill()
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = min(self._tokens, capacity)
+
+    async def acquire(self):
+        """Attend qu'un jeton soit disponible puis le consomme."""
+        self._refill()
+        while self._tokens < 1:
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+            self._refill()
+        self._tokens -= 1
+
+
+class _Alert:
+    """Alerte en attente ou déjà envoyée, regroupant un ou plusieurs éléments."""
+
+    __slots__ = ('key', 'items', 'count', 'render', 'message', 'updated_at', 'queued')
+
+    def __init__(self, key: Hashable, render: Callable[[list, int], discord.Embed]):
+        self.key = key
+        self.items: deque = deque(maxlen=10)  # Seuls les derniers éléments sont gardés pour le rendu
+        self.count = 0
+        self.render = render
+        self.message: discord.Message | None = None
+        self.updated_at = time.monotonic()
+        self.queued = False
+
+    def add(self, item: Any):
+        self.items.append(item)
+        self.count += 1
+        self.updated_at = time.monotonic()
+
+
+class _ChannelState:
+    __slots__ = ('channel', 'queue', 'bucket', 'recent', 'worker')
+
+    def __init__(self, channel: discord.abc.Messageable, bucket: TokenBucket):
+        self.channel = channel
+        self.queue: deque[_Alert] = deque()
+        self.bucket = bucket
+        self.recent: dict[Hashable, _Alert] = {}  # Dernière alerte par clé, pour la fusion
+        self.worker: asyncio.Task | None = None
+
+
+class AlertScheduler:
+    """
+    File d'envoi par canal avec fusion des alertes.
+
+    - `rate` / `burst` : débit du seau à jetons de chaque canal.
+    - `merge_window` : durée (s) pendant laquelle une alerte de même clé est fusionnée.
+    - `max_queue` : nombre maximal d'alertes en attente par canal (au-delà, elles sont abandonnées).
+    """
+
+    def __init__(self, rate: float = 1.0, burst: int = 3, merge_window: float = 30.0, max_queue: int = 20):
+        self.rate = rate
+        self.burst = burst
+        self.merge_window = merge_window
+        self.max_queue = max_queue
+        self._channels: dict[int, _ChannelState] = {}
+        self._last_sweep = time.monotonic()
+
+        # Métriques exposées via stats()
+        self.sent = 0
+        self.edited = 0
+        self.merged = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def set_rate(self, rate: float, burst: int):
+        """Applique un nouveau débit aux canaux à venir et aux seaux des canaux déjà suivis."""
+        self.rate = rate
+        self.burst = burst
+        for state in self._channels.values():
+            state.bucket.reconfigure(rate, burst)
+
+    def submit(self, channel: discord.abc.Messageable, key: Hashable, item: Any, render: Callable[[list, int], discord.Embed]) -> bool:
+        """
+        Planifie une alerte. `render(items, count)` construit l'embed à partir des derniers
+        éléments fusionnés et du nombre total d'éléments.
+
+        Retourne False si l'alerte a été abandonnée (file pleine).
+        """
+        self._sweep()
+        state = self._channels.get(channel.id)
+        if state is None:
+            state = self._channels[channel.id] = _ChannelState(channel, TokenBucket(self.rate, self.burst))
+        self._prune(state)
+
+        alert = state.recent.get(key)
+        if alert is not None:
+            alert.add(item)
+            if not alert.queued:
+                # Alerte déjà envoyée : planifier une modification de l'embed existant
+                if not self._enqueue(state, alert):
+                    return False
+            self.merged += 1
+            return True
+
+        if len(state.queue) >= self.max_queue:
+            self.dropped += 1
+            logger.warning(f"AlertScheduler: File pleine pour le canal {channel.id}, alerte abandonnée.")
+            return False
+
+        alert = _Alert(key, render)
+        alert.add(item)
+        state.recent[key] = alert
+        return self._enqueue(state, alert)
+
+    def _enqueue(self, state: _ChannelState, alert: _Alert) -> bool:
+        if len(state.queue) >= self.max_queue:
+            self.dropped += 1
+            return False
+        alert.queued = True
+        state.queue.append(alert)
+        if state.worker is None or state.worker.done():
+            state.worker = asyncio.create_task(self._drain(state))
+        return True
+
+    def _prune(self, state: _ChannelState):
+        """Oublie les alertes envoyées dont la fenêtre de fusion est écoulée."""
+        limit = time.monotonic() - self.merge_window
+        for key in [key for key, alert in state.recent.items() if not alert.queued and alert.updated_at < limit]:
+            del state.recent[key]
+
+    def _sweep(self):
+        """Libère, au plus une fois par fenêtre de fusion, les canaux devenus inactifs."""
+        now = time.monotonic()
+        if now - self._last_sweep < self.merge_window:
+            return
+        self._last_sweep = now
+        for channel_id, state in list(self._channels.items()):
+            self._prune(state)
+            if not state.queue and not state.recent and (state.worker is None or state.worker.done()):
+                del self._channels[channel_id]
+
+    async def _drain(self, state: _ChannelState):
+        """Vide la file d'un canal en respectant son seau à jetons."""
+        while state.queue:
+            alert = state.queue[0]
+            await state.bucket.acquire()
+            rendered_count = alert.count
+            try:
+                embed = alert.render(list(alert.items), alert.count)
+                if alert.message is not None:
+                    try:
+                        await alert.message.edit(embed=embed)
+                        self.edited += 1
+                    except discord.NotFound:
+                        # Message supprimé entre-temps : en renvoyer un nouveau
+                        alert.message = await state.channel.send(embed=embed)
+                        self.sent += 1
+                else:
+                    alert.message = await state.channel.send(embed=embed)
+                    self.sent += 1
+            except discord.Forbidden:
+                self.failed += 1
+                logger.warning(f"AlertScheduler: Impossible d'envoyer l'alerte dans le canal {state.channel.id} (permissions manquantes).")
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"AlertScheduler: Erreur lors de l'envoi de l'alerte: {type(e).__name__} - {e}")
+
+            # L'alerte reste "en file" pendant l'envoi pour que les fusions concurrentes
+            # ne déclenchent pas un second envoi ; si elle a évolué entre-temps, replanifier une modification.
+            state.queue.popleft()
+            alert.queued = False
+            if alert.count != rendered_count and alert.message is not None:
+                self._enqueue(state, alert)
+
+    def queue_depth(self) -> int:
+        """Nombre total d'alertes en attente, tous canaux confondus."""
+        return sum(len(state.queue) for state in self._channels.values())
+
+    def stats(self) -> dict:
+        return {
+            'queue_depth': self.queue_depth(),
+            'channels': len(self._channels),
+            'sent': self.sent,
+            'edited': self.edited,
+            'merged': self.merged,
+            'dropped': self.dropped,
+            'failed': self.failed,
+        }
+
+    def close(self):
+        """Annule les envois en cours (déchargement du cog)."""
+        for state in self._channels.values():
+            if state.worker is not None and not state.worker.done():
+                state.worker.cancel()
+        self._channels.clear()
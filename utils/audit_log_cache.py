@@ -0,0 +1,159 @@
+"""
+Cache des logs d'audit pour la détection des ghost pings.
+Ce module évite un appel REST `guild.audit_logs(...)` par message supprimé :
+les entrées `message_delete` récentes sont gardées en mémoire pendant un court TTL,
+et les recherches sans résultat d'une même guilde partagent un seul fetch.
+Une absence en mémoire ne prouve rien (la suppression peut être plus récente que
+le dernier fetch) : seul un fetch lancé après la recherche fait foi.
+"""
+import asyncio
+import datetime
+import logging
+import time
+from collections import OrderedDict
+
+import discord
+from discord import AuditLogAction
+
+logger = logging.getLogger('discord.audit_log_cache')
+
+
+class AuditLogRecord:
+    """Entrée `message_delete` réduite au strict nécessaire."""
+
+    __slots__ = ('entry_id', 'count', 'deleter_id', 'deleter_name', 'seen_at')
+
+    def __init__(self, entry_id: int, count: int, deleter_id: int, deleter_name: str, seen_at: datetime.datetime):
+        self.entry_id = entry_id
+        self.count = count
+        self.deleter_id = deleter_id
+        self.deleter_name = deleter_name
+        self.seen_at = seen_at
+
+
+class AuditLogCache:
+    """
+    Cache par guilde des entrées `message_delete` des logs d'audit.
+
+    Les entrées sont indexées par (cible, canal) dans un tampon circulaire borné
+    (`max_entries`) et expirent après `ttl` secondes. Une entrée trouvée en mémoire
+    est servie directement ; sinon la recherche attend le prochain fetch de la guilde
+    (partagé par toutes les recherches arrivées avant son envoi). Deux fetchs d'une
+    guilde sont espacés d'au moins `refresh_interval` secondes et ne se chevauchent pas.
+    """
+
+    def __init__(self, ttl: float = 15.0, refresh_interval: float = 2.0, max_entries: int = 50, fetch_limit: int = 10):
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.max_entries = max_entries
+        self.fetch_limit = fetch_limit
+
+        self._entries: dict[int, OrderedDict[tuple[int, int], AuditLogRecord]] = {}
+        self._last_fetch: dict[int, float] = {}
+        self._inflight: dict[int, asyncio.Task] = {}  # Dernier fetch programmé ou en cours, par guilde
+        self._pending: dict[int, asyncio.Task] = {}   # Fetch programmé dont la requête n'est pas encore partie
+
+        # Compteurs exposés via stats()
+        self.hits = 0       # Recherches servies depuis la mémoire
+        self.coalesced = 0  # Recherches qui ont rejoint un fetch programmé
+        self.misses = 0     # Recherches ayant programmé un appel REST
+
+    async def find_deleter(self, guild: discord.Guild, target_id: int, channel_id: int) -> AuditLogRecord | None:
+        """
+        Retourne l'entrée récente indiquant qu'un modérateur a supprimé un message
+        de `target_id` dans `channel_id`, ou None si aucune n'est connue.
+
+        Les exceptions du fetch (ex: discord.Forbidden) sont propagées à l'appelant.
+        """
+        record = self._lookup(guild.id, target_id, channel_id)
+        if record is not None:
+            self.hits += 1
+            return record
+
+        # Rejoindre le fetch programmé s'il n'est pas encore parti (il verra cette suppression),
+        # sinon en programmer un à la suite du fetch en cours
+        task = self._pending.get(guild.id)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.create_task(self._refresh(guild, self._inflight.get(guild.id)))
+            self._pending[guild.id] = task
+            self._inflight[guild.id] = task
+            task.add_done_callback(lambda done, guild_id=guild.id: self._forget(guild_id, done))
+        await asyncio.shield(task)
+        return self._lookup(guild.id, target_id, channel_id)
+
+    def _forget(self, guild_id: int, task: asyncio.Task):
+        if self._inflight.get(guild_id) is task:
+            del self._inflight[guild_id]
+        if self._pending.get(guild_id) is task:
+            del self._pending[guild_id]
+        if not task.cancelled():
+            task.exception()  # Déjà propagée aux recherches : évite l'avertissement "exception never retrieved"
+
+    async def _refresh(self, guild: discord.Guild, previous: asyncio.Task | None):
+        """Fetch programmé : après le fetch précédent et au moins `refresh_interval` secondes après lui."""
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        delay = self._last_fetch.get(guild.id, float('-inf')) + self.refresh_interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # La requête part maintenant : les recherches suivantes programmeront un autre fetch
+        if self._pending.get(guild.id) is asyncio.current_task():
+            del self._pending[guild.id]
+        await self._fetch(guild)
+
+    def _lookup(self, guild_id: int, target_id: int, channel_id: int) -> AuditLogRecord | None:
+        entries = self._entries.get(guild_id)
+        if not entries:
+            return None
+        record = entries.get((target_id, channel_id))
+        # Les entrées expirées restent dans le tampon (borné) pour suivre l'évolution de extra.count
+        if record is None or record.seen_at < discord.utils.utcnow() - datetime.timedelta(seconds=self.ttl):
+            return None
+        return record
+
+    async def _fetch(self, guild: discord.Guild):
+        """Récupère les dernières entrées `message_delete` et met à jour le tampon de la guilde."""
+        entries = self._entries.setdefault(guild.id, OrderedDict())
+        now = discord.utils.utcnow()
+        self._last_fetch[guild.id] = time.monotonic()
+        fetched = []
+        async for entry in guild.audit_logs(limit=self.fetch_limit, action=AuditLogAction.message_delete):
+            fetched.append(entry)
+
+        # Parcourir du plus ancien au plus récent pour garder l'ordre d'insertion cohérent
+        for entry in reversed(fetched):
+            target_id = getattr(entry.target, 'id', None)
+            channel = getattr(entry.extra, 'channel', None)
+            if target_id is None or channel is None or entry.user is None:
+                continue
+            key = (target_id, channel.id)
+            count = getattr(entry.extra, 'count', 1) or 1
+            record = entries.get(key)
+
+            if record is not None and record.entry_id == entry.id and record.count == count:
+                continue  # Rien de nouveau pour cette entrée
+
+            # Discord regroupe les suppressions successives dans la même entrée en
+            # incrémentant extra.count : une hausse du compteur est une nouvelle suppression.
+            seen_at = entry.created_at if record is None or record.entry_id != entry.id else now
+            entries[key] = AuditLogRecord(entry.id, count, entry.user.id, entry.user.name, seen_at)
+            entries.move_to_end(key)
+
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+        logger.debug(f"AuditLogCache [{guild.name}]: {len(fetched)} entrée(s) récupérée(s), {len(entries)} en mémoire.")
+
+    def stats(self) -> dict:
+        """Retourne les compteurs du cache (les hits et coalesced sont des appels REST évités)."""
+        lookups = self.hits + self.coalesced + self.misses
+        return {
+            'hits': self.hits,
+            'coalesced': self.coalesced,
+            'misses': self.misses,
+            'rest_calls_saved': self.hits + self.coalesced,
+            'hit_rate': (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            'guilds': len(self._entries),
+        }
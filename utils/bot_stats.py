@@ -0,0 +1,120 @@
+"""
+Statistiques du bot tenues à jour de façon incrémentale.
+Les totaux (serveurs, membres) sont recalculés une seule fois à la connexion puis
+ajustés par les événements d'arrivée/départ de serveurs et de membres ; les
+propriétaires du bot sont résolus une fois et gardés en cache avec une durée de vie.
+/botinfo lit ainsi ses chiffres sans parcourir les serveurs ni appeler l'API.
+"""
+import asyncio
+import logging
+import time
+
+import discord
+
+logger = logging.getLogger('discord.bot_stats')
+
+
+class BotStatsService:
+    """
+    Compteurs de serveurs et de membres, et cache des propriétaires du bot.
+
+    Args:
+        bot: L'instance du bot.
+        owner_ttl: Durée de vie (secondes) du cache des propriétaires.
+    """
+
+    def __init__(self, bot: discord.Client, owner_ttl: float = 3600.0):
+        self.bot = bot
+        self.owner_ttl = owner_ttl
+        self._member_counts: dict[int, int] = {}
+        self.guild_count = 0
+        self.user_count = 0
+        self.rebuilt_at: float | None = None
+
+        self._owners: list[discord.User | int] = []
+        self._owners_expires_at = 0.0
+        self._owners_task: asyncio.Task | None = None
+
+        # Compteurs exposés via stats()
+        self.rebuilds = 0
+        self.owner_fetches = 0
+
+    # --- Totaux des serveurs et des membres ---
+
+    def rebuild(self):
+        """Recalcule tous les totaux (à la connexion, une seule passe sur les serveurs)."""
+        self._member_counts = {guild.id: guild.member_count or 0 for guild in self.bot.guilds}
+        self.guild_count = len(self._member_counts)
+        self.user_count = sum(self._member_counts.values())
+        self.rebuilt_at = time.time()
+        self.rebuilds += 1
+
+    def guild_joined(self, guild: discord.Guild):
+        if guild.id in self._member_counts:
+            return
+        count = guild.member_count or 0
+        self._member_counts[guild.id] = count
+        self.guild_count += 1
+        self.user_count += count
+
+    def guild_removed(self, guild: discord.Guild):
+        count = self._member_counts.pop(guild.id, None)
+        if count is None:
+            return
+        self.guild_count -= 1
+        self.user_count -= count
+
+    def member_delta(self, guild: discord.Guild, delta: int):
+        if guild.id not in self._member_counts:
+            return
+        self._member_counts[guild.id] += delta
+        self.user_count += delta
+
+    # --- Propriétaires du bot ---
+
+    def owner_ids(self) -> list[int]:
+        if self.bot.owner_id:
+            return [self.bot.owner_id]
+        return sorted(self.bot.owner_ids or ())
+
+    def invalidate_owners(self):
+        """Oublie les propriétaires en cache (ex: "dev_id" modifié dans la configuration)."""
+        self._owners_expires_at = 0.0
+
+    async def owners(self) -> list[discord.User | int]:
+        """
+        Propriétaires du bot (utilisateurs, ou ID pour ceux introuvables).
+        Les appels concurrents partagent la même résolution ; tant que le cache est valide, aucun appel API.
+        """
+        if time.monotonic() < self._owners_expires_at:
+            return self._owners
+        if self._owners_task is None or self._owners_task.done():
+            self._owners_task = asyncio.create_task(self._resolve_owners())
+        return await asyncio.shield(self._owners_task)
+
+    async def _resolve_owners(self) -> list[discord.User | int]:
+        owner_ids = self.owner_ids()
+        resolved = {owner_id: self.bot.get_user(owner_id) for owner_id in owner_ids}
+        missing = [owner_id for owner_id, user in resolved.items() if user is None]
+        if missing:
+            self.owner_fetches += len(missing)
+            results = await asyncio.gather(*(self.bot.fetch_user(owner_id) for owner_id in missing), return_exceptions=True)
+            for owner_id, result in zip(missing, results):
+                if isinstance(result, discord.User):
+                    resolved[owner_id] = result
+                elif not isinstance(result, discord.NotFound):
+                    logger.warning(f"Impossible de récupérer le propriétaire {owner_id}: {type(result).__name__} - {result}")
+        self._owners = [resolved[owner_id] or owner_id for owner_id in owner_ids]
+        # Si un propriétaire n'a pas pu être résolu (erreur passagère), réessayer plus tôt
+        ttl = self.owner_ttl if all(not isinstance(owner, int) for owner in self._owners) else min(self.owner_ttl, 60.0)
+        self._owners_expires_at = time.monotonic() + ttl
+        return self._owners
+
+    def stats(self) -> dict:
+        return {
+            'guilds': self.guild_count,
+            'users': self.user_count,
+            'rebuilds': self.rebuilds,
+            'owner_fetches': self.owner_fetches,
+            'owners_cached': time.monotonic() < self._owners_expires_at,
+        }
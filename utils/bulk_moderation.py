@@ -0,0 +1,433 @@
+"""
+Moteur de modération de masse (/massban, /masskick).
+Un job est une liste de cibles résolue d'avance, exécutée en arrière-plan :
+- les bannissements passent par l'endpoint de bannissement groupé (200 utilisateurs par
+  appel) quand le bot en a la permission, sinon un par un ;
+- les appels unitaires sont espacés par un rythme adaptatif (AIMD) : l'intervalle grandit
+  quand un appel a été freiné par les limites de débit et diminue doucement sinon ;
+- un seul job tourne à la fois par serveur (les limites de débit sont par serveur) ;
+- l'état du job est écrit sur disque après chaque lot : un job interrompu par un
+  redémarrage reprend là où il s'était arrêté.
+L'affichage de la progression est délégué à un rappel (`on_progress`) fourni par le cog.
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import secrets
+import time
+from typing import Awaitable, Callable
+
+import discord
+
+logger = logging.getLogger('discord.bulk_moderation')
+logger.setLevel(logging.INFO)
+
+SNOWFLAKE_RE = re.compile(r'(?<!\d)\d{17,20}(?!\d)')
+BULK_BAN_LIMIT = 200  # Limite Discord de l'endpoint de bannissement groupé
+MAX_RETRIES = 3
+AUDIT_REASON_LIMIT = 512
+
+ACTIVE_STATUSES = ('pending', 'running')
+
+
+def parse_user_ids(text: str) -> list[int]:
+    """Extrait les IDs d'utilisateurs (snowflakes) d'un texte, sans doublons et dans l'ordre."""
+    return list(dict.fromkeys(int(match) for match in SNOWFLAKE_RE.findall(text)))
+
+
+class TargetFilters:
+    """
+    Filtres de sélection des cibles.
+
+    Args:
+        joined_within: Ne garder que les membres arrivés il y a moins de N secondes.
+        account_age: Ne garder que les comptes créés il y a moins de N secondes.
+        name_pattern: Expression régulière appliquée au nom d'utilisateur et au nom affiché.
+    """
+
+    __slots__ = ('joined_within', 'account_age', 'name_pattern')
+
+    def __init__(self, joined_within: float | None = None, account_age: float | None = None, name_pattern: re.Pattern | None = None):
+        self.joined_within = joined_within
+        self.account_age = account_age
+        self.name_pattern = name_pattern
+
+    def is_empty(self) -> bool:
+        return self.joined_within is None and self.account_age is None and self.name_pattern is None
+
+    def needs_members(self) -> bool:
+        """La date d'arrivée et le nom ne sont connus que pour les membres (l'âge du compte se déduit de l'ID)."""
+        return self.joined_within is not None or self.name_pattern is not None
+
+    def matches(self, user_id: int, member: discord.Member | None, now: float) -> bool:
+        if self.account_age is not None and now - discord.utils.snowflake_time(user_id).timestamp() > self.account_age:
+            return False
+        if self.needs_members() and member is None:
+            return False
+        if self.joined_within is not None and (member.joined_at is None or now - member.joined_at.timestamp() > self.joined_within):
+            return False
+        if self.name_pattern is not None and not (
+            self.name_pattern.search(member.name) or self.name_pattern.search(member.display_name)
+        ):
+            return False
+        return True
+
+
+class BulkJob:
+    """Un job de modération de masse et sa progression (sérialisable en JSON)."""
+
+    __slots__ = (
+        'job_id', 'guild_id', 'channel_id', 'message_id', 'action', 'target_ids', 'reason', 'moderator_id',
+        'delete_message_seconds', 'position', 'succeeded', 'failed', 'status', 'cancel_requested',
+        'created_at', 'updated_at', 'source',
+    )
+
+    def __init__(self, guild_id: int, action: str, target_ids: list[int], moderator_id: int, reason: str | None = None,
+                 channel_id: int | None = None, message_id: int | None = None, delete_message_seconds: int = 0,
+                 source: str = 'commande', job_id: str | None = None):
+        self.job_id = job_id or secrets.token_hex(4)
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.message_id = message_id
+        self.action = action  # 'ban' ou 'kick'
+        self.target_ids = target_ids
+        self.reason = reason
+        self.moderator_id = moderator_id
+        self.delete_message_seconds = delete_message_seconds
+        self.position = 0
+        self.succeeded = 0
+        self.failed: dict[str, int] = {}  # Motif d'échec -> nombre
+        self.status = 'pending'
+        self.cancel_requested = False
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.source = source
+
+    @property
+    def failed_count(self) -> int:
+        return sum(self.failed.values())
+
+    @property
+    def done(self) -> bool:
+        return self.status not in ACTIVE_STATUSES
+
+    def record_failure(self, reason: str, count: int = 1):
+        self.failed[reason] = self.failed.get(reason, 0) + count
+
+    def audit_reason(self) -> str:
+        reason = f"{self.reason or 'Aucune raison'} (modération de masse {self.job_id}, par {self.moderator_id})"
+        return reason[:AUDIT_REASON_LIMIT]
+
+    def to_dict(self) -> dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'BulkJob':
+        job = cls.__new__(cls)
+        for slot in cls.__slots__:
+            setattr(job, slot, data.get(slot))
+        job.failed = job.failed or {}
+        return job
+
+
+class AdaptivePacer:
+    """
+    Espacement adaptatif des appels : un appel anormalement long (freiné par une limite de débit)
+    ou une réponse 429 double l'intervalle, chaque appel normal le réduit d'un petit pas.
+    """
+
+    def __init__(self, interval: float = 0.5, min_interval: float = 0.2, max_interval: float = 10.0, slow_call: float = 2.0):
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.slow_call = slow_call
+        self._last_call = 0.0
+
+    async def wait(self):
+        delay = self._last_call + self.interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._last_call = time.monotonic()
+
+    def record(self, elapsed: float):
+        if elapsed >= self.slow_call:
+            self.slow_down()
+        else:
+            self.interval = max(self.min_interval, self.interval - 0.05)
+
+    def slow_down(self, retry_after: float | None = None):
+        self.interval = min(self.max_interval, max(self.interval * 2, retry_after or 0.0))
+
+
+class BulkModerationEngine:
+    """
+    File des jobs de modération de masse.
+
+    Args:
+        bot: L'instance du bot.
+        on_progress: Rappel `async (job)` appelé au plus toutes les `progress_interval` secondes et à la fin du job.
+        state_dir: Dossier où l'état des jobs en cours est écrit (reprise après redémarrage).
+        progress_interval: Intervalle minimal (secondes) entre deux rappels de progression.
+        batch_size: Taille des lots de bannissement groupé (200 au maximum).
+    """
+
+    def __init__(self, bot: discord.Client, on_progress: Callable[[BulkJob], Awaitable[None]],
+                 state_dir: str = 'data/bulk_jobs', progress_interval: float = 3.0, batch_size: int = BULK_BAN_LIMIT):
+        self.bot = bot
+        self.on_progress = on_progress
+        self.state_dir = state_dir
+        self.progress_interval = progress_interval
+        self.batch_size = max(1, min(batch_size, BULK_BAN_LIMIT))
+        self.jobs: dict[str, BulkJob] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._guild_locks: dict[int, asyncio.Lock] = {}
+        self._pacers: dict[int, AdaptivePacer] = {}
+
+        # Compteurs exposés via stats()
+        self.completed = 0
+        self.actions_done = 0
+        self.actions_failed = 0
+
+    # --- Persistance ---
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.state_dir, f"{job_id}.json")
+
+    def _save(self, job: BulkJob):
+        job.updated_at = time.time()
+        try:
+            os.makedirs(self.state_dir, exist_ok=True)
+            tmp_path = f"{self._path(job.job_id)}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(job.to_dict(), f)
+            os.replace(tmp_path, self._path(job.job_id))
+        except OSError as e:
+            logger.error(f"Impossible d'enregistrer l'état du job {job.job_id}: {type(e).__name__} - {e}")
+
+    def _discard_state(self, job: BulkJob):
+        try:
+            os.remove(self._path(job.job_id))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Impossible de supprimer l'état du job {job.job_id}: {type(e).__name__} - {e}")
+
+    def owns_guild(self, guild_id: int) -> bool:
+        """True si le serveur est servi par un shard de ce processus (avec launcher.py, chaque cluster n'a qu'une partie des shards)."""
+        shard_count = self.bot.shard_count or 1
+        if shard_count <= 1:
+            return True
+        shard_ids = getattr(self.bot, 'shard_ids', None) or list(getattr(self.bot, 'shards', None) or ())
+        if not shard_ids:
+            if self.bot.shard_id is None:
+                return True
+            shard_ids = [self.bot.shard_id]
+        return (guild_id >> 22) % shard_count in shard_ids
+
+    def resume(self, guild_id: int | None = None) -> int:
+        """
+        Relance les jobs interrompus par un arrêt du bot (ceux de `guild_id` seulement, si indiqué).
+        Le répertoire d'état est partagé par les clusters : les jobs des serveurs d'un autre processus
+        sont laissés à ce processus, et ceux d'un serveur indisponible attendent qu'il le redevienne.
+        Retourne le nombre de jobs repris.
+        """
+        if not os.path.isdir(self.state_dir):
+            return 0
+        resumed = 0
+        for entry in sorted(os.scandir(self.state_dir), key=lambda entry: entry.stat().st_mtime):
+            if not entry.name.endswith('.json'):
+                continue
+            try:
+                with open(entry.path, 'r', encoding='utf-8') as f:
+                    job = BulkJob.from_dict(json.load(f))
+            except (OSError, json.JSONDecodeError) as e:
+                logger.error(f"État de job illisible ({entry.path}): {type(e).__name__} - {e}")
+                continue
+            if job.job_id in self.jobs or job.done:
+                continue
+            if (guild_id is not None and job.guild_id != guild_id) or not self.owns_guild(job.guild_id):
+                continue
+            guild = self.bot.get_guild(job.guild_id)
+            if guild is None or guild.unavailable:
+                logger.info(f"Job {job.job_id}: serveur {job.guild_id} indisponible, reprise quand il le redeviendra.")
+                continue
+            logger.info(f"Reprise du job {job.job_id} ({job.action}) à {job.position}/{len(job.target_ids)} sur le serveur {job.guild_id}")
+            self._schedule(job)
+            resumed += 1
+        return resumed
+
+    # --- Exécution ---
+
+    def submit(self, job: BulkJob) -> BulkJob:
+        self._save(job)
+        self._schedule(job)
+        logger.info(f"Job {job.job_id} ({job.action}, {len(job.target_ids)} cible(s)) soumis sur le serveur {job.guild_id} (source: {job.source})")
+        return job
+
+    def _schedule(self, job: BulkJob):
+        self.jobs[job.job_id] = job
+        self._tasks[job.job_id] = asyncio.create_task(self._run(job), name=f"bulk-moderation-{job.job_id}")
+
+    def cancel(self, job_id: str) -> BulkJob | None:
+        job = self.jobs.get(job_id)
+        if job is None or job.done:
+            return None
+        job.cancel_requested = True
+        self._save(job)
+        return job
+
+    def active_jobs(self, guild_id: int | None = None) -> list[BulkJob]:
+        return [job for job in self.jobs.values() if not job.done and (guild_id is None or job.guild_id == guild_id)]
+
+    async def _notify(self, job: BulkJob):
+        try:
+            await self.on_progress(job)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'affichage de la progression du job {job.job_id}: {type(e).__name__} - {e}")
+
+    async def _run(self, job: BulkJob):
+        lock = self._guild_locks.setdefault(job.guild_id, asyncio.Lock())
+        try:
+            async with lock:
+                await self._execute(job)
+        except asyncio.CancelledError:
+            self._save(job)  # Arrêt du bot : le job reprendra au prochain démarrage
+            raise
+        except Exception as e:
+            logger.exception(f"Erreur inattendue dans le job {job.job_id}: {type(e).__name__} - {e}")
+            job.status = 'failed'
+        finally:
+            self._tasks.pop(job.job_id, None)
+        if job.done:
+            self.completed += 1
+            self._discard_state(job)
+            await self._notify(job)
+            # Les jobs terminés restent consultables en mémoire, dans la limite des 50 derniers
+            finished = [other for other in self.jobs.values() if other.done]
+            for old_job in sorted(finished, key=lambda other: other.updated_at)[:-50]:
+                self.jobs.pop(old_job.job_id, None)
+
+    async def _execute(self, job: BulkJob):
+        guild = self.bot.get_guild(job.guild_id)
+        if guild is None:
+            logger.warning(f"Job {job.job_id}: serveur {job.guild_id} introuvable, job abandonné.")
+            job.status = 'failed'
+            return
+
+        job.status = 'running'
+        self._save(job)
+        await self._notify(job)
+        pacer = self._pacers.setdefault(job.guild_id, AdaptivePacer())
+        use_bulk = job.action == 'ban' and guild.me.guild_permissions.manage_guild
+        last_progress = time.monotonic()
+        retries = 0
+
+        while job.position < len(job.target_ids):
+            if job.cancel_requested:
+                job.status = 'cancelled'
+                break
+            if use_bulk:
+                batch = job.target_ids[job.position:job.position + self.batch_size]
+                use_bulk = await self._bulk_ban(guild, job, batch, pacer)
+                if not use_bulk:
+                    continue  # Permission manquante : même lot, un par un
+                job.position += len(batch)
+            else:
+                if await self._single(guild, job, job.target_ids[job.position], pacer):
+                    job.position += 1
+                    retries = 0
+                elif (retries := retries + 1) >= MAX_RETRIES:
+                    job.record_failure("erreur de l'API")
+                    self.actions_failed += 1
+                    job.position += 1
+                    retries = 0
+
+            now = time.monotonic()
+            if use_bulk or now - last_progress >= self.progress_interval or job.position >= len(job.target_ids):
+                self._save(job)
+            if now - last_progress >= self.progress_interval:
+                last_progress = now
+                await self._notify(job)
+        else:
+            job.status = 'done'
+        self._save(job)
+        logger.info(f"Job {job.job_id} terminé ({job.status}): {job.succeeded} réussite(s), {job.failed_count} échec(s)")
+
+    async def _bulk_ban(self, guild: discord.Guild, job: BulkJob, batch: list[int], pacer: AdaptivePacer) -> bool:
+        """Bannit un lot en un appel. Retourne False si le bannissement groupé n'est pas autorisé."""
+        for attempt in range(MAX_RETRIES):
+            await pacer.wait()
+            try:
+                result = await guild.bulk_ban(
+                    [discord.Object(id=user_id) for user_id in batch],
+                    reason=job.audit_reason(),
+                    delete_message_seconds=job.delete_message_seconds
+                )
+            except discord.Forbidden:
+                logger.warning(f"Job {job.job_id}: bannissement groupé refusé, passage aux bannissements un par un.")
+                return False
+            except discord.HTTPException as e:
+                if e.status == 429 or e.status >= 500:
+                    pacer.slow_down(getattr(e, 'retry_after', None))
+                    continue
+                if e.code == 500000:  # Aucun utilisateur n'a pu être banni (déjà bannis ou introuvables)
+                    job.record_failure("déjà banni ou introuvable", len(batch))
+                    self.actions_failed += len(batch)
+                    return True
+                raise
+            job.succeeded += len(result.banned)
+            self.actions_done += len(result.banned)
+            if result.failed:
+                job.record_failure("déjà banni ou introuvable", len(result.failed))
+                self.actions_failed += len(result.failed)
+            return True
+        job.record_failure("erreur de l'API", len(batch))
+        self.actions_failed += len(batch)
+        return True
+
+    async def _single(self, guild: discord.Guild, job: BulkJob, user_id: int, pacer: AdaptivePacer) -> bool:
+        """Traite une cible. Retourne False pour la retenter (limite de débit ou erreur serveur)."""
+        await pacer.wait()
+        started = time.monotonic()
+        target = discord.Object(id=user_id)
+        try:
+            if job.action == 'ban':
+                await guild.ban(target, reason=job.audit_reason(), delete_message_seconds=job.delete_message_seconds)
+            else:
+                await guild.kick(target, reason=job.audit_reason())
+        except discord.NotFound:
+            job.record_failure("introuvable" if job.action == 'ban' else "n'est plus membre")
+            self.actions_failed += 1
+        except discord.Forbidden:
+            job.record_failure("permissions ou hiérarchie des rôles")
+            self.actions_failed += 1
+        except discord.HTTPException as e:
+            if e.status == 429 or e.status >= 500:
+                pacer.slow_down(getattr(e, 'retry_after', None))
+                return False
+            job.record_failure(f"erreur HTTP {e.status}")
+            self.actions_failed += 1
+        else:
+            job.succeeded += 1
+            self.actions_done += 1
+        pacer.record(time.monotonic() - started)
+        return True
+
+    async def close(self):
+        """Arrête les jobs en cours (leur état est gardé sur disque pour la reprise)."""
+        for task in list(self._tasks.values()):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    def stats(self) -> dict:
+        active = self.active_jobs()
+        return {
+            'running': sum(1 for job in active if job.status == 'running'),
+            'pending': sum(1 for job in active if job.status == 'pending'),
+            'completed': self.completed,
+            'actions_done': self.actions_done,
+            'actions_failed': self.actions_failed,
+        }
@@ -0,0 +1,73 @@
+"""
+Profils d'intents et de cache des membres.
+Chaque profil fixe les intents de la Gateway, les membres gardés en cache
+(`MemberCacheFlags`) et le chargement (chunking) des membres au démarrage.
+Les commandes qui ont besoin d'un membre absent du cache le récupèrent à la demande.
+"""
+import logging
+
+import discord
+
+logger = logging.getLogger('discord.cache_profiles')
+
+DEFAULT_PROFILE = 'minimal'
+
+
+class CacheProfile:
+    """Réglages passés au constructeur du bot pour un profil donné."""
+
+    __slots__ = ('name', 'intents', 'member_cache_flags', 'chunk_guilds_at_startup')
+
+    def __init__(self, name: str, intents: discord.Intents, member_cache_flags: discord.MemberCacheFlags,
+                 chunk_guilds_at_startup: bool):
+        self.name = name
+        self.intents = intents
+        self.member_cache_flags = member_cache_flags
+        self.chunk_guilds_at_startup = chunk_guilds_at_startup
+
+    def bot_kwargs(self) -> dict:
+        return {
+            'intents': self.intents,
+            'member_cache_flags': self.member_cache_flags,
+            'chunk_guilds_at_startup': self.chunk_guilds_at_startup,
+        }
+
+
+def _minimal() -> CacheProfile:
+    # Serveurs, messages (dont leur contenu pour l'AntiGhostPing) : aucun membre n'est gardé en cache
+    intents = discord.Intents.none()
+    intents.guilds = True
+    intents.guild_messages = True
+    intents.message_content = True
+    return CacheProfile('minimal', intents, discord.MemberCacheFlags.none(), False)
+
+
+def _moderation() -> CacheProfile:
+    # Profil minimal + événements de membres et de sanctions ; seuls les membres vus arriver sont gardés
+    profile = _minimal()
+    profile.name = 'moderation'
+    profile.intents.members = True
+    profile.intents.moderation = True
+    profile.member_cache_flags = discord.MemberCacheFlags(voice=False, joined=True)
+    return profile
+
+
+def _full() -> CacheProfile:
+    # Comportement historique : tous les intents, tous les membres chargés au démarrage
+    return CacheProfile('full', discord.Intents.all(), discord.MemberCacheFlags.all(), True)
+
+
+PROFILES = {
+    'minimal': _minimal,
+    'moderation': _moderation,
+    'full': _full,
+}
+
+
+def get_profile(name: str | None) -> CacheProfile:
+    """Retourne le profil `name` (insensible à la casse), ou le profil par défaut s'il est inconnu."""
+    key = (name or DEFAULT_PROFILE).lower()
+    if key not in PROFILES:
+        logger.warning(f"Profil de cache inconnu '{name}', utilisation du profil '{DEFAULT_PROFILE}'. Profils disponibles: {', '.join(PROFILES)}")
+        key = DEFAULT_PROFILE
+    return PROFILES[key]()
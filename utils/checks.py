@@ -0,0 +1,19 @@
+"""
+Vérifications partagées entre les cogs.
+"""
+import discord
+from discord.ext import commands
+
+
+async def is_bot_owner(bot: commands.Bot, interaction: discord.Interaction) -> bool:
+    """Vérifie si l'utilisateur de l'interaction est un propriétaire du bot."""
+    if bot.owner_id:
+        return interaction.user.id == bot.owner_id
+    if bot.owner_ids:
+        return interaction.user.id in bot.owner_ids
+    # Si aucun owner_id(s) n'est défini, essayez de récupérer le propriétaire de l'application
+    # Cela peut être moins fiable si le bot est dans une équipe sans propriétaires explicitement définis.
+    app_info = await bot.application_info()
+    if app_info.team:
+        return interaction.user.id in [member.id for member in app_info.team.members]
+    return interaction.user.id == app_info.owner.id
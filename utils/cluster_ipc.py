@@ -0,0 +1,193 @@
+"""
+Canal IPC local entre le lanceur de clusters (launcher.py) et les processus du bot.
+Chaque cluster envoie périodiquement ses chiffres (serveurs, utilisateurs, shards, latence) ;
+le lanceur répond avec l'agrégat de tous les clusters, que le cluster garde en mémoire.
+Les commandes comme /botinfo lisent donc les totaux sans attendre le réseau.
+
+Protocole : une ligne JSON par message sur une connexion TCP locale, authentifiée
+par un secret partagé transmis dans l'environnement des clusters.
+"""
+import asyncio
+import hmac
+import json
+import logging
+import os
+import time
+from typing import Callable
+
+logger = logging.getLogger('discord.cluster_ipc')
+logger.setLevel(logging.INFO)
+
+MAX_LINE_BYTES = 64 * 1024
+
+# Variables d'environnement transmises par launcher.py à chaque cluster
+ENV_PREFIX = 'BOT_CLUSTER_'
+
+
+def cluster_env(cluster_id: int, cluster_count: int, shard_ids: list[int], shard_count: int,
+                ipc_port: int, ipc_secret: str) -> dict[str, str]:
+    """Variables d'environnement décrivant un cluster (voir cluster_from_env)."""
+    return {
+        f'{ENV_PREFIX}ID': str(cluster_id),
+        f'{ENV_PREFIX}COUNT': str(cluster_count),
+        f'{ENV_PREFIX}SHARD_IDS': ','.join(map(str, shard_ids)),
+        f'{ENV_PREFIX}SHARD_COUNT': str(shard_count),
+        f'{ENV_PREFIX}IPC_PORT': str(ipc_port),
+        f'{ENV_PREFIX}IPC_SECRET': ipc_secret,
+    }
+
+
+def cluster_from_env(environ=os.environ) -> dict | None:
+    """Retourne la description du cluster courant, ou None si le bot n'a pas été lancé par launcher.py."""
+    if f'{ENV_PREFIX}ID' not in environ:
+        return None
+    return {
+        'cluster_id': int(environ[f'{ENV_PREFIX}ID']),
+        'cluster_count': int(environ[f'{ENV_PREFIX}COUNT']),
+        'shard_ids': [int(shard_id) for shard_id in environ[f'{ENV_PREFIX}SHARD_IDS'].split(',') if shard_id],
+        'shard_count': int(environ[f'{ENV_PREFIX}SHARD_COUNT']),
+        'ipc_port': int(environ[f'{ENV_PREFIX}IPC_PORT']),
+        'ipc_secret': environ[f'{ENV_PREFIX}IPC_SECRET'],
+    }
+
+
+def aggregate_totals(clusters: dict[str, dict]) -> dict:
+    """Additionne les chiffres de chaque cluster."""
+    latencies = [stats['latency'] for stats in clusters.values() if stats.get('latency') is not None]
+    return {
+        'clusters': len(clusters),
+        'clusters_ready': sum(1 for stats in clusters.values() if stats.get('ready')),
+        'guilds': sum(stats.get('guilds', 0) for stats in clusters.values()),
+        'users': sum(stats.get('users', 0) for stats in clusters.values()),
+        'shards': sum(len(stats.get('shards', ())) for stats in clusters.values()),
+        'latency': max(latencies) if latencies else None,
+    }
+
+
+class ClusterIPCServer:
+    """
+    Serveur IPC du lanceur : garde le dernier rapport de chaque cluster.
+
+    Args:
+        secret: Secret partagé attendu dans chaque message.
+        host: Adresse d'écoute (locale uniquement).
+        port: Port d'écoute (0 pour un port libre choisi par le système).
+        stale_after: Durée (secondes) au-delà de laquelle un cluster silencieux est ignoré.
+    """
+
+    def __init__(self, secret: str, host: str = '127.0.0.1', port: int = 0, stale_after: float = 60.0):
+        self.secret = secret
+        self.host = host
+        self.port = port
+        self.stale_after = stale_after
+        self.clusters: dict[str, dict] = {}
+        self._seen_at: dict[str, float] = {}
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port, limit=MAX_LINE_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Serveur IPC des clusters à l'écoute sur {self.host}:{self.port}")
+
+    def live_clusters(self) -> dict[str, dict]:
+        now = time.monotonic()
+        return {
+            cluster_id: stats for cluster_id, stats in self.clusters.items()
+            if now - self._seen_at.get(cluster_id, 0.0) <= self.stale_after
+        }
+
+    def forget(self, cluster_id: int):
+        """Oublie un cluster arrêté (ses chiffres ne sont plus comptés)."""
+        self.clusters.pop(str(cluster_id), None)
+        self._seen_at.pop(str(cluster_id), None)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while line := await reader.readline():
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                if not hmac.compare_digest(str(message.get('secret', '')), self.secret):
+                    logger.warning("Message IPC rejeté : secret invalide.")
+                    break
+                if message.get('op') == 'report':
+                    cluster_id = str(message.get('cluster_id'))
+                    self.clusters[cluster_id] = message.get('stats', {})
+                    self._seen_at[cluster_id] = time.monotonic()
+                clusters = self.live_clusters()
+                reply = {'op': 'aggregate', 'clusters': clusters, 'totals': aggregate_totals(clusters)}
+                writer.write(json.dumps(reply).encode('utf-8') + b'\n')
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def close(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+
+class ClusterIPCClient:
+    """
+    Client IPC d'un cluster : envoie `stats_provider()` toutes les `interval` secondes
+    et garde le dernier agrégat reçu dans `self.totals` / `self.clusters`.
+    """
+
+    def __init__(self, cluster_id: int, stats_provider: Callable[[], dict], secret: str,
+                 host: str = '127.0.0.1', port: int = 0, interval: float = 10.0):
+        self.cluster_id = cluster_id
+        self.stats_provider = stats_provider
+        self.secret = secret
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.totals: dict | None = None
+        self.clusters: dict[str, dict] = {}
+        self.updated_at: float | None = None
+        self._task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def report_now(self):
+        """Demande un envoi immédiat (par exemple quand le cluster devient prêt)."""
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port, limit=MAX_LINE_BYTES)
+            except OSError as e:
+                logger.warning(f"Connexion au serveur IPC impossible ({self.host}:{self.port}): {type(e).__name__} - {e}")
+                await asyncio.sleep(self.interval)
+                continue
+            try:
+                while True:
+                    message = {'op': 'report', 'secret': self.secret, 'cluster_id': self.cluster_id, 'stats': self.stats_provider()}
+                    writer.write(json.dumps(message).encode('utf-8') + b'\n')
+                    await writer.drain()
+                    line = await reader.readline()
+                    if not line:
+                        raise ConnectionResetError("connexion fermée par le serveur IPC")
+                    reply = json.loads(line)
+                    self.totals = reply.get('totals')
+                    self.clusters = reply.get('clusters', {})
+                    self.updated_at = time.monotonic()
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+                    except asyncio.TimeoutError:
+                        pass
+            except (OSError, ValueError) as e:
+                logger.warning(f"Connexion IPC perdue: {type(e).__name__} - {e}")
+            finally:
+                writer.close()
+            await asyncio.sleep(self.interval)
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
@@ -0,0 +1,99 @@
+"""
+Cache LRU des analyses de code de la commande /run.
+Le résultat de l'analyse AST (verdict, violations) et l'objet code compilé sont
+indexés par une empreinte du source : un extrait relancé n'est ni ré-analysé ni recompilé.
+"""
+import hashlib
+import logging
+import marshal
+import sys
+from collections import OrderedDict
+from types import CodeType
+
+logger = logging.getLogger('discord.code_cache')
+
+
+class CodeAnalysis:
+    """Résultat de l'analyse et de la compilation d'un extrait de code."""
+
+    __slots__ = ('is_safe', 'violations', 'compiled', 'compile_error', 'size')
+
+    def __init__(self, is_safe: bool, violations: list[str], compiled: CodeType | None = None, compile_error: str | None = None):
+        self.is_safe = is_safe
+        self.violations = tuple(violations)
+        self.compiled = compiled
+        self.compile_error = compile_error
+        self.size = self._estimate_size()
+
+    def _estimate_size(self) -> int:
+        size = sys.getsizeof(self) + sum(sys.getsizeof(v) for v in self.violations)
+        if self.compiled is not None:
+            size += len(marshal.dumps(self.compiled))
+        if self.compile_error:
+            size += sys.getsizeof(self.compile_error)
+        return size
+
+
+class CodeAnalysisCache:
+    """
+    Cache LRU borné en nombre d'entrées et en octets (estimation).
+
+    Args:
+        max_entries: Nombre maximal d'extraits gardés.
+        max_bytes: Budget mémoire approximatif (analyses + bytecode).
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 4 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[bytes, CodeAnalysis] = OrderedDict()
+        self.total_bytes = 0
+
+        # Compteurs exposés via stats()
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    @staticmethod
+    def key(code_string: str) -> bytes:
+        return hashlib.blake2b(code_string.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+    def get(self, code_string: str) -> CodeAnalysis | None:
+        key = self.key(code_string)
+        analysis = self._entries.get(key)
+        if analysis is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return analysis
+
+    def put(self, code_string: str, analysis: CodeAnalysis):
+        key = self.key(code_string)
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.total_bytes -= previous.size
+        if analysis.size > self.max_bytes:
+            return  # Trop volumineux pour être mis en cache
+        self._entries[key] = analysis
+        self.total_bytes += analysis.size
+        while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.total_bytes -= evicted.size
+            self.evicted += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evicted': self.evicted,
+        }
@@ -0,0 +1,151 @@
+"""
+Chargement parallèle des cogs avec profil de démarrage.
+1. Les modules des cogs sont importés en parallèle dans des threads : leurs
+   dépendances (utils, bibliothèques tierces) sont ainsi chargées hors de la
+   boucle d'événements. `load_extension` ré-exécute ensuite le corps du module,
+   mais toutes ses importations sont déjà en cache.
+2. Les `setup` sont exécutés par niveaux selon les dépendances déclarées : les cogs
+   d'un même niveau sont chargés en parallèle, un cog attend ceux dont il dépend.
+Les temps d'import et de setup de chaque cog sont consignés dans un rapport.
+"""
+import asyncio
+import importlib
+import logging
+import time
+
+from discord.ext import commands
+
+logger = logging.getLogger('discord.cog_loader')
+logger.setLevel(logging.INFO)  # Sinon hérité du logger 'discord' (WARNING) : les messages de chargement des cogs seraient perdus
+
+
+class CogTiming:
+    """Temps de chargement d'un cog (millisecondes)."""
+
+    __slots__ = ('name', 'import_ms', 'setup_ms', 'status', 'error')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.import_ms = 0.0
+        self.setup_ms = 0.0
+        self.status = 'pending'  # 'loaded', 'failed' ou 'skipped'
+        self.error: str | None = None
+
+    @property
+    def total_ms(self) -> float:
+        return self.import_ms + self.setup_ms
+
+
+class CogLoader:
+    """
+    Chargeur des cogs de `config.cogs`.
+
+    Args:
+        bot: L'instance du bot.
+        cogs: Noms des extensions à charger, dans l'ordre de config.
+        dependencies: Pour chaque extension, les extensions qui doivent être chargées avant elle.
+        parallel_imports: Importer les modules dans des threads avant de les charger.
+        main_thread_imports: Extensions dont le module ne doit pas être importé hors de la boucle
+            (ex: code exécuté à l'import qui a besoin de la boucle d'événements).
+    """
+
+    def __init__(self, bot: commands.Bot, cogs: list[str], dependencies: dict[str, list[str]] | None = None,
+                 parallel_imports: bool = True, main_thread_imports: list[str] | None = None):
+        self.bot = bot
+        self.cogs = list(dict.fromkeys(cogs))
+        self.dependencies = {name: [dep for dep in (dependencies or {}).get(name, []) if dep in self.cogs] for name in self.cogs}
+        self.parallel_imports = parallel_imports
+        self.main_thread_imports = set(main_thread_imports or ())
+        self.timings = {name: CogTiming(name) for name in self.cogs}
+        self.wall_ms = 0.0
+
+    def levels(self) -> list[list[str]]:
+        """Niveaux de chargement (tri topologique) ; ValueError en cas de dépendance circulaire."""
+        remaining = {name: set(deps) for name, deps in self.dependencies.items()}
+        levels = []
+        while remaining:
+            ready = [name for name in self.cogs if name in remaining and not remaining[name]]
+            if not ready:
+                raise ValueError(f"Dépendance circulaire entre les cogs: {', '.join(sorted(remaining))}")
+            levels.append(ready)
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return levels
+
+    def _import(self, name: str) -> float:
+        start = time.perf_counter()
+        importlib.import_module(name)
+        return (time.perf_counter() - start) * 1000
+
+    async def _preimport(self, name: str):
+        timing = self.timings[name]
+        try:
+            if self.parallel_imports and name not in self.main_thread_imports:
+                timing.import_ms = await asyncio.to_thread(self._import, name)
+            else:
+                timing.import_ms = self._import(name)
+        except Exception as e:
+            # L'erreur sera signalée (avec sa trace) par load_extension
+            logger.debug(f"Pré-import de {name} échoué: {type(e).__name__} - {e}")
+
+    async def _load(self, name: str):
+        timing = self.timings[name]
+        failed_deps = [dep for dep in self.dependencies[name] if self.timings[dep].status != 'loaded']
+        if failed_deps:
+            timing.status = 'skipped'
+            timing.error = f"dépendance(s) non chargée(s): {', '.join(failed_deps)}"
+            logger.error(f"Cog {name} non chargé: {timing.error}")
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.bot.load_extension(name)
+            timing.status = 'loaded'
+            logger.info(f"Cog chargé avec succès: {name}")
+        except commands.ExtensionNotFound:
+            timing.error = "module introuvable"
+            logger.error(f"Erreur de chargement: Cog {name} non trouvé (fichier manquant ou faute de frappe).")
+        except commands.ExtensionAlreadyLoaded:
+            timing.status = 'loaded'
+            logger.warning(f"Avertissement: Cog {name} déjà chargé.")
+        except commands.NoEntryPointError:
+            timing.error = "pas de fonction setup()"
+            logger.error(f"Erreur de chargement: Cog {name} n'a pas de fonction setup().")
+        except commands.ExtensionFailed as e:
+            # L'exception originale est dans e.__cause__
+            original_exception = e.__cause__ if e.__cause__ else e
+            timing.error = f"{type(original_exception).__name__}: {original_exception}"
+            logger.error(f"Erreur de chargement: Cog {name} a échoué. Erreur originale: {timing.error}")
+            logger.exception(f"Trace complète de l'échec du chargement du cog {name}:")
+        except Exception as e:
+            timing.error = f"{type(e).__name__}: {e}"
+            logger.error(f"Erreur inattendue lors du chargement du cog {name}: {type(e).__name__} - {e}")
+            logger.exception("Trace complète de l'erreur de chargement du cog:")
+        finally:
+            timing.setup_ms = (time.perf_counter() - start) * 1000
+            if timing.status == 'pending':
+                timing.status = 'failed'
+
+    async def load_all(self) -> dict[str, CogTiming]:
+        start = time.perf_counter()
+        levels = self.levels()
+        await asyncio.gather(*(self._preimport(name) for name in self.cogs))
+        for level in levels:
+            await asyncio.gather(*(self._load(name) for name in level))
+        self.wall_ms = (time.perf_counter() - start) * 1000
+        return self.timings
+
+    def report(self) -> str:
+        """Rapport de démarrage, trié du cog le plus lent au plus rapide (à la manière de `python -X importtime`)."""
+        lines = [
+            "Profil de démarrage des cogs (ms) :",
+            f"{'import':>9} | {'setup':>9} | {'total':>9} | cog",
+        ]
+        for timing in sorted(self.timings.values(), key=lambda timing: timing.total_ms, reverse=True):
+            suffix = "" if timing.status == 'loaded' else f"  [{timing.status}: {timing.error}]"
+            lines.append(f"{timing.import_ms:9.1f} | {timing.setup_ms:9.1f} | {timing.total_ms:9.1f} | {timing.name}{suffix}")
+        total = sum(timing.total_ms for timing in self.timings.values())
+        lines.append(f"Somme des temps: {total:.1f} ms | Durée réelle du chargement: {self.wall_ms:.1f} ms")
+        return "\n".join(lines)
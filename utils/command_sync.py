@@ -0,0 +1,241 @@
+"""
+Synchronisation des commandes slash avec empreinte de l'arbre de commandes.
+Le contenu envoyé à Discord (le même que celui de `CommandTree.sync`) est sérialisé
+de façon stable puis haché ; l'empreinte du dernier envoi réussi est gardée dans un
+fichier local. Au démarrage et à chaque reconnexion, la synchronisation n'est faite
+que si l'empreinte a changé (ou si un propriétaire la force).
+Une empreinte est aussi gardée par commande : après le rechargement d'un cog,
+`sync_changed` n'envoie que les commandes ajoutées, modifiées ou supprimées
+(une requête par commande) au lieu de réécrire tout l'arbre.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+
+import discord
+from discord import app_commands
+
+logger = logging.getLogger('discord.command_sync')
+logger.setLevel(logging.INFO)
+
+
+class CommandSyncManager:
+    """
+    Synchronise l'arbre global et les arbres des serveurs de développement seulement si nécessaire.
+
+    Args:
+        tree: L'arbre de commandes du bot.
+        state_path: Fichier JSON où sont gardées les empreintes des dernières synchronisations.
+        dev_guild_ids: Serveurs de développement synchronisés en plus de l'arbre global.
+        max_individual_updates: Au-delà de ce nombre de commandes modifiées, `sync_changed`
+            réécrit tout l'arbre en une requête plutôt que commande par commande.
+    """
+
+    def __init__(self, tree: app_commands.CommandTree, state_path: str = 'data/command_sync.json',
+                 dev_guild_ids: list[int] | None = None, max_individual_updates: int = 5):
+        self.tree = tree
+        self.state_path = state_path
+        self.dev_guild_ids = [int(guild_id) for guild_id in dev_guild_ids or []]
+        self.max_individual_updates = max_individual_updates
+        self._state: dict[str, dict] = self._load_state()
+
+        # Compteurs exposés via stats()
+        self.synced = 0
+        self.skipped = 0
+        self.failed = 0
+
+    @staticmethod
+    def _scope(guild: discord.abc.Snowflake | None) -> str:
+        return 'global' if guild is None else f'guild:{guild.id}'
+
+    def _load_state(self) -> dict:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Fichier d'état de synchronisation illisible ({self.state_path}), il sera recréé: {type(e).__name__} - {e}")
+            return {}
+
+    def _save_state(self):
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._state, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.state_path)
+
+    @staticmethod
+    def _hash(value) -> str:
+        serialized = json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+        return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _key(command_type: int, name: str) -> str:
+        # Une commande slash et un menu contextuel peuvent porter le même nom
+        return f"{command_type}:{name}"
+
+    async def _payloads(self, guild: discord.abc.Snowflake | None) -> list[dict]:
+        """Contenu qui serait envoyé par `tree.sync(guild=guild)`, trié de façon stable."""
+        commands = self.tree._get_all_commands(guild=guild)
+        translator = self.tree.translator
+        if translator:
+            payload = [await command.get_translated_payload(self.tree, translator) for command in commands]
+        else:
+            payload = [command.to_dict(self.tree) for command in commands]
+        payload.sort(key=lambda command: (command.get('type', 1), command['name']))
+        return payload
+
+    def _digest(self, payload: list[dict]) -> str:
+        return self._hash({'application_id': self.tree.client.application_id, 'commands': payload})
+
+    async def fingerprint(self, guild: discord.abc.Snowflake | None = None) -> str:
+        """Empreinte du contenu qui serait envoyé par `tree.sync(guild=guild)`."""
+        return self._digest(await self._payloads(guild))
+
+    def _record(self, scope: str, digest: str, payload: list[dict], command_ids: dict[str, int]):
+        self._state[scope] = {
+            'hash': digest,
+            'synced_at': time.time(),
+            'commands': command_ids,
+            'command_hashes': {self._key(command.get('type', 1), command['name']): self._hash(command) for command in payload},
+        }
+        try:
+            self._save_state()
+        except OSError as e:
+            logger.error(f"Impossible d'enregistrer l'état de synchronisation: {type(e).__name__} - {e}")
+
+    async def sync(self, guild: discord.abc.Snowflake | None = None, force: bool = False) -> list[app_commands.AppCommand] | None:
+        """
+        Synchronise une portée (globale ou un serveur) si son empreinte a changé.
+
+        Returns:
+            Les commandes synchronisées, ou None si la synchronisation a été évitée.
+
+        Raises:
+            Les exceptions de `CommandTree.sync` (Forbidden, CommandSyncFailure, HTTPException...).
+        """
+        scope = self._scope(guild)
+        payload = await self._payloads(guild)
+        digest = self._digest(payload)
+        previous = self._state.get(scope)
+        if not force and previous and previous.get('hash') == digest:
+            self.skipped += 1
+            logger.info(f"Commandes slash ({scope}) inchangées depuis la dernière synchronisation, envoi évité.")
+            return None
+
+        try:
+            synced = await self.tree.sync(guild=guild)
+        except Exception:
+            self.failed += 1
+            raise
+        self.synced += 1
+        self._record(scope, digest, payload, {self._key(command.type.value, command.name): command.id for command in synced})
+        logger.info(f"Synchronisé {len(synced)} commandes slash ({scope}).")
+        return synced
+
+    async def sync_changed(self, guild: discord.abc.Snowflake | None = None) -> dict[str, list[str]] | None:
+        """
+        Envoie seulement les commandes d'une portée qui ont changé depuis la dernière synchronisation.
+        Se replie sur une réécriture complète (`sync`) si l'état local ne permet pas de comparer
+        commande par commande ou si plus de `max_individual_updates` commandes ont changé.
+
+        Returns:
+            {'updated': [...], 'removed': [...], 'full': [...]} (noms des commandes), ou None si rien n'a changé.
+
+        Raises:
+            Les exceptions de `CommandTree.sync` et des requêtes HTTP (Forbidden, HTTPException...).
+        """
+        scope = self._scope(guild)
+        payload = await self._payloads(guild)
+        digest = self._digest(payload)
+        previous = self._state.get(scope) or {}
+        if previous.get('hash') == digest:
+            self.skipped += 1
+            logger.info(f"Commandes slash ({scope}) inchangées depuis la dernière synchronisation, envoi évité.")
+            return None
+
+        by_key = {self._key(command.get('type', 1), command['name']): command for command in payload}
+        known_hashes = previous.get('command_hashes')
+        command_ids = dict(previous.get('commands', {}))
+        application_id = self.tree.client.application_id
+        if known_hashes is None or application_id is None or any(key not in command_ids for key in known_hashes):
+            synced = await self.sync(guild=guild, force=True)
+            return {'updated': [], 'removed': [], 'full': [command.name for command in synced]}
+
+        updated = [key for key, command in by_key.items() if known_hashes.get(key) != self._hash(command)]
+        removed = [key for key in known_hashes if key not in by_key]
+        if len(updated) + len(removed) > self.max_individual_updates:
+            synced = await self.sync(guild=guild, force=True)
+            return {'updated': [], 'removed': [], 'full': [command.name for command in synced]}
+
+        http = self.tree.client.http
+        try:
+            for key in updated:
+                if guild is None:
+                    data = await http.upsert_global_command(application_id, by_key[key])
+                else:
+                    data = await http.upsert_guild_command(application_id, guild.id, by_key[key])
+                command_ids[key] = int(data['id'])
+            for key in removed:
+                try:
+                    if guild is None:
+                        await http.delete_global_command(application_id, command_ids[key])
+                    else:
+                        await http.delete_guild_command(application_id, guild.id, command_ids[key])
+                except discord.NotFound:
+                    pass  # Déjà supprimée côté Discord
+                del command_ids[key]
+        except Exception:
+            # Rien n'est enregistré : la prochaine synchronisation renverra les mêmes commandes (envois idempotents)
+            self.failed += 1
+            raise
+        self.synced += 1
+        self._record(scope, digest, payload, command_ids)
+        result = {
+            'updated': [by_key[key]['name'] for key in updated],
+            'removed': [key.split(':', 1)[1] for key in removed],
+            'full': [],
+        }
+        logger.info(f"Commandes slash ({scope}) mises à jour individuellement: {len(updated)} envoyée(s), {len(removed)} supprimée(s).")
+        return result
+
+    async def sync_all(self, force: bool = False) -> dict[str, list[app_commands.AppCommand] | None]:
+        """Synchronise l'arbre global puis chaque serveur de développement. Les erreurs sont journalisées par portée."""
+        return await self._each_scope(self.sync, force=force)
+
+    async def sync_changed_all(self) -> dict[str, dict[str, list[str]] | None]:
+        """`sync_changed` pour l'arbre global puis chaque serveur de développement."""
+        return await self._each_scope(self.sync_changed)
+
+    async def _each_scope(self, method, **kwargs) -> dict:
+        results = {}
+        scopes = [None] + [discord.Object(id=guild_id) for guild_id in self.dev_guild_ids]
+        for guild in scopes:
+            scope = self._scope(guild)
+            try:
+                results[scope] = await method(guild=guild, **kwargs)
+            except discord.errors.Forbidden as e:
+                logger.error(f"Erreur de synchronisation des commandes slash ({scope}): Accès interdit (Forbidden). Assurez-vous que le bot a la permission 'applications.commands'. Erreur: {e}")
+            except app_commands.CommandSyncFailure as e:
+                logger.error(f"Échec de la synchronisation de certaines commandes slash ({scope}). Commandes échouées: {e.failed_commands}")
+                logger.exception("Trace complète de l'erreur de synchronisation:")
+            except Exception as e:
+                logger.error(f"Erreur inattendue lors de la synchronisation des commandes slash ({scope}): {type(e).__name__} - {e}")
+                logger.exception("Trace complète de l'erreur de synchronisation:")
+        return results
+
+    def stats(self) -> dict:
+        return {
+            'synced': self.synced,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'scopes': {
+                scope: {'hash': entry.get('hash', '')[:12], 'synced_at': entry.get('synced_at'), 'commands': len(entry.get('commands', {}))}
+                for scope, entry in self._state.items()
+            },
+        }
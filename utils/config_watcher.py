@@ -0,0 +1,137 @@
+"""
+Rechargement à chaud de config.json.
+Le fichier est surveillé par interrogation de ses métadonnées (date de modification,
+taille, inode) : aucune dépendance native, et un remplacement atomique du fichier
+(éditeurs, déploiements) est détecté comme une écriture en place. Un fichier modifié
+est relu hors de la boucle, validé (ConfigSnapshot.from_dict), puis mis en vigueur
+d'un bloc avec config.swap() ; les abonnés sont ensuite prévenus. Un fichier invalide
+est ignoré et l'instantané en vigueur reste inchangé.
+"""
+import asyncio
+import inspect
+import logging
+import os
+import time
+from typing import Awaitable, Callable
+
+import config
+
+logger = logging.getLogger('discord.config_watcher')
+logger.setLevel(logging.INFO)
+
+# Abonné : callback(ancien instantané, nouvel instantané, noms des paramètres modifiés)
+ConfigCallback = Callable[[config.ConfigSnapshot, config.ConfigSnapshot, frozenset[str]], Awaitable[None] | None]
+
+
+class ConfigWatcher:
+    """
+    Surveille config.json et applique les modifications valides.
+
+    Args:
+        path: Chemin du fichier surveillé.
+        interval: Intervalle (secondes) entre deux vérifications.
+        settle: Délai (secondes) pendant lequel le fichier doit rester stable avant d'être relu
+            (évite de lire un fichier en cours d'écriture).
+    """
+
+    def __init__(self, path: str = config.CONFIG_PATH, interval: float = 2.0, settle: float = 0.2):
+        self.path = path
+        self.interval = interval
+        self.settle = settle
+        self._callbacks: list[ConfigCallback] = []
+        self._signature = self._stat()
+        self._task: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+
+        # Compteurs exposés via stats()
+        self.reloads = 0
+        self.failures = 0
+        self.last_error: str | None = None
+        self.last_reload_at: float | None = None
+
+    def subscribe(self, callback: ConfigCallback):
+        self._callbacks.append(callback)
+
+    def unsubscribe(self, callback: ConfigCallback):
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+    def _stat(self) -> tuple | None:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._watch())
+            logger.info(f"Surveillance de {self.path} (toutes les {self.interval} s)")
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"Erreur lors de la surveillance de {self.path}: {type(e).__name__} - {e}")
+
+    async def check(self) -> bool:
+        """Recharge le fichier s'il a changé depuis la dernière lecture ; retourne True si un instantané a été appliqué."""
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        # Attendre que l'écriture soit terminée
+        await asyncio.sleep(self.settle)
+        settled = self._stat()
+        if settled != signature:
+            return False  # Toujours en cours d'écriture : revu à la prochaine vérification
+        self._signature = signature
+        return await self.reload()
+
+    async def reload(self) -> bool:
+        """Relit, valide et applique le fichier ; retourne False s'il est invalide (l'instantané en vigueur est gardé)."""
+        async with self._lock:
+            try:
+                snapshot = await asyncio.to_thread(config.read_snapshot, self.path)
+            except config.ConfigError as e:
+                self.failures += 1
+                self.last_error = str(e)
+                logger.error(f"Configuration rechargée invalide, modifications ignorées: {e}")
+                return False
+
+            previous = config.current()
+            changed = previous.changed_fields(snapshot)
+            if not changed:
+                return False
+            config.swap(snapshot)
+            self.reloads += 1
+            self.last_error = None
+            self.last_reload_at = time.time()
+            logger.info(f"Configuration rechargée, paramètres modifiés: {', '.join(sorted(changed))}")
+            restart_required = changed & config.RESTART_REQUIRED
+            if restart_required:
+                logger.warning(f"Paramètres pris en compte au prochain redémarrage seulement: {', '.join(sorted(restart_required))}")
+
+            for callback in list(self._callbacks):
+                try:
+                    result = callback(previous, snapshot, changed)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    logger.error(f"Erreur dans un abonné au rechargement de la configuration: {type(e).__name__} - {e}")
+                    logger.exception("Trace complète de l'erreur de l'abonné:")
+            return True
+
+    def stats(self) -> dict:
+        return {
+            'reloads': self.reloads,
+            'failures': self.failures,
+            'last_error': self.last_error,
+            'last_reload_at': self.last_reload_at,
+        }
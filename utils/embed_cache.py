@@ -0,0 +1,131 @@
+"""
+Cache des embeds de /serverinfo et /userinfo.
+Un embed rendu est gardé quelques secondes par serveur ou par membre (sans le pied
+de page ni l'horodatage, propres à chaque appel) et invalidé dès qu'un événement
+modifie ce qu'il affiche. Le cache est borné en nombre d'entrées et en taille.
+"""
+import logging
+import time
+from collections import OrderedDict
+
+import discord
+
+logger = logging.getLogger('discord.embed_cache')
+
+# Clés : ('guild', guild_id) ou ('member', guild_id | None, user_id)
+CacheKey = tuple
+
+
+class EmbedCache:
+    """
+    Cache LRU d'embeds avec durée de vie.
+
+    Args:
+        ttl: Durée de vie (secondes) d'un embed rendu.
+        max_entries: Nombre maximal d'embeds gardés.
+        max_bytes: Budget mémoire approximatif (estimé à partir du nombre de caractères des embeds).
+    """
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = 1024, max_bytes: int = 2 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[CacheKey, tuple[discord.Embed, float, int]] = OrderedDict()
+        self._by_guild: dict[int | None, set[CacheKey]] = {}
+        self.total_bytes = 0
+
+        # Compteurs exposés via stats()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+        self.invalidated = 0
+
+    @staticmethod
+    def _guild_of(key: CacheKey) -> int | None:
+        return key[1]
+
+    @staticmethod
+    def _estimate_size(embed: discord.Embed) -> int:
+        # len(embed) compte les caractères de tous les textes ; le reste couvre les objets Python
+        return len(embed) * 2 + 512 + 128 * len(embed.fields)
+
+    def get(self, key: CacheKey) -> discord.Embed | None:
+        """Copie de l'embed en cache (à compléter par l'appelant), ou None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        embed, expires_at, _ = entry
+        if time.monotonic() >= expires_at:
+            self._remove(key)
+            self.expired += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return embed.copy()
+
+    def put(self, key: CacheKey, embed: discord.Embed):
+        """Garde une copie de `embed` (l'appelant peut ensuite modifier le sien)."""
+        size = self._estimate_size(embed)
+        if key in self._entries:
+            self._remove(key)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (embed.copy(), time.monotonic() + self.ttl, size)
+        self._by_guild.setdefault(self._guild_of(key), set()).add(key)
+        self.total_bytes += size
+        while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evicted += 1
+
+    def _remove(self, key: CacheKey):
+        _, _, size = self._entries.pop(key)
+        self.total_bytes -= size
+        guild_keys = self._by_guild.get(self._guild_of(key))
+        if guild_keys is not None:
+            guild_keys.discard(key)
+            if not guild_keys:
+                del self._by_guild[self._guild_of(key)]
+
+    def invalidate(self, key: CacheKey):
+        if key in self._entries:
+            self._remove(key)
+            self.invalidated += 1
+
+    def invalidate_guild(self, guild_id: int, members: bool = True):
+        """Invalide l'embed du serveur et, si `members`, ceux de ses membres."""
+        if not members:
+            self.invalidate(('guild', guild_id))
+            return
+        for key in list(self._by_guild.get(guild_id, ())):
+            self._remove(key)
+            self.invalidated += 1
+
+    def invalidate_user(self, user_id: int):
+        """Invalide les embeds d'un utilisateur dans tous les serveurs (changement de nom, d'avatar...)."""
+        for key in [key for key in self._entries if key[0] == 'member' and key[2] == user_id]:
+            self._remove(key)
+            self.invalidated += 1
+
+    def invalidate_all(self):
+        """Vide le cache (ex: paramètres modifiés)."""
+        self.invalidated += len(self._entries)
+        self._entries.clear()
+        self._by_guild.clear()
+        self.total_bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'expired': self.expired,
+            'evicted': self.evicted,
+            'invalidated': self.invalidated,
+        }
@@ -0,0 +1,333 @@
+"""
+Index précalculé de l'aide des commandes slash.
+L'arbre de commandes est parcouru une seule fois : les embeds de détail de chaque
+commande et un trie sur les noms qualifiés sont construits d'avance, et les pages de
+la liste groupée par cog le sont à la première demande pour chaque (serveur, langue).
+L'index est reconstruit uniquement quand l'arbre change (compteur `generation` de
+l'arbre, voir utils/instrumentation.py).
+"""
+import difflib
+import logging
+from collections import defaultdict
+
+import discord
+from discord import app_commands, Embed, Color
+from discord.ext import commands
+
+logger = logging.getLogger('discord.help_index')
+logger.setLevel(logging.INFO)
+
+EMBED_COLOR = Color.blurple()
+MAX_SUGGESTIONS = 25  # Limite Discord des choix d'autocomplétion
+
+# Découpage de la liste des commandes (limites Discord : 1024 caractères par champ, 6000 par embed)
+FIELD_MAX_CHARS = 1024
+PAGE_MAX_FIELDS = 6
+PAGE_MAX_CHARS = 4000
+
+# Textes de la liste des commandes par langue (langue du client Discord, français par défaut)
+LISTING_TEXTS = {
+    'fr': {
+        'title': "📜 Aide des Commandes de {bot}",
+        'this_bot': "ce Bot",
+        'description': "Voici la liste des commandes slash disponibles.\nUtilisez `/help <nom_commande>` pour plus de détails.",
+        'empty': "\n\n😕 Aucune commande n'a été trouvée.",
+        'other': "Autres Commandes",
+        'continued': "(suite)",
+        'footer': "Page {page}/{pages} | Total: {total} commandes de haut niveau",
+    },
+    'en': {
+        'title': "📜 {bot} Command Help",
+        'this_bot': "this Bot",
+        'description': "Here are the available slash commands.\nUse `/help <command_name>` for more details.",
+        'empty': "\n\n😕 No command was found.",
+        'other': "Other Commands",
+        'continued': "(continued)",
+        'footer': "Page {page}/{pages} | Total: {total} top-level commands",
+    },
+}
+DEFAULT_LANGUAGE = 'fr'
+
+
+class _TrieNode:
+    __slots__ = ('children', 'names')
+
+    def __init__(self):
+        self.children: dict[str, _TrieNode] = {}
+        self.names: list[str] = []  # Noms qualifiés accessibles sous ce préfixe, dans l'ordre d'insertion
+
+
+class CommandTrie:
+    """Trie des clés de recherche (nom qualifié et nom court) vers les noms qualifiés."""
+
+    def __init__(self):
+        self.root = _TrieNode()
+
+    def insert(self, key: str, qualified_name: str):
+        node = self.root
+        for char in key:
+            node = node.children.setdefault(char, _TrieNode())
+            if qualified_name not in node.names:
+                node.names.append(qualified_name)
+
+    def prefix(self, prefix: str) -> list[str]:
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return node.names
+
+
+class HelpEntry:
+    """Une commande indexée et son embed de détail préconstruit."""
+
+    __slots__ = ('qualified_name', 'description', 'cog_name', 'embed')
+
+    def __init__(self, qualified_name: str, description: str, cog_name: str | None, embed: Embed):
+        self.qualified_name = qualified_name
+        self.description = description
+        self.cog_name = cog_name
+        self.embed = embed
+
+
+def listing_language(locale: discord.Locale | str | None) -> str:
+    """Langue des textes de la liste pour une locale Discord ('en-US' -> 'en'), français à défaut."""
+    language = str(locale or DEFAULT_LANGUAGE).split('-')[0].lower()
+    return language if language in LISTING_TEXTS else DEFAULT_LANGUAGE
+
+
+def normalize(name: str) -> str:
+    return name.lower().strip().replace("/", "")
+
+
+def _command_embed(command: app_commands.Command | app_commands.Group, thumbnail_url: str | None) -> Embed:
+    """Embed de détail d'une commande (sans pied de page ni horodatage, ajoutés à l'envoi)."""
+    embed = Embed(
+        title=f"❓ Aide pour : `/{command.qualified_name}`",
+        description=command.description or "Aucune description fournie.",
+        color=EMBED_COLOR
+    )
+    if thumbnail_url:
+        embed.set_thumbnail(url=thumbnail_url)
+
+    usage = f"`/{command.qualified_name}`"
+    if getattr(command, 'parameters', None):
+        params_usage = []
+        params_description_list = []
+        for param in command.parameters:
+            param_type_name = param.type.name if hasattr(param.type, 'name') else str(param.type).split('.')[-1].lower()
+            required_text = "" if param.required else " (Optionnel)" # "Requis" est implicite sans ça
+            params_usage.append(f"<{param.name}>" if param.required else f"[{param.name}]")
+
+            desc_line = f"**`{param.name}`** (`{param_type_name}`{required_text}):\n> {param.description or 'Pas de description.'}"
+            if param.choices:
+                choices_str = ", ".join([f"`{choice.name}` (`{choice.value}`)" for choice in param.choices])
+                desc_line += f"\n> *Choix possibles:* {choices_str}"
+            params_description_list.append(desc_line)
+
+        usage += " " + " ".join(params_usage)
+        embed.add_field(name="📝 Utilisation", value=usage, inline=False)
+        value = "\n\n".join(params_description_list)
+        if len(value) > 1024:
+            value = value[:1020] + "\n..."
+        embed.add_field(name="🔧 Paramètres", value=value, inline=False)
+    else: # Groupes (sous-commandes) ou commandes sans paramètre
+        embed.add_field(name="📝 Utilisation", value=usage, inline=False)
+        if isinstance(command, app_commands.Group):
+            sub_cmds_list = [f"`/{sub.qualified_name}`: {sub.description or 'Pas de description.'}" for sub in command.commands]
+            if sub_cmds_list:
+                embed.add_field(name="Sous-commandes", value="\n".join(sub_cmds_list)[:1024], inline=False)
+        else:
+            embed.add_field(name="🔧 Paramètres", value="Cette commande ne prend aucun paramètre.", inline=False)
+
+    if cog_name(command):
+        embed.add_field(name="📦 Module", value=cog_name(command), inline=True)
+    return embed
+
+
+def cog_name(command: app_commands.Command | app_commands.Group) -> str | None:
+    """Nom du cog qui définit la commande (les commandes d'application n'ont pas d'attribut cog_name)."""
+    binding = getattr(command, 'binding', None)
+    return binding.qualified_name if isinstance(binding, commands.Cog) else None
+
+
+def _listing_line(command: app_commands.Command | app_commands.Group) -> str:
+    line = f"`/{command.qualified_name}`: {command.description or 'Pas de description.'}"
+    if isinstance(command, app_commands.Group) and command.commands:
+        line += f" (Groupe - {len(command.commands)} sous-commande(s))"
+    return line
+
+
+class HelpIndex:
+    """
+    Index de l'aide construit à la demande et gardé tant que l'arbre de commandes ne change pas.
+
+    Args:
+        bot: L'instance du bot (pour l'arbre de commandes et l'avatar).
+    """
+
+    def __init__(self, bot: discord.Client):
+        self.bot = bot
+        self.entries: dict[str, HelpEntry] = {}
+        self.trie = CommandTrie()
+        self._short_names: dict[str, list[str]] = defaultdict(list)  # Nom court -> noms qualifiés
+        self._global_commands: list[app_commands.Command | app_commands.Group] = []
+        self._listings: dict[tuple[int | None, str], list[Embed]] = {}  # Par (serveur, langue) ; None : commandes globales seulement
+        self._generation = None
+        self._thumbnail_url: str | None = None
+
+        # Compteurs exposés via stats()
+        self.builds = 0
+
+    def _current_generation(self):
+        bot_user = self.bot.user
+        avatar = bot_user.avatar.url if bot_user and bot_user.avatar else None
+        return getattr(self.bot.tree, 'generation', 0), avatar
+
+    def ensure(self) -> 'HelpIndex':
+        """Reconstruit l'index si l'arbre de commandes (ou l'avatar du bot) a changé depuis la dernière construction."""
+        generation = self._current_generation()
+        if generation != self._generation:
+            self._build(generation)
+        return self
+
+    def invalidate(self):
+        self._generation = None
+
+    def _build(self, generation):
+        self._generation = generation
+        self._thumbnail_url = generation[1]
+        self.entries.clear()
+        self.trie = CommandTrie()
+        self._short_names.clear()
+        self._listings.clear()
+
+        for command in sorted(self.bot.tree.walk_commands(), key=lambda command: command.qualified_name):
+            self._add_entry(command)
+        self._global_commands = sorted(self.bot.tree.get_commands(guild=None), key=lambda command: command.qualified_name)
+        self.builds += 1
+        logger.info(f"Index de l'aide construit : {len(self.entries)} commande(s).")
+
+    def _add_entry(self, command: app_commands.Command | app_commands.Group):
+        key = normalize(command.qualified_name)
+        if key in self.entries:
+            return
+        self.entries[key] = HelpEntry(
+            command.qualified_name, command.description or "", cog_name(command),
+            _command_embed(command, self._thumbnail_url)
+        )
+        self.trie.insert(key, key)
+        if command.parent is not None:
+            self.trie.insert(normalize(command.name), key)
+            self._short_names[normalize(command.name)].append(key)
+
+    def _guild_commands(self, guild: discord.abc.Snowflake | None) -> list[app_commands.Command | app_commands.Group]:
+        if guild is None:
+            return []
+        guild_commands = sorted(self.bot.tree.get_commands(guild=guild), key=lambda command: command.qualified_name)
+        for command in guild_commands:
+            self._add_entry(command)
+            for sub_command in getattr(command, 'walk_commands', lambda: ())():
+                self._add_entry(sub_command)
+        return guild_commands
+
+    # --- Recherche ---
+
+    def lookup(self, query: str) -> HelpEntry | None:
+        """Nom qualifié exact, ou nom court d'une sous-commande s'il n'est pas ambigu."""
+        key = normalize(query)
+        entry = self.entries.get(key)
+        if entry is None and len(self._short_names.get(key, ())) == 1:
+            entry = self.entries[self._short_names[key][0]]
+        return entry
+
+    def suggest(self, query: str, limit: int = MAX_SUGGESTIONS) -> list[HelpEntry]:
+        """Préfixe d'abord (trie), puis sous-chaîne, puis noms proches (fautes de frappe)."""
+        key = normalize(query)
+        if not key:
+            return [self.entries[name] for name in list(self.entries)[:limit]]
+        names = list(self.trie.prefix(key)[:limit])
+        if len(names) < limit:
+            names += [name for name in self.entries if key in name and name not in names][:limit - len(names)]
+        if len(names) < limit:
+            names += [name for name in difflib.get_close_matches(key, self.entries, n=limit, cutoff=0.6) if name not in names][:limit - len(names)]
+        return [self.entries[name] for name in names]
+
+    # --- Embeds ---
+
+    def command_embed(self, entry: HelpEntry) -> Embed:
+        """Copie de l'embed préconstruit, à compléter (pied de page, horodatage) par l'appelant."""
+        return entry.embed.copy()
+
+    def listing_pages(self, guild: discord.abc.Snowflake | None, locale: discord.Locale | str | None = None) -> list[Embed]:
+        """
+        Pages de la liste des commandes de premier niveau groupées par cog (commandes globales + celles du serveur).
+        Les pages sont construites une fois par (serveur, langue) ; l'appelant copie celle qu'il affiche.
+        """
+        guild_commands = self._guild_commands(guild)
+        language = listing_language(locale)
+        cache_key = (guild.id if guild_commands else None, language)
+        pages = self._listings.get(cache_key)
+        if pages is None:
+            pages = self._listings[cache_key] = self._build_pages(self._global_commands + guild_commands, LISTING_TEXTS[language])
+        return pages
+
+    def listing_page(self, guild: discord.abc.Snowflake | None, locale: discord.Locale | str | None, page: int) -> tuple[Embed, int]:
+        """Copie de la page `page` (bornée aux pages existantes) et nombre total de pages."""
+        pages = self.listing_pages(guild, locale)
+        page = max(0, min(page, len(pages) - 1))
+        return pages[page].copy(), len(pages)
+
+    def _build_pages(self, top_level_commands: list[app_commands.Command | app_commands.Group], texts: dict) -> list[Embed]:
+        top_level_commands = sorted(set(top_level_commands), key=lambda command: command.qualified_name)
+        cogs_commands = defaultdict(list)
+        for command in top_level_commands:
+            cogs_commands[cog_name(command) or texts['other']].append(_listing_line(command))
+
+        # Chaque cog est découpé en champs de moins de 1024 caractères (aucune commande n'est tronquée),
+        # puis les champs sont répartis en pages bornées en nombre de champs et en taille totale
+        fields = []
+        for group_name, cmd_list in sorted(cogs_commands.items()):
+            chunk, chunk_length, part = [], 0, 0
+            for line in cmd_list:
+                line = line if len(line) <= FIELD_MAX_CHARS else line[:FIELD_MAX_CHARS - 3] + "..."
+                if chunk and chunk_length + len(line) + 1 > FIELD_MAX_CHARS:
+                    fields.append((group_name, part, "\n".join(chunk)))
+                    chunk, chunk_length, part = [], 0, part + 1
+                chunk.append(line)
+                chunk_length += len(line) + 1
+            fields.append((group_name, part, "\n".join(chunk)))
+
+        pages_fields, current, current_length = [], [], 0
+        for field in fields:
+            if current and (len(current) >= PAGE_MAX_FIELDS or current_length + len(field[2]) > PAGE_MAX_CHARS):
+                pages_fields.append(current)
+                current, current_length = [], 0
+            current.append(field)
+            current_length += len(field[2])
+        pages_fields.append(current)
+
+        bot_user = self.bot.user
+        pages = []
+        for page_number, page_fields in enumerate(pages_fields, start=1):
+            embed = Embed(
+                title=texts['title'].format(bot=bot_user.name if bot_user else texts['this_bot']),
+                description=texts['description'] if fields else texts['description'] + texts['empty'],
+                color=EMBED_COLOR
+            )
+            if self._thumbnail_url:
+                embed.set_thumbnail(url=self._thumbnail_url)
+            for group_name, part, value in page_fields:
+                name = f"**{group_name}**" if part == 0 else f"**{group_name}** {texts['continued']}"
+                embed.add_field(name=name, value=value, inline=False)
+            embed.set_footer(text=texts['footer'].format(page=page_number, pages=len(pages_fields), total=len(top_level_commands)))
+            pages.append(embed)
+        return pages
+
+    def stats(self) -> dict:
+        return {
+            'commands': len(self.entries),
+            'listings': len(self._listings),
+            'builds': self.builds,
+        }
@@ -0,0 +1,197 @@
+"""
+Rechargement à chaud des cogs, sans redémarrage du processus.
+Un rechargement se déroule en quatre temps :
+1. Le nouveau code source est compilé hors de la boucle : une erreur de syntaxe
+   annule le rechargement avant que l'ancienne version ne soit touchée.
+2. Le travail en cours est remis ou drainé :
+   - un cog qui définit `cog_export_state()` remet ses objets (caches, files,
+     compteurs, pools) à sa nouvelle instance, qui les reprend dans `cog_load`
+     avec `take_handoff()`. Les exécutions en cours sur l'ancienne instance
+     continuent avec ces mêmes objets, l'ancienne instance ne les ferme pas ;
+   - pour les autres cogs, les nouvelles exécutions sont refusées et les
+     exécutions en cours sont attendues (au plus `drain_timeout` secondes).
+3. Le module est remplacé par `bot.reload_extension`, qui restaure l'ancienne
+   version si le chargement de la nouvelle échoue. Les interactions reçues
+   pendant le remplacement sont mises en attente par l'arbre de commandes.
+4. Seules les commandes dont le contenu a changé sont renvoyées à Discord
+   (`CommandSyncManager.sync_changed_all`).
+"""
+import asyncio
+import importlib.util
+import inspect
+import logging
+import time
+
+from discord.ext import commands
+
+logger = logging.getLogger('discord.hot_reload')
+logger.setLevel(logging.INFO)
+
+
+class ReloadAborted(Exception):
+    """Le rechargement a été annulé avant le remplacement du module (l'ancienne version reste en place)."""
+
+
+def handoff_pending(bot: commands.Bot, cog_name: str) -> bool:
+    """True si l'état du cog a été remis à sa prochaine instance (l'ancienne instance ne doit pas le fermer)."""
+    return cog_name in getattr(bot, 'cog_handoffs', {})
+
+
+def take_handoff(bot: commands.Bot, cog_name: str) -> dict | None:
+    """État remis par l'instance précédente du cog, ou None hors rechargement à chaud."""
+    return getattr(bot, 'cog_handoffs', {}).pop(cog_name, None)
+
+
+async def close_state(state: dict):
+    """Ferme les objets d'un état non repris (méthode `close()`, synchrone ou asynchrone)."""
+    for value in state.values():
+        close = getattr(value, 'close', None)
+        if close is None:
+            continue
+        try:
+            result = close()
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.error(f"Erreur lors de la fermeture d'un état non repris ({type(value).__name__}): {type(e).__name__} - {e}")
+
+
+class ReloadReport:
+    """Résultat d'un rechargement."""
+
+    __slots__ = ('extension', 'handed_off', 'drained', 'duration_ms', 'sync', 'error')
+
+    def __init__(self, extension: str):
+        self.extension = extension
+        self.handed_off: list[str] = []  # Cogs dont l'état a été repris
+        self.drained: list[str] = []     # Cogs dont les exécutions en cours ont été attendues
+        self.duration_ms = 0.0
+        self.sync: dict | None = None    # Résultat de sync_changed_all (None si non synchronisé)
+        self.error: str | None = None
+
+
+class CogReloader:
+    """
+    Recharge une extension en reprenant ou en drainant le travail en cours.
+
+    Args:
+        bot: L'instance du bot (son arbre doit être un InstrumentedCommandTree pour le drainage).
+        drain_timeout: Délai maximal (secondes) d'attente des exécutions en cours d'un cog sans reprise d'état.
+        sync_commands: Renvoyer à Discord les commandes modifiées après le rechargement
+            (False sur les clusters autres que le cluster 0 : les commandes sont globales).
+    """
+
+    def __init__(self, bot: commands.Bot, drain_timeout: float = 30.0, sync_commands: bool = True):
+        self.bot = bot
+        self.drain_timeout = drain_timeout
+        self.sync_commands = sync_commands
+        self._lock = asyncio.Lock()
+        if not hasattr(bot, 'cog_handoffs'):
+            bot.cog_handoffs = {}
+
+        # Compteurs exposés via stats()
+        self.reloads = 0
+        self.failures = 0
+        self.last: ReloadReport | None = None
+
+    @staticmethod
+    def _check_source(extension: str):
+        """Compile le nouveau code source ; lève SyntaxError sans rien exécuter."""
+        spec = importlib.util.find_spec(extension)
+        if spec is None or spec.loader is None:
+            raise commands.ExtensionNotFound(extension)
+        source = spec.loader.get_source(extension)
+        if source is not None:
+            compile(source, spec.origin or extension, 'exec')
+
+    def cogs_of(self, extension: str) -> list[commands.Cog]:
+        return [cog for cog in self.bot.cogs.values() if type(cog).__module__ == extension]
+
+    async def reload(self, extension: str, force: bool = False, ignore_interaction: int | None = None) -> ReloadReport:
+        """
+        Recharge `extension`.
+
+        Args:
+            force: Recharger même si des exécutions sont toujours en cours à la fin du délai de drainage.
+            ignore_interaction: Interaction à ne pas attendre (celle qui a demandé le rechargement).
+
+        Raises:
+            commands.ExtensionNotLoaded: L'extension n'est pas chargée.
+            ReloadAborted: Code source invalide ou drainage incomplet (l'ancienne version reste en place).
+            commands.ExtensionError: Échec du chargement de la nouvelle version (l'ancienne a été restaurée).
+        """
+        if extension not in self.bot.extensions:
+            raise commands.ExtensionNotLoaded(extension)
+        async with self._lock:
+            report = ReloadReport(extension)
+            start = time.perf_counter()
+            try:
+                await self._reload(extension, report, force, ignore_interaction)
+                self.reloads += 1
+            except Exception as e:
+                self.failures += 1
+                report.error = f"{type(e).__name__}: {e}"
+                raise
+            finally:
+                report.duration_ms = (time.perf_counter() - start) * 1000
+                self.last = report
+            return report
+
+    async def _reload(self, extension: str, report: ReloadReport, force: bool, ignore_interaction: int | None):
+        try:
+            await asyncio.to_thread(self._check_source, extension)
+        except SyntaxError as e:
+            raise ReloadAborted(f"erreur de syntaxe dans {extension} (ligne {e.lineno}): {e.msg}") from e
+
+        tree = self.bot.tree
+        can_drain = hasattr(tree, 'wait_idle')
+        cogs = self.cogs_of(extension)
+        drained = [cog.qualified_name for cog in cogs if not hasattr(cog, 'cog_export_state')]
+        paused = []
+        try:
+            if can_drain:
+                for name in drained:
+                    tree.pause_cog(name)
+                    paused.append(name)
+                for name in drained:
+                    if not await tree.wait_idle(name, self.drain_timeout, ignore=ignore_interaction) and not force:
+                        raise ReloadAborted(f"exécutions de {name} toujours en cours après {self.drain_timeout:g} s")
+                report.drained = drained
+
+            if can_drain:
+                tree.begin_swap()
+            try:
+                for cog in cogs:
+                    if hasattr(cog, 'cog_export_state'):
+                        self.bot.cog_handoffs[cog.qualified_name] = cog.cog_export_state()
+                        report.handed_off.append(cog.qualified_name)
+                await self.bot.reload_extension(extension)
+            finally:
+                if can_drain:
+                    tree.end_swap()
+                # États non repris (cog absent de la nouvelle version, échec du chargement) : fermés ici
+                for name in report.handed_off:
+                    state = self.bot.cog_handoffs.pop(name, None)
+                    if state is not None:
+                        logger.warning(f"État du cog {name} non repris par la nouvelle version, fermeture.")
+                        await close_state(state)
+        finally:
+            for name in paused:
+                tree.resume_cog(name)
+
+        logger.info(
+            f"Cog {extension} rechargé (état repris: {', '.join(report.handed_off) or 'aucun'}, "
+            f"drainé: {', '.join(report.drained) or 'aucun'})."
+        )
+        command_sync = getattr(self.bot, 'command_sync', None)
+        if self.sync_commands and command_sync is not None and self.bot.is_ready():
+            report.sync = await command_sync.sync_changed_all()
+
+    def stats(self) -> dict:
+        return {
+            'reloads': self.reloads,
+            'failures': self.failures,
+            'last_extension': self.last.extension if self.last else None,
+            'last_duration_ms': self.last.duration_ms if self.last else None,
+            'last_error': self.last.error if self.last else None,
+        }
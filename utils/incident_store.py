@@ -0,0 +1,252 @@
+"""
+Stockage persistant des incidents de ghost ping.
+Les incidents sont écrits dans une base SQLite locale (mode WAL) par un écrivain
+asynchrone : le gestionnaire d'événements ne fait qu'ajouter l'incident à une file
+en mémoire, et les écritures sont regroupées par lots dans un thread dédié.
+Les requêtes (par auteur ou par cible, sur une période) utilisent les index
+(guild_id, author_id, created_at) et (guild_id, target_id, created_at).
+"""
+import asyncio
+import concurrent.futures
+import logging
+import os
+import sqlite3
+import time
+from collections import deque
+
+logger = logging.getLogger('discord.incident_store')
+logger.setLevel(logging.INFO)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS incidents (
+    id INTEGER PRIMARY KEY,
+    guild_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    message_id INTEGER NOT NULL,
+    author_id INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    detected_at REAL NOT NULL,
+    content TEXT NOT NULL,
+    source TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS incident_targets (
+    incident_id INTEGER NOT NULL REFERENCES incidents(id) ON DELETE CASCADE,
+    guild_id INTEGER NOT NULL,
+    target_id INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_incidents_author ON incidents (guild_id, author_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_incidents_guild ON incidents (guild_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_targets_target ON incident_targets (guild_id, target_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_targets_incident ON incident_targets (incident_id);
+"""
+
+
+class Incident:
+    """Un ghost ping détecté."""
+
+    __slots__ = ('guild_id', 'channel_id', 'message_id', 'author_id', 'target_ids', 'created_at', 'detected_at', 'content', 'source', 'id')
+
+    def __init__(self, guild_id: int, channel_id: int, message_id: int, author_id: int, target_ids: tuple[int, ...],
+                 created_at: float, content: str, source: str = 'single', detected_at: float | None = None, incident_id: int | None = None):
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.message_id = message_id
+        self.author_id = author_id
+        self.target_ids = target_ids
+        self.created_at = created_at
+        self.detected_at = time.time() if detected_at is None else detected_at
+        self.content = content
+        self.source = source  # 'single' (suppression simple) ou 'bulk' (suppression en masse)
+        self.id = incident_id
+
+    @classmethod
+    def from_message(cls, message, source: str = 'single', max_content_length: int = 1000) -> 'Incident':
+        """Construit un incident depuis un message (ou une vue de message du cache des mentions)."""
+        return cls(
+            message.guild.id,
+            message.channel.id,
+            message.id,
+            message.author.id,
+            tuple(dict.fromkeys(m.id for m in message.mentions if m.id != message.author.id and not m.bot)),
+            message.created_at.timestamp(),
+            (message.content or "")[:max_content_length],
+            source,
+        )
+
+
+class IncidentStore:
+    """
+    Base d'incidents avec écrivain par lots.
+
+    Args:
+        path: Chemin du fichier SQLite.
+        flush_interval: Délai maximal (secondes) avant l'écriture d'un incident.
+        batch_size: Nombre d'incidents qui déclenche une écriture immédiate.
+        max_queue: Nombre maximal d'incidents en attente (au-delà, les plus anciens sont abandonnés).
+        retention_days: Durée de conservation des incidents (None pour tout garder).
+    """
+
+    def __init__(self, path: str = 'data/incidents.sqlite3', flush_interval: float = 1.0, batch_size: int = 100,
+                 max_queue: int = 10000, retention_days: float | None = 365):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.retention_days = retention_days
+        self._pending: deque[Incident] = deque(maxlen=max_queue)
+        # Un seul thread possède la connexion : écritures et lectures y sont sérialisées
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='incident-store')
+        self._connection: sqlite3.Connection | None = None
+        self._wakeup = asyncio.Event()
+        self._writer: asyncio.Task | None = None
+        self._flush_lock = asyncio.Lock()
+
+        # Compteurs exposés via stats()
+        self.recorded = 0
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.failed = 0
+
+    # --- Thread de la base ---
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        connection.executescript(SCHEMA)
+        if self.retention_days:
+            with connection:
+                connection.execute("DELETE FROM incidents WHERE created_at < ?", (time.time() - self.retention_days * 86400,))
+        self._connection = connection
+
+    def _write_batch(self, batch: list[Incident]):
+        with self._connection:
+            for incident in batch:
+                cursor = self._connection.execute(
+                    "INSERT INTO incidents (guild_id, channel_id, message_id, author_id, created_at, detected_at, content, source)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (incident.guild_id, incident.channel_id, incident.message_id, incident.author_id,
+                     incident.created_at, incident.detected_at, incident.content, incident.source)
+                )
+                incident.id = cursor.lastrowid
+                self._connection.executemany(
+                    "INSERT INTO incident_targets (incident_id, guild_id, target_id, created_at) VALUES (?, ?, ?, ?)",
+                    [(incident.id, incident.guild_id, target_id, incident.created_at) for target_id in incident.target_ids]
+                )
+
+    @staticmethod
+    def _where(guild_id: int, author_id: int | None, target_id: int | None, since: float | None) -> tuple[str, list]:
+        clauses, params = ["i.guild_id = ?"], [guild_id]
+        if author_id is not None:
+            clauses.append("i.author_id = ?")
+            params.append(author_id)
+        if target_id is not None:
+            # Sous-requête servie par l'index (guild_id, target_id, created_at)
+            subquery = "SELECT incident_id FROM incident_targets WHERE guild_id = ? AND target_id = ?"
+            params += [guild_id, target_id]
+            if since is not None:
+                subquery += " AND created_at >= ?"
+                params.append(since)
+            clauses.append(f"i.id IN ({subquery})")
+        if since is not None:
+            clauses.append("i.created_at >= ?")
+            params.append(since)
+        return " AND ".join(clauses), params
+
+    def _query(self, guild_id: int, author_id: int | None, target_id: int | None, since: float | None,
+               limit: int, offset: int) -> tuple[int, list[Incident]]:
+        where, params = self._where(guild_id, author_id, target_id, since)
+        total = self._connection.execute(f"SELECT COUNT(*) FROM incidents i WHERE {where}", params).fetchone()[0]
+        rows = self._connection.execute(
+            f"SELECT i.id, i.guild_id, i.channel_id, i.message_id, i.author_id, i.created_at, i.detected_at, i.content, i.source"
+            f" FROM incidents i WHERE {where} ORDER BY i.created_at DESC, i.id DESC LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        ).fetchall()
+        targets: dict[int, list[int]] = {row[0]: [] for row in rows}
+        if rows:
+            placeholders = ", ".join("?" * len(rows))
+            for incident_id, target in self._connection.execute(
+                    f"SELECT incident_id, target_id FROM incident_targets WHERE incident_id IN ({placeholders})", list(targets)):
+                targets[incident_id].append(target)
+        incidents = [
+            Incident(guild, channel, message, author, tuple(targets[incident_id]), created_at, content, source,
+                     detected_at=detected_at, incident_id=incident_id)
+            for incident_id, guild, channel, message, author, created_at, detected_at, content, source in rows
+        ]
+        return total, incidents
+
+    def _close_connection(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    # --- Interface asynchrone ---
+
+    async def _run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    async def open(self):
+        await self._run(self._open)
+        self._writer = asyncio.create_task(self._writer_loop())
+        logger.info(f"Base des incidents ouverte: {self.path}")
+
+    def record(self, incident: Incident):
+        """Ajoute un incident à la file d'écriture (aucune attente, appelable depuis un gestionnaire d'événement)."""
+        if len(self._pending) == self._pending.maxlen:
+            self.dropped += 1
+        self._pending.append(incident)
+        self.recorded += 1
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def _writer_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Écrit tous les incidents en attente, par lots de `batch_size`."""
+        async with self._flush_lock:
+            while self._pending and self._connection is not None:
+                batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                try:
+                    await self._run(self._write_batch, batch)
+                    self.written += len(batch)
+                    self.batches += 1
+                except Exception as e:
+                    self.failed += len(batch)
+                    logger.error(f"Erreur lors de l'écriture de {len(batch)} incident(s): {type(e).__name__} - {e}")
+
+    async def query(self, guild_id: int, author_id: int | None = None, target_id: int | None = None, since: float | None = None,
+                    limit: int = 10, offset: int = 0) -> tuple[int, list[Incident]]:
+        """Nombre total d'incidents correspondants et la page demandée (du plus récent au plus ancien)."""
+        await self.flush()  # Inclure les incidents encore en file
+        return await self._run(self._query, guild_id, author_id, target_id, since, limit, offset)
+
+    async def close(self):
+        """Écrit les incidents en attente puis ferme la base."""
+        if self._writer is not None:
+            self._writer.cancel()
+            self._writer = None
+        await self.flush()
+        await self._run(self._close_connection)
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> dict:
+        return {
+            'pending': len(self._pending),
+            'recorded': self.recorded,
+            'written': self.written,
+            'batches': self.batches,
+            'dropped': self.dropped,
+            'failed': self.failed,
+        }
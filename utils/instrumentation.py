@@ -0,0 +1,402 @@
+"""
+Instrumentation des commandes d'application (slash et menus contextuels).
+L'arbre de commandes `InstrumentedCommandTree` mesure pour chaque commande :
+- le temps jusqu'au defer,
+- le temps jusqu'à la première réponse visible (message, modal ou followup après defer),
+- la durée totale du handler,
+ainsi que le nombre d'appels et d'erreurs. Les durées sont stockées dans des
+histogrammes à seaux fixes (mémoire constante) et exportables au format texte Prometheus.
+L'arbre suit aussi les exécutions en cours par cog, pour le rechargement à chaud
+(utils/hot_reload.py) : attente de la fin des exécutions, refus temporaire des
+nouvelles, et mise en attente des interactions pendant le remplacement d'un module.
+"""
+import asyncio
+import bisect
+import logging
+import os
+import time
+from typing import Callable
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+logger = logging.getLogger('discord.instrumentation')
+logger.setLevel(logging.INFO)
+
+# Bornes supérieures des seaux (secondes), comme les histogrammes Prometheus
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Histogramme à seaux fixes : mémoire constante quel que soit le nombre d'observations."""
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Le dernier seau correspond à +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Estime un quantile par interpolation linéaire dans le seau concerné."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                if i >= len(self.buckets):
+                    return lower  # Seau +Inf : on ne peut pas faire mieux que sa borne inférieure
+                upper = self.buckets[i]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+
+class CommandStats:
+    """Mesures d'une commande."""
+
+    __slots__ = ('calls', 'errors', 'defer', 'first_response', 'total')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.defer = Histogram()
+        self.first_response = Histogram()
+        self.total = Histogram()
+
+
+class _Timing:
+    __slots__ = ('start', 'defer', 'first_response')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.defer = None
+        self.first_response = None
+
+    def mark(self, kind: str):
+        """Note le premier defer / la première réponse visible."""
+        elapsed = time.perf_counter() - self.start
+        if kind == 'defer':
+            if self.defer is None:
+                self.defer = elapsed
+        elif self.first_response is None:
+            self.first_response = elapsed
+
+
+class CommandMetrics:
+    """Registre des mesures par commande (nom qualifié)."""
+
+    def __init__(self):
+        self.commands: dict[str, CommandStats] = {}
+        self.caches: dict[str, Callable[[], dict]] = {}  # Nom -> fonction stats() d'un cache (exporté avec les commandes)
+
+    def register_cache(self, name: str, stats: Callable[[], dict]):
+        """Ajoute les compteurs d'un cache (valeurs numériques de `stats()`) à l'export."""
+        self.caches[name] = stats
+
+    def unregister_cache(self, name: str):
+        self.caches.pop(name, None)
+
+    def _stats(self, name: str) -> CommandStats:
+        stats = self.commands.get(name)
+        if stats is None:
+            stats = self.commands[name] = CommandStats()
+        return stats
+
+    def end(self, interaction: discord.Interaction, timing: _Timing):
+        stats = self._stats(command_name(interaction))
+        stats.calls += 1
+        stats.total.observe(time.perf_counter() - timing.start)
+        if timing.defer is not None:
+            stats.defer.observe(timing.defer)
+        if timing.first_response is not None:
+            stats.first_response.observe(timing.first_response)
+
+    def record_error(self, interaction: discord.Interaction):
+        self._stats(command_name(interaction)).errors += 1
+
+    def to_prometheus(self) -> str:
+        """Sérialise les mesures au format d'exposition texte de Prometheus."""
+        lines = [
+            '# HELP discord_command_calls_total Nombre d\'appels de la commande.',
+            '# TYPE discord_command_calls_total counter',
+        ]
+        for name, stats in sorted(self.commands.items()):
+            lines.append(f'discord_command_calls_total{{command="{name}"}} {stats.calls}')
+        lines += [
+            '# HELP discord_command_errors_total Nombre d\'erreurs de la commande.',
+            '# TYPE discord_command_errors_total counter',
+        ]
+        for name, stats in sorted(self.commands.items()):
+            lines.append(f'discord_command_errors_total{{command="{name}"}} {stats.errors}')
+
+        for metric, attribute, help_text in (
+            ('discord_command_defer_seconds', 'defer', 'Temps jusqu\'au defer.'),
+            ('discord_command_first_response_seconds', 'first_response', 'Temps jusqu\'à la première réponse visible.'),
+            ('discord_command_duration_seconds', 'total', 'Durée totale du handler.'),
+        ):
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} histogram']
+            for name, stats in sorted(self.commands.items()):
+                histogram: Histogram = getattr(stats, attribute)
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{metric}_bucket{{command="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{command="{name}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{metric}_sum{{command="{name}"}} {histogram.sum:.6f}')
+                lines.append(f'{metric}_count{{command="{name}"}} {histogram.count}')
+
+        cache_values: dict[str, list[str]] = {}
+        for name, stats in sorted(self.caches.items()):
+            for key, value in stats().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    cache_values.setdefault(key, []).append(f'discord_cache_{key}{{cache="{name}"}} {value}')
+        for key, values in sorted(cache_values.items()):
+            lines += [f'# TYPE discord_cache_{key} gauge'] + values
+        return '\n'.join(lines) + '\n'
+
+
+def command_name(interaction: discord.Interaction) -> str:
+    command = interaction.command
+    if command is not None:
+        return command.qualified_name
+    data = interaction.data or {}
+    return data.get('name', 'inconnue')
+
+
+# --- Réponses mesurées ---
+# Posées sur l'interaction mesurée uniquement (`interaction.response` et `interaction.followup`) :
+# les classes de discord.py ne sont pas modifiées et les autres interactions ne sont pas concernées.
+
+class _MeasuredResponse(discord.InteractionResponse):
+    """Réponse d'interaction qui horodate le defer et la première réponse visible."""
+
+    __slots__ = ('_timing',)
+
+    def __init__(self, parent: discord.Interaction, timing: _Timing):
+        super().__init__(parent)
+        self._timing = timing
+
+    async def defer(self, *args, **kwargs):
+        result = await super().defer(*args, **kwargs)
+        self._timing.mark('defer')
+        return result
+
+    async def send_message(self, *args, **kwargs):
+        result = await super().send_message(*args, **kwargs)
+        self._timing.mark('response')
+        return result
+
+    async def edit_message(self, *args, **kwargs):
+        result = await super().edit_message(*args, **kwargs)
+        self._timing.mark('response')
+        return result
+
+    async def send_modal(self, *args, **kwargs):
+        result = await super().send_modal(*args, **kwargs)
+        self._timing.mark('response')
+        return result
+
+
+class _MeasuredFollowup(discord.Webhook):
+    """Webhook de followup qui horodate la première réponse visible après un defer."""
+
+    __slots__ = ('_timing',)
+
+    async def send(self, *args, **kwargs):
+        result = await super().send(*args, **kwargs)
+        self._timing.mark('response')
+        return result
+
+
+def _measure_responses(interaction: discord.Interaction, timing: _Timing):
+    """Remplace la réponse et le followup de l'interaction par leurs versions mesurées."""
+    interaction._cs_response = _MeasuredResponse(interaction, timing)
+    followup = _MeasuredFollowup.from_state(
+        data={'id': interaction.application_id, 'type': 3, 'token': interaction.token},
+        state=interaction._state,
+    )
+    followup._timing = timing
+    interaction._cs_followup = followup
+
+
+class InstrumentedCommandTree(app_commands.CommandTree):
+    """CommandTree qui mesure chaque commande d'application (voir CommandMetrics)."""
+
+    def __init__(self, client, *args, **kwargs):
+        # Incrémenté à chaque modification de l'arbre (caches dérivés de l'arbre, ex. l'index de /help)
+        self.generation = 0
+        super().__init__(client, *args, **kwargs)
+        self.metrics = CommandMetrics()
+        client.add_listener(self._on_command_completion, 'on_app_command_completion')
+        # Rechargement à chaud : interactions en cours par cog, cogs suspendus, remplacement de module en cours
+        self.in_flight: dict[str, set[int]] = {}
+        self.paused_cogs: set[str] = set()
+        self._swap_done = asyncio.Event()
+        self._swap_done.set()
+        self.swap_timeout = 2.0
+
+    def add_command(self, *args, **kwargs):
+        self.generation += 1
+        return super().add_command(*args, **kwargs)
+
+    def remove_command(self, *args, **kwargs):
+        self.generation += 1
+        return super().remove_command(*args, **kwargs)
+
+    def clear_commands(self, *args, **kwargs):
+        self.generation += 1
+        return super().clear_commands(*args, **kwargs)
+
+    # --- Rechargement à chaud ---
+
+    def begin_swap(self):
+        """Met les nouvelles interactions en attente (au plus `swap_timeout` secondes) pendant le remplacement d'un module."""
+        self._swap_done.clear()
+
+    def end_swap(self):
+        self._swap_done.set()
+
+    def pause_cog(self, cog_name: str):
+        """Refuse les nouvelles exécutions des commandes du cog (avec un message éphémère)."""
+        self.paused_cogs.add(cog_name)
+
+    def resume_cog(self, cog_name: str):
+        self.paused_cogs.discard(cog_name)
+
+    async def wait_idle(self, cog_name: str, timeout: float, ignore: int | None = None) -> bool:
+        """Attend la fin des exécutions en cours du cog (hors interaction `ignore`) ; False si le délai est dépassé."""
+        deadline = time.monotonic() + timeout
+        while self.in_flight.get(cog_name, set()) - {ignore}:
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.05)
+        return True
+
+    @staticmethod
+    def _cog_name(interaction: discord.Interaction) -> str | None:
+        binding = getattr(interaction.command, 'binding', None)
+        return binding.qualified_name if isinstance(binding, commands.Cog) else None
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if not self._swap_done.is_set():
+            # Module en cours de remplacement : l'interaction est traitée par la nouvelle instance du cog
+            try:
+                await asyncio.wait_for(self._swap_done.wait(), timeout=self.swap_timeout)
+            except asyncio.TimeoutError:
+                pass
+        # L'autocomplétion passe aussi par ici mais n'est pas une exécution de commande
+        if interaction.type is not discord.InteractionType.application_command:
+            return True
+        cog_name = self._cog_name(interaction)
+        if cog_name in self.paused_cogs:
+            await interaction.response.send_message("🔄 Cette commande est en cours de rechargement, réessayez dans quelques secondes.", ephemeral=True)
+            return False
+        if cog_name is not None:
+            self.in_flight.setdefault(cog_name, set()).add(interaction.id)
+        timing = _Timing()
+        _measure_responses(interaction, timing)
+        # Clôturé par `_on_command_completion` (succès) ou `on_error` (échec)
+        interaction.extras['instrumentation'] = (timing, cog_name)
+        return True
+
+    def _finish(self, interaction: discord.Interaction):
+        measured = interaction.extras.pop('instrumentation', None)
+        if measured is None:
+            return
+        timing, cog_name = measured
+        self.metrics.end(interaction, timing)
+        if cog_name is not None:
+            running = self.in_flight.get(cog_name)
+            if running is not None:
+                running.discard(interaction.id)
+                if not running:
+                    del self.in_flight[cog_name]
+
+    async def _on_command_completion(self, interaction: discord.Interaction, command):
+        self._finish(interaction)
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        self._finish(interaction)
+        self.metrics.record_error(interaction)
+        await super().on_error(interaction, error)
+
+
+class PrometheusExporter:
+    """
+    Exporte les mesures au format Prometheus, dans un fichier réécrit périodiquement
+    et/ou via un petit serveur HTTP local (GET /metrics).
+    """
+
+    def __init__(self, metrics: CommandMetrics, path: str | None = None, port: int | None = None,
+                 host: str = '127.0.0.1', interval: float = 15.0):
+        self.metrics = metrics
+        self.path = path
+        self.port = port
+        self.host = host
+        self.interval = interval
+        self._server: asyncio.AbstractServer | None = None
+        self._writer_task: asyncio.Task | None = None
+
+    async def start(self):
+        if self.port:
+            self._server = await asyncio.start_server(self._handle_http, self.host, self.port)
+            logger.info(f"Export Prometheus disponible sur http://{self.host}:{self.port}/metrics")
+        if self.path:
+            self._writer_task = asyncio.create_task(self._write_periodically())
+            logger.info(f"Export Prometheus écrit dans {self.path} toutes les {self.interval:.0f}s")
+
+    async def _write_periodically(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.write_file()
+            except OSError as e:
+                logger.error(f"Impossible d'écrire l'export Prometheus: {type(e).__name__} - {e}")
+
+    def write_file(self):
+        """Écrit l'export de façon atomique (fichier temporaire puis renommage)."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.metrics.to_prometheus())
+        os.replace(tmp_path, self.path)
+
+    async def _handle_http(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5.0)
+            # Ignorer les en-têtes de la requête
+            while (await asyncio.wait_for(reader.readline(), timeout=5.0)) not in (b'\r\n', b'\n', b''):
+                pass
+            if request_line.split(b' ')[1:2] == [b'/metrics']:
+                body = self.metrics.to_prometheus().encode('utf-8')
+                status = b'200 OK'
+            else:
+                body = b'Not Found\n'
+                status = b'404 Not Found'
+            writer.write(
+                b'HTTP/1.1 ' + status + b'\r\n'
+                b'Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n'
+                b'Content-Length: ' + str(len(body)).encode() + b'\r\n'
+                b'Connection: close\r\n\r\n' + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def close(self):
+        if self._writer_task:
+            self._writer_task.cancel()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
@@ -0,0 +1,170 @@
+"""
+File d'attente équitable pour les exécutions de /run.
+Le nombre d'exécutions simultanées est borné globalement et par utilisateur ;
+les places libérées sont attribuées à tour de rôle entre les utilisateurs en
+attente, et une demande est rejetée immédiatement si la file est pleine.
+"""
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger('discord.job_queue')
+
+
+class QueueFull(Exception):
+    """La file d'attente a atteint sa taille maximale."""
+
+
+class UserLimitReached(Exception):
+    """L'utilisateur a déjà trop d'exécutions en cours ou en attente."""
+
+
+class FairJobQueue:
+    """
+    Contrôle d'admission avec tourniquet (round-robin) entre utilisateurs.
+
+    Args:
+        capacity: Nombre maximal d'exécutions simultanées (généralement la taille du pool).
+        max_pending: Nombre maximal d'exécutions en attente, tous utilisateurs confondus.
+        per_user_limit: Nombre maximal d'exécutions simultanées par utilisateur.
+        per_user_pending: Nombre maximal d'exécutions en attente par utilisateur.
+    """
+
+    def __init__(self, capacity: int = 2, max_pending: int = 20, per_user_limit: int = 1, per_user_pending: int = 3):
+        self.capacity = capacity
+        self.max_pending = max_pending
+        self.per_user_limit = per_user_limit
+        self.per_user_pending = per_user_pending
+
+        self._waiting: dict[int, deque[tuple[asyncio.Future, float]]] = {}
+        self._order: deque[int] = deque()  # Utilisateurs ayant des demandes en attente, dans l'ordre de passage
+        self._running: dict[int, int] = {}
+        self.running = 0
+        self.pending = 0
+
+        # Métriques exposées via stats()
+        self._wait_times: deque[float] = deque(maxlen=512)
+        self.admitted = 0
+        self.rejected = 0
+
+    def check_admission(self, user_id: int):
+        """
+        Vérifie sans attendre qu'une demande peut être acceptée.
+
+        Raises:
+            QueueFull: La file globale est pleine.
+            UserLimitReached: L'utilisateur a atteint sa limite d'attente.
+        """
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise QueueFull()
+        if len(self._waiting.get(user_id, ())) >= self.per_user_pending:
+            self.rejected += 1
+            raise UserLimitReached()
+
+    def _can_run(self, user_id: int) -> bool:
+        return self.running < self.capacity and self._running.get(user_id, 0) < self.per_user_limit
+
+    async def acquire(self, user_id: int):
+        """Attend une place d'exécution pour `user_id` (voir check_admission pour les exceptions)."""
+        self.check_admission(user_id)
+        if not self._order and self._can_run(user_id):
+            self._grant(user_id, 0.0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (future, time.monotonic())
+        self._waiting.setdefault(user_id, deque()).append(entry)
+        if user_id not in self._order:
+            self._order.append(user_id)
+        self.pending += 1
+        self._dispatch()  # Une place peut être libre si les utilisateurs devant sont à leur limite
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # La place a été attribuée juste avant l'annulation : la rendre
+                self.release(user_id)
+            else:
+                self._remove_waiting(user_id, entry)
+            raise
+
+    def _remove_waiting(self, user_id: int, entry):
+        waiting = self._waiting.get(user_id)
+        if waiting and entry in waiting:
+            waiting.remove(entry)
+            self.pending -= 1
+            if not waiting:
+                del self._waiting[user_id]
+                self._order.remove(user_id)
+
+    def _grant(self, user_id: int, waited: float):
+        self.running += 1
+        self._running[user_id] = self._running.get(user_id, 0) + 1
+        self.admitted += 1
+        self._wait_times.append(waited)
+
+    def release(self, user_id: int):
+        """Libère la place de `user_id` et l'attribue au prochain utilisateur éligible."""
+        self.running -= 1
+        remaining = self._running.get(user_id, 1) - 1
+        if remaining:
+            self._running[user_id] = remaining
+        else:
+            self._running.pop(user_id, None)
+        self._dispatch()
+
+    def _dispatch(self):
+        """Attribue les places libres en tournant sur les utilisateurs en attente."""
+        for _ in range(len(self._order)):
+            if self.running >= self.capacity:
+                return
+            user_id = self._order.popleft()
+            waiting = self._waiting[user_id]
+            # Demandes annulées dont acquire() n'a pas encore fait le ménage (il s'exécute au tour de boucle suivant)
+            while waiting and waiting[0][0].done():
+                waiting.popleft()
+                self.pending -= 1
+            if waiting and self._running.get(user_id, 0) < self.per_user_limit:
+                future, queued_at = waiting.popleft()
+                self.pending -= 1
+                self._grant(user_id, time.monotonic() - queued_at)
+                future.set_result(None)
+            if waiting:
+                self._order.append(user_id)  # Repasse en fin de tour
+            else:
+                del self._waiting[user_id]
+
+    @contextlib.asynccontextmanager
+    async def slot(self, user_id: int):
+        """`async with queue.slot(user_id):` réserve une place pour la durée du bloc."""
+        await self.acquire(user_id)
+        try:
+            yield
+        finally:
+            self.release(user_id)
+
+    def wait_percentiles(self) -> tuple[float, float]:
+        """Retourne les temps d'attente p50 et p95 (secondes) sur les dernières admissions."""
+        if not self._wait_times:
+            return 0.0, 0.0
+        ordered = sorted(self._wait_times)
+        last = len(ordered) - 1
+        return ordered[round(last * 0.50)], ordered[round(last * 0.95)]
+
+    def stats(self) -> dict:
+        p50, p95 = self.wait_percentiles()
+        return {
+            'running': self.running,
+            'capacity': self.capacity,
+            'pending': self.pending,
+            'max_pending': self.max_pending,
+            'users_running': len(self._running),
+            'users_waiting': len(self._waiting),
+            'admitted': self.admitted,
+            'rejected': self.rejected,
+            'wait_p50': p50,
+            'wait_p95': p95,
+        }
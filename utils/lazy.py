@@ -0,0 +1,81 @@
+"""
+Chargement différé des fonctionnalités lourdes des cogs.
+Les commandes d'un cog sont enregistrées dès son chargement, mais le module qui
+les implémente (et ses dépendances) n'est importé et instancié qu'à la première
+invocation. Les nœuds où la commande n'est jamais utilisée ne paient ni le temps
+d'import ni la mémoire correspondante.
+"""
+import asyncio
+import importlib
+import inspect
+import logging
+import time
+
+logger = logging.getLogger('discord.lazy')
+logger.setLevel(logging.INFO)
+
+
+class LazyFeature:
+    """
+    Fonctionnalité chargée à la demande : `module.factory(*args, **kwargs)`.
+
+    Args:
+        module: Nom du module à importer (ex: 'utils.run_runtime').
+        factory: Nom de la classe ou fonction du module qui construit la fonctionnalité.
+    """
+
+    def __init__(self, module: str, factory: str, *args, **kwargs):
+        self.module = module
+        self.factory = factory
+        self._args = args
+        self._kwargs = kwargs
+        self.instance = None
+        self._lock = asyncio.Lock()
+
+        # Temps de chargement exposés via stats()
+        self.import_ms: float | None = None
+        self.init_ms: float | None = None
+        self.failures = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self.instance is not None
+
+    async def get(self):
+        """Retourne la fonctionnalité, en l'important et l'instanciant au premier appel."""
+        if self.instance is not None:
+            return self.instance
+        async with self._lock:
+            if self.instance is None:
+                start = time.perf_counter()
+                # L'import (lecture et exécution des modules) se fait hors de la boucle d'événements
+                try:
+                    module = await asyncio.to_thread(importlib.import_module, self.module)
+                    loaded_at = time.perf_counter()
+                    instance = getattr(module, self.factory)(*self._args, **self._kwargs)
+                except Exception as e:
+                    # Rien n'est gardé : l'appel suivant retentera le chargement
+                    self.failures += 1
+                    logger.error(f"Échec du chargement de {self.module}.{self.factory}: {type(e).__name__} - {e}")
+                    raise
+                self.instance = instance
+                self.import_ms = (loaded_at - start) * 1000
+                self.init_ms = (time.perf_counter() - loaded_at) * 1000
+                logger.info(f"Fonctionnalité {self.module}.{self.factory} chargée (import: {self.import_ms:.1f} ms, initialisation: {self.init_ms:.1f} ms)")
+        return self.instance
+
+    async def close(self, **kwargs):
+        """Ferme la fonctionnalité si elle a été chargée (méthode `close()` de l'instance, synchrone ou asynchrone)."""
+        instance, self.instance = self.instance, None
+        if instance is not None and hasattr(instance, 'close'):
+            result = instance.close(**kwargs)
+            if inspect.isawaitable(result):
+                await result
+
+    def stats(self) -> dict:
+        return {
+            'loaded': self.loaded,
+            'import_ms': self.import_ms,
+            'init_ms': self.init_ms,
+            'failures': self.failures,
+        }
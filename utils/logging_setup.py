@@ -0,0 +1,137 @@
+"""
+Configuration du logging du bot.
+Les loggers n'écrivent plus directement : ils déposent leurs enregistrements dans une
+file (`QueueHandler`), vidée par un thread d'arrière-plan (`QueueListener`) qui fait
+les entrées/sorties. Les fichiers de `logs/` tournent par taille et par durée, et les
+fichiers tournés sont compressés dans `logs/archives`.
+"""
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import time
+
+LOG_FORMAT = '%(asctime)s:%(levelname)s:%(name)s: %(message)s'
+
+
+class ArchivingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Fichier de log qui tourne dès qu'il dépasse `max_bytes` octets ou que `interval`
+    secondes se sont écoulées. Le fichier tourné est compressé (gzip) dans `archive_dir`,
+    où seules les `archive_count` archives les plus récentes sont gardées.
+    """
+
+    def __init__(self, filename: str, archive_dir: str, max_bytes: int = 5 * 1024 * 1024,
+                 interval: float = 24 * 3600, archive_count: int = 30):
+        super().__init__(filename, maxBytes=max_bytes, encoding='utf-8', delay=True)
+        self.archive_dir = archive_dir
+        self.interval = interval
+        self.archive_count = archive_count
+        self.rollover_at = time.time() + interval
+        os.makedirs(archive_dir, exist_ok=True)
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.interval and time.time() >= self.rollover_at:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+            timestamp = time.strftime('%Y%m%d-%H%M%S')
+            base_name = os.path.basename(self.baseFilename)
+            archive_path = os.path.join(self.archive_dir, f"{base_name}.{timestamp}.gz")
+            suffix = 1
+            while os.path.exists(archive_path):  # Plusieurs rotations dans la même seconde
+                archive_path = os.path.join(self.archive_dir, f"{base_name}.{timestamp}-{suffix}.gz")
+                suffix += 1
+            rotated_path = f"{self.baseFilename}.rotating"
+            os.replace(self.baseFilename, rotated_path)
+            with open(rotated_path, 'rb') as source, gzip.open(archive_path, 'wb') as target:
+                shutil.copyfileobj(source, target)
+            os.remove(rotated_path)
+            self._prune_archives(base_name)
+
+        self.rollover_at = time.time() + self.interval
+        self.stream = self._open()
+
+    def _prune_archives(self, base_name: str):
+        archives = sorted(
+            (entry for entry in os.scandir(self.archive_dir) if entry.name.startswith(base_name) and entry.name.endswith('.gz')),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in archives[:-self.archive_count] if self.archive_count else []:
+            os.remove(entry.path)
+
+
+class DebugSamplingFilter(logging.Filter):
+    """
+    Mode échantillonné : ne laisse passer qu'un enregistrement DEBUG sur `every` pour
+    chaque ligne de code émettrice. Les niveaux INFO et supérieurs ne sont jamais filtrés.
+    """
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = max(1, every)
+        self._counters: dict[tuple[str, int], int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.every == 1:
+            return True
+        key = (record.pathname, record.lineno)
+        count = self._counters.get(key, 0)
+        self._counters[key] = count + 1
+        return count % self.every == 0
+
+
+def setup_logging(settings: dict) -> logging.handlers.QueueListener:
+    """
+    Installe le pipeline de logging non bloquant sur le logger racine.
+
+    Clés reconnues dans `settings` (clé "logging" de config.json) : level, directory,
+    filename, max_bytes, interval, archive_count, debug_sample_every, console, discord_level.
+
+    Returns:
+        Le QueueListener démarré (à arrêter avec .stop() à la fermeture du bot).
+    """
+    directory = settings.get('directory', 'logs')
+    os.makedirs(directory, exist_ok=True)
+    formatter = logging.Formatter(LOG_FORMAT)
+
+    # Handlers exécutés dans le thread du QueueListener
+    file_handler = ArchivingRotatingFileHandler(
+        os.path.join(directory, settings.get('filename', 'bot.log')),
+        archive_dir=os.path.join(directory, 'archives'),
+        max_bytes=settings.get('max_bytes', 5 * 1024 * 1024),
+        interval=settings.get('interval', 24 * 3600),
+        archive_count=settings.get('archive_count', 30),
+    )
+    file_handler.setFormatter(formatter)
+    handlers = [file_handler]
+    if settings.get('console', True):
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+
+    # Côté boucle d'événements : un simple dépôt dans la file
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    sample_every = settings.get('debug_sample_every', 1)
+    if sample_every > 1:
+        queue_handler.addFilter(DebugSamplingFilter(sample_every))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(getattr(logging, str(settings.get('level', 'INFO')).upper(), logging.INFO))
+    logging.getLogger('discord').setLevel(getattr(logging, str(settings.get('discord_level', 'WARNING')).upper(), logging.WARNING))
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,176 @@
+"""
+Cache compact des messages contenant des mentions.
+Seuls les messages susceptibles de devenir des ghost pings sont gardés, sous forme
+d'enregistrements à `__slots__` plutôt que d'objets `discord.Message` complets.
+Le cache est borné en octets, avec une éviction LRU et un TTL par guilde : le cache
+de messages principal de discord.py (`max_messages`) peut ainsi être fortement réduit.
+"""
+import datetime
+import logging
+import sys
+import time
+from collections import OrderedDict
+
+import discord
+
+logger = logging.getLogger('discord.mention_cache')
+
+
+class MentionRecord:
+    """Version réduite d'un message avec mentions."""
+
+    __slots__ = (
+        'message_id', 'channel_id', 'guild_id', 'author_id', 'mention_ids',
+        'content', 'created_at', 'stored_at', 'size',
+    )
+
+    def __init__(self, message_id: int, channel_id: int, guild_id: int, author_id: int,
+                 mention_ids: tuple[int, ...], content: str, created_at: datetime.datetime):
+        self.message_id = message_id
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+        self.author_id = author_id
+        self.mention_ids = mention_ids
+        self.content = content
+        self.created_at = created_at
+        self.stored_at = time.monotonic()
+        self.size = self._estimate_size()
+
+    def _estimate_size(self) -> int:
+        """Estimation de l'empreinte mémoire de l'enregistrement (octets)."""
+        return (
+            sys.getsizeof(self)
+            + sys.getsizeof(self.content)
+            + sys.getsizeof(self.mention_ids)
+            + 28 * len(self.mention_ids)  # Les entiers Discord (snowflakes) ne sont pas internés
+            + 64  # Entrée de l'OrderedDict de la guilde
+        )
+
+    @classmethod
+    def from_message(cls, message: discord.Message, max_content_length: int) -> 'MentionRecord':
+        content = message.content
+        if len(content) > max_content_length:
+            content = content[:max_content_length]
+        return cls(
+            message.id,
+            message.channel.id,
+            message.guild.id,
+            message.author.id,
+            tuple(m.id for m in message.mentions),
+            content,
+            message.created_at,
+        )
+
+
+class MentionCache:
+    """
+    Cache par guilde des messages avec mentions.
+
+    - `max_bytes` : budget mémoire global (toutes guildes confondues).
+    - `max_bytes_per_guild` : budget d'une guilde, pour qu'un serveur très actif n'évince pas les autres.
+    - `ttl` : durée de vie (s) d'un enregistrement.
+    """
+
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024, max_bytes_per_guild: int = 1024 * 1024,
+                 ttl: float = 600.0, max_content_length: int = 1000):
+        self.max_bytes = max_bytes
+        self.max_bytes_per_guild = max_bytes_per_guild
+        self.ttl = ttl
+        self.max_content_length = max_content_length
+
+        self._guilds: dict[int, OrderedDict[int, MentionRecord]] = {}
+        self._guild_bytes: dict[int, int] = {}
+        self.total_bytes = 0
+
+        # Compteurs exposés via stats()
+        self.stored = 0
+        self.resolved = 0
+        self.evicted = 0
+        self.expired = 0
+
+    def add(self, message: discord.Message):
+        """Enregistre un message s'il contient des mentions."""
+        if not message.guild or not message.mentions:
+            return
+        record = MentionRecord.from_message(message, self.max_content_length)
+        entries = self._guilds.setdefault(record.guild_id, OrderedDict())
+        previous = entries.pop(record.message_id, None)
+        if previous is not None:
+            self._account(record.guild_id, -previous.size)
+        entries[record.message_id] = record
+        self._account(record.guild_id, record.size)
+        self.stored += 1
+
+        self._expire(record.guild_id)
+        while entries and self._guild_bytes[record.guild_id] > self.max_bytes_per_guild:
+            self._evict_oldest(record.guild_id)
+        self._drop_if_empty(record.guild_id)
+        while self.total_bytes > self.max_bytes and self._guild_bytes:
+            # Budget global dépassé : évincer dans la guilde qui occupe le plus de place
+            largest = max(self._guild_bytes, key=self._guild_bytes.get)
+            self._evict_oldest(largest)
+            self._drop_if_empty(largest)
+
+    def pop(self, guild_id: int, message_id: int) -> MentionRecord | None:
+        """Retire et retourne l'enregistrement d'un message supprimé, s'il est encore valide."""
+        entries = self._guilds.get(guild_id)
+        if not entries:
+            return None
+        record = entries.pop(message_id, None)
+        if record is None:
+            return None
+        self._account(guild_id, -record.size)
+        self._drop_if_empty(guild_id)
+        if time.monotonic() - record.stored_at > self.ttl:
+            self.expired += 1
+            return None
+        self.resolved += 1
+        return record
+
+    def discard(self, guild_id: int, message_id: int):
+        """Oublie un message (ex: modifié et ne contenant plus de mention)."""
+        entries = self._guilds.get(guild_id)
+        if entries:
+            record = entries.pop(message_id, None)
+            if record is not None:
+                self._account(guild_id, -record.size)
+                self._drop_if_empty(guild_id)
+
+    def remove_guild(self, guild_id: int):
+        """Libère tous les enregistrements d'une guilde (ex: bot retiré du serveur)."""
+        self._guilds.pop(guild_id, None)
+        self.total_bytes -= self._guild_bytes.pop(guild_id, 0)
+
+    def _account(self, guild_id: int, delta: int):
+        self._guild_bytes[guild_id] = self._guild_bytes.get(guild_id, 0) + delta
+        self.total_bytes += delta
+
+    def _drop_if_empty(self, guild_id: int):
+        if guild_id in self._guilds and not self._guilds[guild_id]:
+            self.remove_guild(guild_id)
+
+    def _evict_oldest(self, guild_id: int):
+        _, record = self._guilds[guild_id].popitem(last=False)
+        self.evicted += 1
+        self._account(guild_id, -record.size)
+
+    def _expire(self, guild_id: int):
+        """Retire les enregistrements expirés en tête de la guilde (ordre d'insertion)."""
+        entries = self._guilds.get(guild_id)
+        limit = time.monotonic() - self.ttl
+        while entries and next(iter(entries.values())).stored_at < limit:
+            _, record = entries.popitem(last=False)
+            self.expired += 1
+            self._account(guild_id, -record.size)
+
+    def stats(self) -> dict:
+        return {
+            'records': sum(len(entries) for entries in self._guilds.values()),
+            'guilds': len(self._guilds),
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'stored': self.stored,
+            'resolved': self.resolved,
+            'evicted': self.evicted,
+            'expired': self.expired,
+        }
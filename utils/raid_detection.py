@@ -0,0 +1,299 @@
+"""
+Détection de raids en temps réel.
+Chaque serveur a ses compteurs à fenêtre glissante, stockés dans des tampons
+circulaires de taille fixe : arrivées de membres par seconde, mentions par message
+et par minute (par auteur), et messages identiques postés dans plusieurs salons.
+Chaque événement coûte O(1) et la mémoire par serveur est bornée ; un dépassement
+de seuil produit un RaidEvent que le cog diffuse (`raid_detected`).
+"""
+import hashlib
+import logging
+import time
+from collections import OrderedDict, deque
+
+import discord
+
+logger = logging.getLogger('discord.raid_detection')
+
+
+# Alertes qui concernent un seul auteur : le délai entre deux alertes s'applique par auteur
+PER_AUTHOR_KINDS = frozenset({'mentions_message', 'mentions_minute'})
+
+
+class RingCounter:
+    """
+    Compteur à fenêtre glissante sur un tampon circulaire de `slots` cases de `resolution` secondes.
+    La somme de la fenêtre est tenue à jour : ajout et lecture en O(1) amorti, mémoire fixe.
+    """
+
+    __slots__ = ('resolution', 'slots', '_buckets', '_tick', 'total')
+
+    def __init__(self, window: float, resolution: float = 1.0):
+        self.resolution = resolution
+        self.slots = max(1, round(window / resolution))
+        self._buckets = [0] * self.slots
+        self._tick: int | None = None
+        self.total = 0
+
+    def _advance(self, now: float):
+        tick = int(now / self.resolution)
+        if self._tick is None:
+            self._tick = tick
+            return
+        # Vider les cases sorties de la fenêtre (au plus `slots` cases, même après une longue inactivité)
+        for expired in range(self._tick + 1, min(tick, self._tick + self.slots) + 1):
+            index = expired % self.slots
+            self.total -= self._buckets[index]
+            self._buckets[index] = 0
+        self._tick = max(self._tick, tick)
+
+    def add(self, now: float, count: int = 1) -> int:
+        """Ajoute `count` à l'instant `now` et retourne le total de la fenêtre."""
+        self._advance(now)
+        self._buckets[self._tick % self.slots] += count
+        self.total += count
+        return self.total
+
+    def value(self, now: float) -> int:
+        self._advance(now)
+        return self.total
+
+
+class RaidEvent:
+    """Dépassement d'un seuil dans un serveur."""
+
+    __slots__ = ('guild_id', 'kind', 'value', 'threshold', 'user_ids', 'channel_id', 'detected_at')
+
+    def __init__(self, guild_id: int, kind: str, value: int, threshold: int, user_ids: tuple[int, ...], channel_id: int | None = None):
+        self.guild_id = guild_id
+        self.kind = kind  # 'joins', 'mentions_message', 'mentions_minute' ou 'duplicates'
+        self.value = value
+        self.threshold = threshold
+        self.user_ids = user_ids  # Utilisateurs impliqués (cibles possibles d'une modération de masse)
+        self.channel_id = channel_id
+        self.detected_at = time.time()
+
+    def __repr__(self) -> str:
+        return f"<RaidEvent guild={self.guild_id} kind={self.kind} value={self.value}/{self.threshold} users={len(self.user_ids)}>"
+
+
+class _DuplicateEntry:
+    __slots__ = ('count', 'channel_ids', 'author_ids')
+
+    def __init__(self):
+        self.count = 0
+        # Nombre de copies dans la fenêtre, par salon et par auteur
+        self.channel_ids: dict[int, int] = {}
+        self.author_ids: dict[int, int] = {}
+
+
+class GuildRaidState:
+    """Compteurs d'un serveur ; toutes les structures ont une taille maximale fixe."""
+
+    __slots__ = ('joins', 'recent_joiners', 'authors', 'duplicates', 'duplicate_log', 'last_triggered', 'last_seen')
+
+    def __init__(self, join_window: float, max_joiners: int):
+        self.joins = RingCounter(join_window)
+        self.recent_joiners: deque[tuple[float, int]] = deque(maxlen=max_joiners)
+        self.authors: OrderedDict[int, RingCounter] = OrderedDict()  # LRU des auteurs récents -> mentions par minute
+        self.duplicates: dict[bytes, _DuplicateEntry] = {}
+        self.duplicate_log: deque[tuple[float, bytes, int, int]] = deque()  # (instant, empreinte, salon, auteur)
+        # Dernière alerte par type ; par (type, auteur) pour les mentions, pour que chaque spammeur d'un raid soit signalé
+        self.last_triggered: dict[str | tuple[str, int], float] = {}
+        self.last_seen = time.monotonic()
+
+
+class RaidDetector:
+    """
+    Analyse des arrivées et des messages, par serveur.
+
+    Args:
+        join_threshold: Nombre d'arrivées dans `join_window` secondes qui déclenche une alerte.
+        join_window: Fenêtre (secondes) des arrivées.
+        mentions_per_message: Nombre de mentions dans un seul message qui déclenche une alerte.
+        mentions_per_minute: Nombre de mentions d'un même auteur en une minute qui déclenche une alerte.
+        duplicate_threshold: Nombre de copies d'un même message dans `duplicate_window` secondes.
+        duplicate_channels: Nombre minimal de salons distincts pour les copies.
+        duplicate_window: Fenêtre (secondes) des messages identiques.
+        min_duplicate_length: Longueur minimale d'un message pour être comparé (ignore "ok", "lol"...).
+        cooldown: Délai (secondes) entre deux alertes de même type pour un serveur
+            (de même type et même auteur pour les alertes de mentions).
+        max_tracked_authors: Nombre d'auteurs suivis par serveur (LRU).
+        max_tracked_messages: Nombre de messages gardés par serveur pour la détection des doublons.
+    """
+
+    def __init__(self, join_threshold: int = 10, join_window: float = 10.0, mentions_per_message: int = 15,
+                 mentions_per_minute: int = 30, duplicate_threshold: int = 5, duplicate_channels: int = 3,
+                 duplicate_window: float = 30.0, min_duplicate_length: int = 10, cooldown: float = 60.0,
+                 max_tracked_authors: int = 512, max_tracked_messages: int = 1024):
+        self.join_threshold = join_threshold
+        self.join_window = join_window
+        self.mentions_per_message = mentions_per_message
+        self.mentions_per_minute = mentions_per_minute
+        self.duplicate_threshold = duplicate_threshold
+        self.duplicate_channels = duplicate_channels
+        self.duplicate_window = duplicate_window
+        self.min_duplicate_length = min_duplicate_length
+        self.cooldown = cooldown
+        self.max_tracked_authors = max_tracked_authors
+        self.max_tracked_messages = max_tracked_messages
+        self._guilds: dict[int, GuildRaidState] = {}
+
+        # Compteurs exposés via stats()
+        self.joins_seen = 0
+        self.messages_seen = 0
+        self.triggered: dict[str, int] = {}
+        self.suppressed = 0
+
+    @classmethod
+    def from_config(cls, settings: dict) -> 'RaidDetector':
+        joins = settings.get('joins', {})
+        mentions = settings.get('mentions', {})
+        duplicates = settings.get('duplicates', {})
+        return cls(
+            join_threshold=joins.get('count', 10),
+            join_window=joins.get('seconds', 10.0),
+            mentions_per_message=mentions.get('per_message', 15),
+            mentions_per_minute=mentions.get('per_minute', 30),
+            duplicate_threshold=duplicates.get('count', 5),
+            duplicate_channels=duplicates.get('channels', 3),
+            duplicate_window=duplicates.get('seconds', 30.0),
+            min_duplicate_length=duplicates.get('min_length', 10),
+            cooldown=settings.get('cooldown', 60.0),
+            max_tracked_authors=settings.get('max_tracked_authors', 512),
+            max_tracked_messages=settings.get('max_tracked_messages', 1024),
+        )
+
+    def _state(self, guild_id: int) -> GuildRaidState:
+        state = self._guilds.get(guild_id)
+        if state is None:
+            state = self._guilds[guild_id] = GuildRaidState(self.join_window, self.join_threshold * 10)
+        state.last_seen = time.monotonic()
+        return state
+
+    def _trigger(self, state: GuildRaidState, event: RaidEvent, now: float) -> RaidEvent | None:
+        """Applique le délai entre deux alertes du même type (et du même auteur pour les mentions)."""
+        key = (event.kind, event.user_ids[0]) if event.kind in PER_AUTHOR_KINDS else event.kind
+        last = state.last_triggered.get(key)
+        if last is not None and now - last < self.cooldown:
+            self.suppressed += 1
+            return None
+        if len(state.last_triggered) >= self.max_tracked_authors:
+            # Mémoire bornée : oublier les délais écoulés
+            state.last_triggered = {k: t for k, t in state.last_triggered.items() if now - t < self.cooldown}
+        state.last_triggered[key] = now
+        self.triggered[event.kind] = self.triggered.get(event.kind, 0) + 1
+        return event
+
+    # --- Arrivées ---
+
+    def record_join(self, guild_id: int, user_id: int, now: float | None = None) -> RaidEvent | None:
+        now = time.monotonic() if now is None else now
+        self.joins_seen += 1
+        state = self._state(guild_id)
+        state.recent_joiners.append((now, user_id))
+        count = state.joins.add(now)
+        if count < self.join_threshold:
+            return None
+        limit = now - self.join_window
+        user_ids = tuple(joiner_id for joined_at, joiner_id in state.recent_joiners if joined_at >= limit)
+        return self._trigger(state, RaidEvent(guild_id, 'joins', count, self.join_threshold, user_ids), now)
+
+    # --- Messages ---
+
+    def record_message(self, message: discord.Message, now: float | None = None) -> list[RaidEvent]:
+        """Analyse un message de serveur (les filtres sur l'auteur sont à la charge de l'appelant)."""
+        now = time.monotonic() if now is None else now
+        self.messages_seen += 1
+        state = self._state(message.guild.id)
+        events = []
+
+        mentions = len(message.raw_mentions) + len(message.raw_role_mentions) + (1 if message.mention_everyone else 0)
+        if mentions:
+            events.extend(event for event in self._record_mentions(state, message, mentions, now) if event is not None)
+
+        content = message.content.strip().casefold()
+        if len(content) >= self.min_duplicate_length:
+            event = self._record_content(state, message, content, now)
+            if event is not None:
+                events.append(event)
+        return events
+
+    def _record_mentions(self, state: GuildRaidState, message: discord.Message, mentions: int, now: float) -> tuple:
+        guild_id, author_id = message.guild.id, message.author.id
+        per_message = None
+        if mentions >= self.mentions_per_message:
+            per_message = self._trigger(state, RaidEvent(guild_id, 'mentions_message', mentions, self.mentions_per_message,
+                                                         (author_id,), message.channel.id), now)
+
+        counter = state.authors.get(author_id)
+        if counter is None:
+            counter = state.authors[author_id] = RingCounter(60.0, resolution=5.0)
+            if len(state.authors) > self.max_tracked_authors:
+                state.authors.popitem(last=False)
+        else:
+            state.authors.move_to_end(author_id)
+        total = counter.add(now, mentions)
+        per_minute = None
+        if total >= self.mentions_per_minute:
+            per_minute = self._trigger(state, RaidEvent(guild_id, 'mentions_minute', total, self.mentions_per_minute,
+                                                        (author_id,), message.channel.id), now)
+        return per_message, per_minute
+
+    def _record_content(self, state: GuildRaidState, message: discord.Message, content: str, now: float) -> RaidEvent | None:
+        # Faire sortir les messages hors fenêtre, ou les plus anciens si le tampon est plein
+        limit = now - self.duplicate_window
+        log = state.duplicate_log
+        while log and (log[0][0] < limit or len(log) >= self.max_tracked_messages):
+            self._forget_duplicate(state, *log.popleft()[1:])
+
+        digest = hashlib.blake2b(content.encode('utf-8'), digest_size=8).digest()
+        log.append((now, digest, message.channel.id, message.author.id))
+        entry = state.duplicates.get(digest)
+        if entry is None:
+            entry = state.duplicates[digest] = _DuplicateEntry()
+        entry.count += 1
+        entry.channel_ids[message.channel.id] = entry.channel_ids.get(message.channel.id, 0) + 1
+        entry.author_ids[message.author.id] = entry.author_ids.get(message.author.id, 0) + 1
+        if entry.count < self.duplicate_threshold or len(entry.channel_ids) < self.duplicate_channels:
+            return None
+        return self._trigger(state, RaidEvent(message.guild.id, 'duplicates', entry.count, self.duplicate_threshold,
+                                              tuple(entry.author_ids), message.channel.id), now)
+
+    @staticmethod
+    def _forget_duplicate(state: GuildRaidState, digest: bytes, channel_id: int, author_id: int):
+        entry = state.duplicates.get(digest)
+        if entry is None:
+            return
+        entry.count -= 1
+        if entry.count <= 0:
+            del state.duplicates[digest]
+            return
+        # Seuls les auteurs et salons ayant encore une copie dans la fenêtre restent impliqués
+        # (sinon une phrase republiée sans fin accumulerait tous ses auteurs, sanctionnés ensuite)
+        for counts, key in ((entry.channel_ids, channel_id), (entry.author_ids, author_id)):
+            remaining = counts.get(key, 0) - 1
+            if remaining > 0:
+                counts[key] = remaining
+            else:
+                counts.pop(key, None)
+
+    # --- Maintenance ---
+
+    def remove_guild(self, guild_id: int):
+        self._guilds.pop(guild_id, None)
+
+    def sweep(self, idle: float = 600.0):
+        """Libère l'état des serveurs sans activité depuis `idle` secondes."""
+        limit = time.monotonic() - idle
+        for guild_id in [guild_id for guild_id, state in self._guilds.items() if state.last_seen < limit]:
+            del self._guilds[guild_id]
+
+    def stats(self) -> dict:
+        return {
+            'guilds': len(self._guilds),
+            'joins_seen': self.joins_seen,
+            'messages_seen': self.messages_seen,
+            'triggered': dict(self.triggered),
+            'suppressed': self.suppressed,
+        }
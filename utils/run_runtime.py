@@ -0,0 +1,283 @@
+"""
+Environnement d'exécution de la commande /run.
+Ce module regroupe tout ce qui n'est utile qu'à /run (analyse AST, globals sûrs,
+cache d'analyse, pool de processus ou de threads) : il est chargé à la première
+utilisation de la commande (voir utils/lazy.py), pas au démarrage du bot.
+"""
+import ast  # Pour l'analyse de code
+import asyncio
+import concurrent.futures # Pour ThreadPoolExecutor
+import contextlib # Pour redirect_stdout
+import datetime # Exemple de module sûr
+import logging
+import math # Exemple de module sûr
+import random # Exemple de module sûr
+import time
+import traceback # Pour les erreurs détaillées
+from types import CodeType
+from typing import Callable
+
+from utils.code_cache import CodeAnalysis, CodeAnalysisCache
+from utils.sandbox_pool import CappedStringIO, SandboxCrashed, SandboxPool, fork_available
+
+logger = logging.getLogger('discord.run_runtime')
+logger.setLevel(logging.INFO)
+
+# --- Définitions pour l'analyse et l'exécution sécurisée ---
+
+# Modules dont l'import direct est interdit
+DISALLOWED_MODULES  = {
+    'os', 'subprocess', 'sys', 'shutil', 'ctypes', 'socket', 'requests',
+    'pickle', 'marshal', 'importlib', 'ptrace', 'fcntl', 'urllib',
+    '_thread', 'threading', 'multiprocessing', 'asyncio' # Éviter la manipulation de l'event loop du bot
+}
+
+# Fonctions/builtins dont l'appel direct est interdit
+DISALLOWED_BUILTINS_CALLS = {
+    'eval', 'exec', 'open', '__import__', 'compile', 'input', 'exit', 'quit',
+    'breakpoint', 'memoryview'
+}
+
+# Noms dont l'utilisation directe ou l'accès à des attributs est suspect
+DISALLOWED_NAMES_ATTRIBUTES = {
+    '__builtins__', '__class__', '__subclasses__', '__globals__', '__code__',
+    '__mro__', '__bases__', '__dict__', 'system', 'remove', 'unlink', 'rmdir',
+    'listdir', 'popen', 'call', 'run', 'getoutput', 'check_output', 'path',
+    'start_new_thread', 'fork'
+}
+
+# Builtins autorisés dans l'environnement d'exécution
+ALLOWED_BUILTINS = {
+    'print': print, 'len': len, 'range': range, 'str': str, 'int': int, 'float': float,
+    'list': list, 'dict': dict, 'set': set, 'tuple': tuple, 'bool': bool,
+    'abs': abs, 'round': round, 'max': max, 'min': min, 'sum': sum,
+    'True': True, 'False': False, 'None': None,
+    'isinstance': isinstance, 'issubclass': issubclass, 'callable': callable,
+    'repr': repr, 'ascii': ascii, 'format': format, 'hasattr': hasattr, # getattr est risqué
+    'sorted': sorted, 'zip': zip, 'enumerate': enumerate, 'reversed': reversed,
+    'all': all, 'any': any, 'map': map, 'filter': filter,
+    # Exclus : eval, exec, open, input, __import__, etc.
+    # ATTENTION: getattr peut être utilisé pour contourner certaines protections.
+}
+
+# Globals sûrs pour l'exécution
+SAFE_GLOBALS = {
+    "__builtins__": ALLOWED_BUILTINS,
+    "math": math,
+    "datetime": datetime,
+    "random": random,
+    # Vous pouvez ajouter ici d'autres modules/fonctions que vous jugez sûrs
+    # "votre_fonction_utile": votre_fonction_utile,
+}
+
+
+def make_safe_globals() -> dict:
+    """Retourne une copie fraîche des globals sûrs (une par exécution)."""
+    return SAFE_GLOBALS.copy()
+
+
+class CodeAnalyzer(ast.NodeVisitor):
+    def __init__(self):
+        self.violations = []
+        self.imported_modules_in_code = set() # Modules que le code essaie d'importer
+
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            self.imported_modules_in_code.add(alias.name.split('.')[0]) # os.path -> os
+            if alias.name.split('.')[0] in DISALLOWED_MODULES:
+                self.violations.append(f"Import interdit du module : `{alias.name}`")
+        self.generic_visit(node)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        if node.module: # peut être None pour `from . import x`
+            self.imported_modules_in_code.add(node.module.split('.')[0])
+            if node.module.split('.')[0] in DISALLOWED_MODULES:
+                self.violations.append(f"Import interdit depuis le module : `{node.module}`")
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call):
+        func_name = ""
+        if isinstance(node.func, ast.Name): # Appel direct ex: print(), eval()
+            func_name = node.func.id
+            if func_name in DISALLOWED_BUILTINS_CALLS:
+                self.violations.append(f"Appel interdit à la fonction/built-in : `{func_name}`")
+        elif isinstance(node.func, ast.Attribute): # Appel de méthode ex: os.system()
+            # Tenter de reconstruire l'appel pour une meilleure détection
+            # `value` est l'objet, `attr` est l'attribut (méthode)
+            obj_name = ""
+            if isinstance(node.func.value, ast.Name):
+                obj_name = node.func.value.id
+
+            method_name = node.func.attr
+            full_call_str = f"{obj_name}.{method_name}" if obj_name else method_name
+
+            if obj_name in self.imported_modules_in_code and obj_name in DISALLOWED_MODULES:
+                 self.violations.append(f"Appel à une méthode du module interdit `{obj_name}` : `{method_name}`")
+            elif method_name in DISALLOWED_NAMES_ATTRIBUTES :
+                 self.violations.append(f"Appel de méthode potentiellement dangereux : `{full_call_str}`")
+
+
+        self.generic_visit(node)
+
+    def visit_Name(self, node: ast.Name): # Utilisation de variables/noms
+        if node.id in DISALLOWED_NAMES_ATTRIBUTES:
+            self.violations.append(f"Utilisation du nom potentiellement dangereux : `{node.id}`")
+        self.generic_visit(node)
+
+    def visit_Attribute(self, node: ast.Attribute): # Accès à des attributs ex: foo.bar
+        # node.value est l'objet, node.attr est l'attribut
+        attr_name = node.attr
+        obj_name = ""
+        if isinstance(node.value, ast.Name):
+            obj_name = node.value.id
+
+        if attr_name in DISALLOWED_NAMES_ATTRIBUTES:
+            self.violations.append(f"Accès à l'attribut potentiellement dangereux : `.{attr_name}`")
+
+        if obj_name in self.imported_modules_in_code and obj_name in DISALLOWED_MODULES:
+            self.violations.append(f"Accès à un attribut du module interdit `{obj_name}` : `.{attr_name}`")
+
+        self.generic_visit(node)
+
+# --- Fin des définitions ---
+
+
+class RunRuntime:
+    """
+    Analyse et exécution du code de /run.
+
+    Args:
+        settings: Paramètres de la clé "run" de config.json.
+    """
+
+    def __init__(self, settings: dict):
+        self.run_timeout = settings.get('timeout', 5.0)
+        self.max_output = settings.get('max_output', 64 * 1024)
+        self.active = 0  # Exécutions en cours, attendues par close()
+        # Cache des analyses AST et du bytecode compilé, indexé par empreinte du code
+        self.code_cache = CodeAnalysisCache(
+            max_entries=settings.get('code_cache_entries', 256),
+            max_bytes=settings.get('code_cache_bytes', 4 * 1024 * 1024),
+        )
+        # Backend d'exécution : "process" (pool de processus avec limites CPU/mémoire, par défaut)
+        # ou "thread" (ThreadPoolExecutor, ne peut pas interrompre un code qui boucle)
+        self.executor = None
+        self.sandbox_pool = None
+        backend = settings.get('backend', 'process')
+        if backend == 'process' and not fork_available():
+            logger.warning("Le backend 'process' de /run nécessite la méthode de démarrage 'fork', absente sur ce système : "
+                           "repli sur le backend 'thread' (sans limites CPU/mémoire ni arrêt des exécutions trop longues).")
+            backend = 'thread'
+        if backend == 'process':
+            self.sandbox_pool = SandboxPool(
+                make_safe_globals,
+                size=settings.get('pool_size', 2),
+                timeout=self.run_timeout,
+                cpu_seconds=settings.get('cpu_seconds', 5),
+                memory_bytes=settings.get('memory_mb', 512) * 1024 * 1024,
+                max_output=self.max_output,
+            )
+            try:
+                self.sandbox_pool.start()
+            except Exception:
+                self.sandbox_pool.close()  # Workers déjà démarrés avant l'échec
+                raise
+        else:
+            # ThreadPoolExecutor pour exécuter le code de manière non bloquante
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=settings.get('pool_size', 2))
+
+    async def close(self, timeout: float | None = None):
+        """
+        Arrête le pool sans bloquer la boucle d'événements, après la fin des exécutions
+        en cours (au plus `timeout` secondes, par défaut le délai d'exécution de /run).
+        """
+        deadline = time.monotonic() + (self.run_timeout if timeout is None else timeout)
+        while self.active and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if self.active:
+            logger.warning(f"{self.active} exécution(s) de /run toujours en cours à l'arrêt du pool, interrompue(s).")
+        logger.info(f"Statistiques du cache d'analyse de /run: {self.code_cache.stats()}")
+        if self.sandbox_pool:
+            self.sandbox_pool.close()
+        if self.executor:
+            # Un thread ne peut pas être interrompu : il se termine seul, sans être attendu ici
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def analyze(self, code_string: str) -> CodeAnalysis:
+        """
+        Analyse le code avec AST pour détecter des patterns dangereux, puis le compile
+        directement depuis l'arbre déjà construit (une seule analyse syntaxique).
+        Les résultats sont mis en cache par empreinte du code.
+        """
+        analysis = self.code_cache.get(code_string)
+        if analysis is not None:
+            return analysis
+
+        try:
+            tree = ast.parse(code_string)
+            analyzer = CodeAnalyzer()
+            analyzer.visit(tree)
+            if analyzer.violations:
+                analysis = CodeAnalysis(False, analyzer.violations)
+            else:
+                try:
+                    analysis = CodeAnalysis(True, [], compiled=compile(tree, '<discord_run_command>', 'exec'))
+                except SyntaxError as e: # Erreurs détectées seulement à la compilation (ex: return hors fonction)
+                    analysis = CodeAnalysis(True, [], compile_error=str(e))
+        except SyntaxError as e:
+            analysis = CodeAnalysis(False, [f"Erreur de syntaxe dans le code fourni : {e}"])
+        except Exception as e:
+            logger.error(f"Erreur inattendue lors de l'analyse AST : {e}")
+            return CodeAnalysis(False, ["Erreur interne lors de l'analyse du code."]) # Non mis en cache
+
+        self.code_cache.put(code_string, analysis)
+        return analysis
+
+    def _execute_code_in_thread(self, code_to_run_compiled, custom_globals, output_buffer):
+        """Fonction exécutée dans le thread."""
+        try:
+            with contextlib.redirect_stdout(output_buffer):
+                exec(code_to_run_compiled, custom_globals)
+            return output_buffer.getvalue(), None
+        except Exception: # Capturer toutes les exceptions d'exécution
+            # Renvoyer la trace complète dans la sortie standard (capturée)
+            # et aussi dans le message d'erreur pour plus de clarté.
+            tb_str = traceback.format_exc()
+            print(f"\n--- ERREUR D'EXÉCUTION ---\n{tb_str}") # Sera capturé par redirect_stdout
+            return output_buffer.getvalue(), tb_str
+
+    async def execute(self, compiled_code: CodeType, on_output: Callable[[str], None] | None = None) -> tuple[str, str | None]:
+        """
+        Exécute le code compilé dans un processus (ou un thread) séparé et retourne (sortie, erreur).
+        Lève asyncio.TimeoutError si l'exécution dépasse le délai.
+        """
+        self.active += 1
+        try:
+            return await self._execute(compiled_code, on_output)
+        finally:
+            self.active -= 1
+
+    async def _execute(self, compiled_code: CodeType, on_output: Callable[[str], None] | None) -> tuple[str, str | None]:
+        if self.sandbox_pool:
+            # Le pool tue et remplace le worker en cas de timeout (asyncio.TimeoutError)
+            try:
+                return await self.sandbox_pool.run(compiled_code, on_output=on_output)
+            except SandboxCrashed as e:
+                return f"\n--- ERREUR D'EXÉCUTION ---\n{e}", str(e)
+
+        output_buffer = CappedStringIO(self.max_output)
+        custom_globals = make_safe_globals()
+        # Exécuter le code dans un thread pour éviter de bloquer la boucle d'événements
+        future = asyncio.get_running_loop().run_in_executor(
+            self.executor,
+            self._execute_code_in_thread,
+            compiled_code,
+            custom_globals,
+            output_buffer
+        )
+
+        # Attendre le résultat avec timeout
+        output, error = await asyncio.wait_for(future, timeout=self.run_timeout)
+        if output_buffer.truncated:
+            output += "\n... (sortie tronquée)"
+        return output, error
@@ -0,0 +1,353 @@
+"""
+Pool de processus pré-forkés pour l'exécution de code utilisateur (/run).
+Contrairement à un thread, un processus peut être réellement arrêté : en cas de
+timeout, le worker est tué puis remplacé. Chaque exécution est bornée par
+RLIMIT_CPU et RLIMIT_AS, et la sortie (stdout + traceback) remonte par un pipe.
+
+Nécessite un système POSIX (méthode de démarrage "fork" et module `resource`).
+"""
+import asyncio
+import contextlib
+import io
+import logging
+import marshal
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import traceback
+from types import CodeType
+from typing import Callable
+
+try:
+    import resource
+except ImportError:  # Windows : pas de limites de ressources
+    resource = None
+
+logger = logging.getLogger('discord.sandbox_pool')
+logger.setLevel(logging.INFO)
+
+
+def fork_available() -> bool:
+    """True si la méthode de démarrage "fork" existe sur ce système (absente sous Windows)."""
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+
+class SandboxCrashed(Exception):
+    """Le worker s'est arrêté pendant l'exécution (limite CPU/mémoire dépassée, signal...)."""
+
+
+class CappedStringIO(io.StringIO):
+    """StringIO qui ignore ce qui dépasse `limit` caractères."""
+
+    def __init__(self, limit: int):
+        super().__init__()
+        self.limit = limit
+        self.truncated = False
+
+    def write(self, s: str) -> int:
+        remaining = self.limit - self.tell()
+        if remaining <= 0:
+            self.truncated = True
+            return len(s)
+        if len(s) > remaining:
+            self.truncated = True
+            super().write(s[:remaining])
+            return len(s)
+        return super().write(s)
+
+
+class _PipeWriter(io.TextIOBase):
+    """
+    stdout d'un worker : la sortie est envoyée au parent par morceaux pendant l'exécution
+    (dès `chunk_size` caractères, ou toutes les `flush_interval` secondes via un thread),
+    dans la limite de `limit` caractères au total.
+    """
+
+    def __init__(self, conn, lock: threading.Lock, limit: int, chunk_size: int = 4096):
+        self.conn = conn
+        self.lock = lock
+        self.limit = limit
+        self.chunk_size = chunk_size
+        self.written = 0
+        self.truncated = False
+        self._pending: list[str] = []
+        self._pending_len = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        length = len(s)
+        remaining = self.limit - self.written
+        if remaining <= 0:
+            self.truncated = True
+            return length
+        if length > remaining:
+            self.truncated = True
+            s = s[:remaining]
+        with self.lock:
+            self.written += len(s)
+            self._pending.append(s)
+            self._pending_len += len(s)
+        if self._pending_len >= self.chunk_size:
+            self.flush()
+        return length
+
+    def flush(self):
+        with self.lock:
+            if not self._pending:
+                return
+            chunk = ''.join(self._pending)
+            self._pending.clear()
+            self._pending_len = 0
+            self.conn.send(('chunk', chunk))
+
+
+def _apply_cpu_limit(cpu_seconds: int):
+    """Fixe la limite CPU souple à (temps CPU déjà consommé + cpu_seconds)."""
+    if resource is None or not cpu_seconds:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft = int(usage.ru_utime + usage.ru_stime) + 1 + cpu_seconds
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _address_space_size() -> int:
+    """Taille actuelle de l'espace d'adressage du processus (VmSize, octets), 0 si inconnue (hors Linux)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _apply_memory_limit(memory_bytes: int, baseline: int):
+    """Fixe RLIMIT_AS à (espace d'adressage hérité du bot au démarrage du worker + memory_bytes)."""
+    if resource is None or not memory_bytes:
+        return
+    limit = baseline + memory_bytes
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _periodic_flush(get_writer: Callable[[], _PipeWriter | None], interval: float):
+    """Thread du worker qui vide régulièrement la sortie en attente vers le parent."""
+    while True:
+        time.sleep(interval)
+        writer = get_writer()
+        if writer is not None:
+            try:
+                writer.flush()
+            except (BrokenPipeError, OSError):
+                return
+
+
+def _worker_main(conn, globals_factory: Callable[[], dict], cpu_seconds: int, memory_bytes: int, max_output: int,
+                 flush_interval: float):
+    """
+    Boucle d'un worker : reçoit du bytecode (marshal) et l'exécute.
+    Envoie ('chunk', texte) pendant l'exécution, puis ('done', traceback ou None, sortie tronquée ?).
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Le Ctrl+C du bot est géré par le processus parent
+    lock = threading.Lock()
+    current = [None]  # Writer de l'exécution en cours, lu par le thread de flush
+    threading.Thread(target=_periodic_flush, args=(lambda: current[0], flush_interval), daemon=True).start()
+    # Le worker est un fork du bot : l'espace d'adressage hérité (bibliothèques, threads, caches) ne doit
+    # pas être décompté de la mémoire allouée à une exécution
+    baseline = _address_space_size()
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+
+        writer = _PipeWriter(conn, lock, max_output)
+        current[0] = writer
+        error = None
+        try:
+            code = marshal.loads(job)
+            _apply_memory_limit(memory_bytes, baseline)
+            _apply_cpu_limit(cpu_seconds)
+            with contextlib.redirect_stdout(writer):
+                exec(code, globals_factory())
+        except BaseException:  # SystemExit compris : le worker doit survivre au code exécuté
+            error = traceback.format_exc()
+
+        current[0] = None
+        try:
+            writer.flush()
+            with lock:
+                conn.send(('done', error, writer.truncated))
+        except (BrokenPipeError, OSError):
+            return
+
+
+class _Worker:
+    __slots__ = ('process', 'conn', 'runs')
+
+    def __init__(self, process: multiprocessing.Process, conn):
+        self.process = process
+        self.conn = conn
+        self.runs = 0
+
+
+class SandboxPool:
+    """
+    Pool de `size` processus exécutant du code compilé dans un environnement restreint.
+
+    Args:
+        globals_factory: Fonction retournant un nouveau dictionnaire de globals pour chaque exécution.
+        size: Nombre de workers.
+        timeout: Temps réel maximal (s) d'une exécution avant que le worker soit tué.
+        cpu_seconds: Limite RLIMIT_CPU par exécution.
+        memory_bytes: Mémoire allouable par une exécution (RLIMIT_AS du worker = espace d'adressage hérité du bot + memory_bytes).
+        max_output: Nombre maximal de caractères de sortie capturés (plafond dur côté worker).
+        flush_interval: Intervalle (s) d'envoi de la sortie partielle pendant l'exécution.
+        max_runs_per_worker: Nombre d'exécutions avant recyclage d'un worker (état des modules partagés).
+    """
+
+    def __init__(self, globals_factory: Callable[[], dict], size: int = 2, timeout: float = 5.0,
+                 cpu_seconds: int = 5, memory_bytes: int = 512 * 1024 * 1024, max_output: int = 64 * 1024,
+                 max_runs_per_worker: int = 100, flush_interval: float = 0.5):
+        self.globals_factory = globals_factory
+        self.size = size
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_bytes
+        self.max_output = max_output
+        self.max_runs_per_worker = max_runs_per_worker
+        self.flush_interval = flush_interval
+
+        self._context = multiprocessing.get_context('fork')
+        self._idle: asyncio.Queue[_Worker] = asyncio.Queue()
+        self._workers: set[_Worker] = set()
+        self._closed = False
+
+        # Compteurs
+        self.timeouts = 0
+        self.crashes = 0
+
+    def start(self):
+        """Démarre (pré-forke) les workers."""
+        for _ in range(self.size):
+            self._idle.put_nowait(self._spawn())
+        logger.info(f"SandboxPool: {self.size} worker(s) démarré(s) (CPU: {self.cpu_seconds}s, mémoire: {self.memory_bytes // (1024 * 1024)} Mo).")
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._context.Pipe(duplex=True)
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.globals_factory, self.cpu_seconds, self.memory_bytes, self.max_output, self.flush_interval),
+            name='sandbox-worker',
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        worker = _Worker(process, parent_conn)
+        self._workers.add(worker)
+        return worker
+
+    async def _kill(self, worker: _Worker):
+        self._workers.discard(worker)
+        worker.conn.close()
+        if worker.process.is_alive():
+            worker.process.kill()
+        await asyncio.to_thread(worker.process.join, 1.0)
+
+    async def _replace(self, worker: _Worker):
+        await self._kill(worker)
+        if not self._closed:
+            self._idle.put_nowait(self._spawn())
+
+    async def _recv(self, conn):
+        """Attend un message sur le pipe sans bloquer la boucle d'événements."""
+        loop = asyncio.get_running_loop()
+        readable = loop.create_future()
+        fd = conn.fileno()
+        loop.add_reader(fd, lambda: readable.done() or readable.set_result(None))
+        try:
+            await readable
+        finally:
+            loop.remove_reader(fd)
+        return conn.recv()
+
+    async def run(self, code: CodeType, on_output: Callable[[str], None] | None = None) -> tuple[str, str | None]:
+        """
+        Exécute `code` dans un worker et retourne (sortie, traceback ou None).
+        Si `on_output` est fourni, il est appelé avec chaque morceau de sortie reçu pendant l'exécution.
+
+        Raises:
+            asyncio.TimeoutError: Le temps imparti est dépassé (le worker est tué et remplacé).
+            SandboxCrashed: Le worker est mort pendant l'exécution (ex: limite CPU atteinte).
+        """
+        if self._closed:
+            raise RuntimeError("SandboxPool fermé.")
+        worker = await self._idle.get()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        chunks = []
+        try:
+            worker.conn.send(marshal.dumps(code))
+            while True:
+                message = await asyncio.wait_for(self._recv(worker.conn), timeout=max(deadline - loop.time(), 0))
+                if message[0] == 'chunk':
+                    chunks.append(message[1])
+                    if on_output is not None:
+                        on_output(message[1])
+                    continue
+                _, error, truncated = message
+                break
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning(f"SandboxPool: Timeout, worker {worker.process.pid} tué et remplacé.")
+            await self._replace(worker)
+            raise
+        except (EOFError, OSError) as e:
+            self.crashes += 1
+            exitcode = worker.process.exitcode
+            await self._replace(worker)
+            raise SandboxCrashed(f"Le processus d'exécution s'est arrêté (code {exitcode}) : limite CPU ou mémoire probablement dépassée.") from e
+        except BaseException:
+            # Annulation (ex: déchargement du cog) : l'état du worker est inconnu
+            await self._replace(worker)
+            raise
+
+        output = ''.join(chunks)
+        if truncated:
+            output += "\n... (sortie tronquée)"
+        if error:
+            output += f"\n--- ERREUR D'EXÉCUTION ---\n{error}"
+
+        worker.runs += 1
+        if worker.runs >= self.max_runs_per_worker:
+            await self._replace(worker)
+        else:
+            self._idle.put_nowait(worker)
+        return output, error
+
+    def stats(self) -> dict:
+        return {
+            'workers': len(self._workers),
+            'idle': self._idle.qsize(),
+            'timeouts': self.timeouts,
+            'crashes': self.crashes,
+        }
+
+    def close(self):
+        """Arrête tous les workers sans attendre (utilisable depuis cog_unload)."""
+        self._closed = True
+        for worker in list(self._workers):
+            worker.conn.close()
+            if worker.process.is_alive():
+                worker.process.kill()
+        self._workers.clear()